@@ -0,0 +1,152 @@
+"""Load test for the HTTP recommendation service
+
+Usage:
+    python benchmarks/load_test.py --spawn
+    python benchmarks/load_test.py --port 8080 --concurrency 128 --requests 20000
+
+With --spawn a service is started on a free local port for the duration of
+the test; otherwise it must already be running (call-center-model serve).
+Requests are drawn from a pool of --configs distinct campaigns, so repeats
+exercise the result cache. Prints client-side throughput and latency
+percentiles plus the service's own /metrics, and exits with status 1 if any
+request failed.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+
+def request_pool(n_configs, seed=0):
+    """Distinct campaign requests with varied volumes, headcounts and budgets"""
+    rng = np.random.default_rng(seed)
+    return [
+        json.dumps({
+            'base_leads': round(float(leads), 0),
+            'base_salespeople': int(agents),
+            'max_cac': 1000,
+            'investment_amount': round(float(budget), -2)
+        }).encode()
+        for leads, agents, budget in zip(
+            rng.uniform(500, 8000, n_configs), rng.integers(1, 40, n_configs), rng.uniform(1000, 100000, n_configs)
+        )
+    ]
+
+
+async def http_request(reader, writer, host, method, path, body=b''):
+    """Send one keep-alive request and return (status, parsed JSON body)"""
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+        f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+    )
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+async def run_load(host, port, concurrency, n_requests, pool, seed=0):
+    """Run ``n_requests`` across ``concurrency`` connections; returns latencies and error count"""
+    rng = np.random.default_rng(seed)
+    order = rng.integers(0, len(pool), n_requests).tolist()
+    latencies = []
+    errors = 0
+
+    async def client(indices):
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for index in indices:
+                started = time.perf_counter()
+                status, _ = await http_request(reader, writer, host, 'POST', '/recommend', pool[index])
+                latencies.append(time.perf_counter() - started)
+                errors += status != 200
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(order[i::concurrency]) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    reader, writer = await asyncio.open_connection(host, port)
+    _, server_metrics = await http_request(reader, writer, host, 'GET', '/metrics')
+    writer.close()
+    return np.array(latencies), errors, elapsed, server_metrics
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def spawn_service(port, timeout=30):
+    """Start ``call-center-model serve`` in a subprocess and wait until it answers"""
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'src.cli', 'serve', '--port', str(port)],
+        cwd=project_root, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError("Service did not start")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the recommendation service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--spawn', action='store_true', help="start a local service on a free port for the test")
+    parser.add_argument('--concurrency', type=int, default=64, help="concurrent keep-alive connections (default 64)")
+    parser.add_argument('--requests', type=int, default=5000, help="total requests (default 5000)")
+    parser.add_argument('--configs', type=int, default=500, help="distinct campaigns in the request pool (default 500)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+
+    process = None
+    if args.spawn:
+        args.host, args.port = '127.0.0.1', free_port()
+        process = spawn_service(args.port)
+    try:
+        latencies, errors, elapsed, server_metrics = asyncio.run(run_load(
+            args.host, args.port, args.concurrency, args.requests, request_pool(args.configs, args.seed), args.seed
+        ))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    latencies_ms = latencies * 1000
+    print(f"{len(latencies)} requests over {args.concurrency} connections in {elapsed:.2f} s "
+          f"({len(latencies) / elapsed:,.0f} requests/s), {errors} errors")
+    print("client latency ms: " + ", ".join(
+        f"p{q}={np.percentile(latencies_ms, q):.2f}" for q in (50, 95, 99)
+    ) + f", max={latencies_ms.max():.2f}")
+    print("service metrics: " + json.dumps(server_metrics, indent=2))
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Benchmarks for the model's hot paths with baseline regression tracking
+
+Usage:
+    python benchmarks/run_benchmarks.py --save benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json --max-slowdown 1.25
+
+Each case is timed as the best of several repeats. With --compare the run
+exits with status 1 when any case is slower than the baseline by more than
+--max-slowdown (a ratio). --quick skips the largest sizes.
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.batch import batch_investment_recommendations
+from src.main import CallCenterModel
+from src.portfolio import allocate_portfolio
+from src.simulation import EventSimulation, simulate_period
+from src.surface import build_surface
+
+COST_TIER_COUNTS = [4, 50, 500]
+SCENARIO_COUNTS = [10, 1000, 100000, 1000000]
+QUALITY_TIER_COUNTS = [3, 20, 50]
+QUICK_LIMIT = 100000
+
+
+def rate_card(n_tiers):
+    """Rate card with ``n_tiers`` rising price breakpoints and an open-ended last tier"""
+    tiers = [{'volume': 500 * (i + 1), 'cost': 20 + i * 0.5} for i in range(n_tiers - 1)]
+    return tiers + [{'volume': float('inf'), 'cost': 20 + n_tiers * 0.5}]
+
+
+def quality_mix(n_tiers):
+    """Quality mix with ``n_tiers`` equally sized tiers; the first three are A, B, C"""
+    names = ['A', 'B', 'C'] + [f'T{i}' for i in range(3, n_tiers)]
+    conversion = np.linspace(0.2, 0.01, n_tiers)
+    return {
+        name: {'conversion_rate': float(rate), 'distribution': 1.0 / n_tiers}
+        for name, rate in zip(names, conversion)
+    }
+
+
+class Setup:
+    """A case whose inputs are built only when it runs
+
+    ``factory`` returns a context manager that yields the callable to time
+    and cleans up after it, so listing or filtering cases costs nothing.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+
+
+@contextlib.contextmanager
+def portfolio_case(leads, agents):
+    sites = [
+        {'base_leads': float(base_leads), 'base_salespeople': int(salespeople), 'lead_cost_tiers': rate_card(4 + i % 3)}
+        for i, (base_leads, salespeople) in enumerate(zip(leads, agents))
+    ]
+    yield lambda: allocate_portfolio(sites, 20000.0 * len(sites), max_cac=800)
+
+
+@contextlib.contextmanager
+def surface_case():
+    with tempfile.TemporaryDirectory(prefix='surface-') as path:
+        surface = build_surface(path)
+        yield lambda: surface.lookup(7300.0, 12, 50000.0)
+
+
+def run_python(*args):
+    """Run a fresh interpreter from the project root, as a cron job would"""
+    subprocess.run([sys.executable, *args], cwd=project_root, check=True, stdout=subprocess.DEVNULL)
+
+
+def cases(quick=False):
+    """Yield (name, size parameters, callable or Setup) for every benchmark case"""
+    # Startup cost of short-lived processes, including interpreter start
+    yield 'startup', {'target': 'python'}, lambda: run_python('-c', 'pass')
+    yield 'startup', {'target': 'import_core'}, lambda: run_python('-c', 'import src.main')
+    yield 'startup', {'target': 'cli_recommend'}, lambda: run_python('-m', 'src.cli', 'recommend', '--investment', '50000')
+
+    volumes = np.linspace(0, 500 * 600, 100000)
+    for n_tiers in COST_TIER_COUNTS:
+        model = CallCenterModel(lead_cost_tiers=rate_card(n_tiers))
+        yield 'calculate_lead_cost', {'cost_tiers': n_tiers, 'volumes': len(volumes)}, lambda model=model: model.calculate_lead_cost(volumes)
+        yield 'calculate_lead_cost_scalar', {'cost_tiers': n_tiers}, lambda model=model: model.calculate_lead_cost(12345)
+        yield 'get_investment_recommendation', {'cost_tiers': n_tiers}, lambda model=model: model.get_investment_recommendation(50000)
+        yield 'optimize_investment', {'cost_tiers': n_tiers}, lambda model=model: model.optimize_investment(200000)
+
+    model = CallCenterModel()
+    for n_scenarios in SCENARIO_COUNTS:
+        if quick and n_scenarios > QUICK_LIMIT:
+            continue
+        multipliers = np.linspace(0.1, 5.0, n_scenarios)
+        yield 'calculate_metrics', {'scenarios': n_scenarios}, lambda multipliers=multipliers: model.calculate_metrics(multipliers)
+        yield 'evaluate_scenario_results', {'scenarios': n_scenarios}, lambda multipliers=multipliers: model.evaluate_scenario_results(multipliers)
+
+    multipliers = np.linspace(0.1, 5.0, 10000)
+    for n_tiers in QUALITY_TIER_COUNTS:
+        model = CallCenterModel(lead_quality_distribution=quality_mix(n_tiers))
+        yield 'evaluate_scenarios', {'quality_tiers': n_tiers, 'scenarios': len(multipliers)}, lambda model=model: model.evaluate_scenarios(multipliers)
+
+    rng = np.random.default_rng(0)
+    n_configs = 200 if quick else 2000
+    configs = [
+        {'base_leads': float(leads), 'base_salespeople': int(agents), 'lead_cost_tiers': rate_card(4 + i % 3)}
+        for i, (leads, agents) in enumerate(zip(rng.uniform(500, 5000, n_configs), rng.integers(1, 30, n_configs)))
+    ]
+    budgets = np.linspace(1000, 100000, 50)
+    yield 'batch_investment_recommendations', {'configs': n_configs, 'budgets': len(budgets)}, lambda: batch_investment_recommendations(configs, budgets)
+
+    n_sites = 1000 if quick else 10000
+    leads, agents = rng.uniform(500, 5000, n_sites), rng.integers(1, 30, n_sites)
+    yield 'allocate_portfolio', {'sites': n_sites}, Setup(lambda: portfolio_case(leads, agents))
+
+    model = CallCenterModel()
+    vendors = {f'vendor_{i}': rate_card(4 + i % 8) for i in range(50)}
+    volumes = np.linspace(0, 20000, 10000)
+    yield 'compare_rate_cards', {'vendors': len(vendors), 'volumes': len(volumes)}, lambda: model.compare_rate_cards(vendors, volumes)
+
+    yield 'surface_lookup', {'queries': 1}, Setup(surface_case)
+
+    n_leads = 20000 if quick else 200000
+    model = CallCenterModel(base_leads=n_leads, base_salespeople=n_leads // 700, max_leads_per_salesperson=600)
+    yield 'simulate_period', {'leads': n_leads}, lambda: simulate_period(model, EventSimulation(seed=0))
+
+
+def case_key(name, params):
+    return name + '[' + ','.join(f'{key}={value}' for key, value in sorted(params.items())) + ']'
+
+
+def time_case(func, min_time=0.2, max_repeats=50):
+    """Best wall time of repeated calls, repeating until ``min_time`` has elapsed"""
+    func()  # warm up
+    best = float('inf')
+    elapsed = 0.0
+    repeats = 0
+    while repeats < 3 or (elapsed < min_time and repeats < max_repeats):
+        start = time.perf_counter()
+        func()
+        duration = time.perf_counter() - start
+        best = min(best, duration)
+        elapsed += duration
+        repeats += 1
+    return best
+
+
+def run(quick=False, only=None):
+    results = {}
+    for name, params, func in cases(quick):
+        if only and only not in name:
+            continue
+        key = case_key(name, params)
+        if isinstance(func, Setup):
+            with func.factory() as prepared:
+                results[key] = time_case(prepared)
+        else:
+            results[key] = time_case(func)
+        print(f"{key:<75} {results[key] * 1000:10.3f} ms")
+    return results
+
+
+def compare_results(baseline, current, max_slowdown):
+    """Return (key, baseline, current, ratio) for cases slower than ``max_slowdown``"""
+    regressions = []
+    for key, seconds in current.items():
+        if key not in baseline or baseline[key] <= 0:
+            continue
+        ratio = seconds / baseline[key]
+        if ratio > max_slowdown:
+            regressions.append((key, baseline[key], seconds, ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the call center model's hot paths")
+    parser.add_argument('--save', help="write results to this JSON baseline file")
+    parser.add_argument('--compare', help="compare against this JSON baseline file")
+    parser.add_argument('--max-slowdown', type=float, default=1.25, help="allowed ratio of current to baseline time (default 1.25)")
+    parser.add_argument('--quick', action='store_true', help="skip the largest sizes")
+    parser.add_argument('--only', help="only run cases whose name contains this text")
+    args = parser.parse_args(argv)
+
+    results = run(quick=args.quick, only=args.only)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'machine': platform.machine(),
+                'results': results
+            }, f, indent=2, sort_keys=True)
+        print(f"\nSaved {len(results)} results to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare_results(baseline, results, args.max_slowdown)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than {args.max_slowdown:.2f}x baseline:")
+            for key, before, after, ratio in regressions:
+                print(f"  {key}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({ratio:.2f}x)")
+            return 1
+        print(f"\nNo case slower than {args.max_slowdown:.2f}x baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,25 @@
+import os
+import sys
+
 import streamlit as st
-from main import CallCenterModel
+
+# Make the project root importable so the model package resolves when run via `streamlit run`
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.cache import ModelResultsCache
+from src.config import ModelConfig
+from src.utils.calculations import LeadCostTable
 import pandas as pd
 import plotly.express as px
 
 st.set_page_config(page_title="Call Center Investment Calculator", layout="wide")
 
+@st.cache_resource
+def results_cache():
+    """One results cache shared by every session on this server"""
+    return ModelResultsCache(maxsize=1024)
+
 def main():
     st.title("📞 Call Center Investment Calculator")
     
@@ -66,12 +81,19 @@ def main():
             
         cost_tiers.append({'volume': volume, 'cost': cost})
 
+    # A volume below the tier before it cannot be priced; say so instead of crashing the page
+    try:
+        LeadCostTable(cost_tiers)
+    except ValueError as error:
+        st.error(f"Lead cost tiers: {error}. Enter each tier's volume at or above the one before it.")
+        st.stop()
+
     # Investment Analysis
     st.header("Investment Analysis")
     investment_amount = st.number_input("Investment Amount ($)", value=12000)
 
-    # Create model with decimal values
-    model = CallCenterModel(
+    # Snapshot the inputs; unchanged inputs are served from the shared cache
+    config = ModelConfig(
         base_leads=base_leads,
         base_salespeople=base_salespeople,
         max_leads_per_salesperson=max_leads_per_agent,
@@ -85,7 +107,16 @@ def main():
         lead_cost_tiers=cost_tiers
     )
 
-    recommendation = model.get_investment_recommendation(investment_amount)
+    # Inputs any session has seen are answered from the shared cache. On a
+    # miss the session's what-if graph only recomputes the results downstream
+    # of the inputs that changed since its last update
+    whatif = st.session_state.get('whatif')
+    if whatif is None:
+        whatif = st.session_state['whatif'] = config.to_model().what_if(investment_amount)
+    recommendation = results_cache().recommendation(
+        config, investment_amount,
+        compute=lambda: whatif.update(investment_amount=investment_amount, **config.model_kwargs())
+    )
     
     # Display results
     col1, col2 = st.columns(2)
@@ -123,8 +154,20 @@ def main():
         - People scenario CAC: ${recommendation['people_cac']:.2f}
         """)
 
+    # Best mix of agents and leads for the same budget
+    split = results_cache().optimal_split(config, investment_amount)
+    st.subheader("Optimal Budget Split")
+    if split['recommendation'] == 'do_nothing':
+        st.markdown("No split of the investment meets the CAC requirement.")
+    else:
+        split_cols = st.columns(4)
+        split_cols[0].metric("Additional Agents", f"{split['additional_agents']:,}", f"${split['agent_spend']:,.0f}")
+        split_cols[1].metric("Additional Leads", f"{split['additional_leads']:,.0f}", f"${split['lead_spend']:,.0f}")
+        split_cols[2].metric("Incremental Sales", f"{split['incremental_sales']:.0f}")
+        split_cols[3].metric("Resulting CAC", f"${split['total_cac']:.2f}")
+
     if st.checkbox("Show detailed metrics"):
-        metrics_df = model.calculate_metrics(investment_amount=investment_amount)
+        results = whatif.results()
         
         # Define columns for detailed view
         columns = [
@@ -152,9 +195,9 @@ def main():
             'agent_cost': '${:.0f}'
         }
         
-        # Split and display scenarios
-        lead_scenarios = metrics_df[metrics_df['scenario'].str.contains('leads')]
-        agent_scenarios = metrics_df[metrics_df['scenario'].str.contains('agent')]
+        # Split scenarios by kind and display them
+        lead_scenarios = results.select('leads').to_pandas(labels=True)
+        agent_scenarios = results.select('agents').to_pandas(labels=True)
         
         st.subheader("Lead Scenarios")
         st.dataframe(lead_scenarios[columns].style.format(number_format))
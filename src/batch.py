@@ -0,0 +1,219 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .config import MODEL_DEFAULTS, ModelConfig, freeze_quality, freeze_tiers
+from .utils.calculations import (
+    LeadCostTable,
+    quality_arrays,
+    recommend,
+    recommendation_reason,
+    scenario_metrics
+)
+from .readers import iter_frames
+from .utils.frames import require_pandas
+from .utils.instrumentation import timed
+from .writers import open_writer
+
+# Model arguments that hold nested values
+JSON_COLUMNS = ['lead_quality_distribution', 'lead_cost_tiers']
+
+
+def _is_missing(value):
+    return value is None or (isinstance(value, float) and np.isnan(value))
+
+
+def _config_frame(configs):
+    """Normalize configurations into a DataFrame with every model argument present"""
+    pd = require_pandas()
+    if isinstance(configs, pd.DataFrame):
+        frame = configs.reset_index(drop=True)
+    else:
+        frame = pd.DataFrame([
+            config.model_kwargs() if isinstance(config, ModelConfig) else config
+            for config in configs
+        ])
+    unknown = set(frame.columns) - set(MODEL_DEFAULTS) - {'investment_amount'}
+    if unknown:
+        raise ValueError(f"Unknown model configuration columns: {sorted(unknown)}")
+
+    for name, default in MODEL_DEFAULTS.items():
+        if name not in frame.columns:
+            frame[name] = [default] * len(frame)
+        else:
+            # Rows that leave a column blank fall back to the model default
+            frame[name] = [default if _is_missing(value) else value for value in frame[name]]
+    for name in JSON_COLUMNS:
+        # Files store the nested quality mix and rate card as JSON text
+        frame[name] = [json.loads(value) if isinstance(value, str) else value for value in frame[name]]
+    return frame
+
+
+@timed('batch_investment_recommendations')
+def batch_investment_recommendations(configs, budgets=None):
+    """Recommend leads vs people for every configuration at every budget
+
+    ``configs`` is a DataFrame (or list of dicts or ModelConfigs) whose columns
+    are CallCenterModel constructor arguments; missing columns use the model
+    defaults. ``budgets`` is a 1-D sequence of investment amounts. When it is
+    None, each configuration is evaluated at the amount in its own
+    ``investment_amount`` column. Returns one row per (configuration, budget)
+    pair with the same figures that get_investment_recommendation reports.
+
+    Rows sharing a rate card, quality mix and capacity model are evaluated together: the tier
+    cost index and quality arrays are built once per group and every scenario
+    is computed as array operations over rows x budgets.
+    """
+    pd = require_pandas()
+    frame = _config_frame(configs)
+    if budgets is None:
+        if 'investment_amount' not in frame.columns:
+            raise ValueError("Pass budgets or give every configuration an investment_amount")
+        # One budget per row, shaped (rows, 1)
+        row_budgets = frame['investment_amount'].to_numpy(dtype=float)[:, None]
+        if np.isnan(row_budgets).any():
+            raise ValueError("investment_amount is missing for some configurations")
+    else:
+        row_budgets = np.atleast_1d(np.asarray(budgets, dtype=float))[None, :].repeat(len(frame), axis=0)
+
+    groups = {}
+    for row, (tiers, quality, capacity_model) in enumerate(zip(
+        frame['lead_cost_tiers'], frame['lead_quality_distribution'], frame['capacity_model']
+    )):
+        groups.setdefault((freeze_tiers(tiers), freeze_quality(quality), capacity_model), []).append(row)
+
+    results = []
+    for rows in groups.values():
+        rows = np.array(rows)
+        group = frame.iloc[rows]
+        lead_cost_table = LeadCostTable(group['lead_cost_tiers'].iloc[0])
+        distribution, conversion = quality_arrays(group['lead_quality_distribution'].iloc[0])
+        capacity_model = group['capacity_model'].iloc[0]
+
+        # Per-row parameters as column vectors so they broadcast against budgets
+        base_leads = group['base_leads'].to_numpy(dtype=float)[:, None]
+        base_salespeople = group['base_salespeople'].to_numpy(dtype=float)[:, None]
+        max_leads = group['max_leads_per_salesperson'].to_numpy(dtype=float)[:, None]
+        salesperson_cost = group['salesperson_cost'].to_numpy(dtype=float)[:, None]
+        max_cac = group['max_cac'].to_numpy(dtype=float)[:, None]
+        budgets = row_budgets[rows]
+        shape = budgets.shape
+
+        def evaluate(total_leads, salespeople):
+            """Evaluate scenarios shaped (rows, budgets) or (rows, 1)"""
+            scenario_shape = np.broadcast_shapes(np.shape(total_leads), np.shape(salespeople))
+            metrics = scenario_metrics(
+                total_leads, salespeople, max_leads, salesperson_cost,
+                distribution, conversion, lead_cost_table, capacity_model
+            )
+            return {name: values.reshape(scenario_shape) for name, values in metrics.items()}
+
+        # Baseline does not depend on the budget: evaluate once per row and broadcast
+        base = {
+            name: np.broadcast_to(values, shape)
+            for name, values in evaluate(base_leads, base_salespeople).items()
+        }
+
+        additional_leads = lead_cost_table.leads_for_budget(budgets, base_leads)
+        leads = evaluate(base_leads + additional_leads, base_salespeople)
+
+        additional_agents = budgets // salesperson_cost
+        people = evaluate(base_leads, base_salespeople + additional_agents)
+
+        recommendation, leads_incremental, people_incremental = recommend(
+            base['sales'], leads['sales'], leads['total_cac'],
+            people['sales'], people['total_cac'], max_cac
+        )
+
+        results.append(pd.DataFrame({
+            'config': np.repeat(rows, shape[1]),
+            'investment_amount': budgets.ravel(),
+            'recommendation': recommendation.ravel(),
+            'current_cac': base['total_cac'].ravel(),
+            'leads_cac': leads['total_cac'].ravel(),
+            'people_cac': people['total_cac'].ravel(),
+            'base_sales': base['sales'].ravel(),
+            'leads_sales': leads['sales'].ravel(),
+            'people_sales': people['sales'].ravel(),
+            'leads_incremental': leads_incremental.ravel(),
+            'people_incremental': people_incremental.ravel(),
+            'additional_leads': np.broadcast_to(additional_leads, shape).ravel(),
+            'additional_agents': additional_agents.ravel()
+        }))
+
+    if not results:
+        return pd.DataFrame(columns=['config', 'investment_amount', 'recommendation', 'reason'])
+
+    output = pd.concat(results, ignore_index=True).sort_values('config', kind='stable')
+    output.insert(3, 'reason', output['recommendation'].map(recommendation_reason))
+    return output.reset_index(drop=True)
+
+
+def _evaluate_frame(frame, start, budgets):
+    """Evaluate one chunk of configurations into a dict of output columns"""
+    results = batch_investment_recommendations(frame, budgets)
+    results['config'] += start  # row number within the whole input
+    return {name: results[name].to_numpy() for name in results.columns}
+
+
+def iter_batch_results(frames, budgets=None, workers=1):
+    """Yield (configs, columns) for each chunk of configurations, in input order
+
+    Chunks are evaluated in-process when ``workers`` is 0 or 1; otherwise they
+    run in a ProcessPoolExecutor with at most two chunks per worker in flight,
+    so memory stays bounded however large the input is.
+    """
+    def numbered():
+        start = 0
+        for frame in frames:
+            yield start, frame.reset_index(drop=True)
+            start += len(frame)
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for start, frame in numbered():
+            yield len(frame), _evaluate_frame(frame, start, budgets)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start, frame in numbered():
+            pending.append((len(frame), pool.submit(_evaluate_frame, frame, start, budgets)))
+            if len(pending) >= 2 * workers:
+                size, future = pending.popleft()
+                yield size, future.result()
+        while pending:
+            size, future = pending.popleft()
+            yield size, future.result()
+
+
+def run_batch_file(input_path, output_path, budgets=None, chunk_size=10000, workers=1,
+                   input_format=None, output_format=None, progress=None):
+    """Stream configurations from a file into a file of recommendations
+
+    Input and output may be CSV, JSON Lines or Parquet (inferred from the
+    extension unless given). Nested columns may be JSON text. Configurations
+    are read and evaluated ``chunk_size`` rows at a time. ``progress`` is
+    called as ``progress(stats)`` after each chunk. Returns throughput stats.
+    """
+    started = time.perf_counter()
+    stats = {'configs': 0, 'rows': 0, 'chunks': 0}
+    frames = iter_frames(input_path, batch_size=chunk_size, format=input_format)
+    with open_writer(output_path, output_format) as writer:
+        for configs, columns in iter_batch_results(frames, budgets, workers):
+            writer.write(columns)
+            stats['configs'] += configs
+            stats['chunks'] += 1
+            stats['rows'] = writer.rows
+            if progress is not None:
+                progress(dict(stats))
+
+    stats['seconds'] = time.perf_counter() - started
+    stats['configs_per_second'] = stats['configs'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+    stats['rows_per_second'] = stats['rows'] / stats['seconds'] if stats['seconds'] > 0 else 0.0
+    return stats
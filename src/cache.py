@@ -0,0 +1,135 @@
+import threading
+from collections import OrderedDict
+
+from .config import ModelConfig
+
+
+class LRUCache:
+    """Thread-safe bounded mapping that evicts the least recently used entry
+
+    Hit, miss and eviction counters are kept so the cache can be sized from
+    production traffic.
+    """
+
+    def __init__(self, maxsize=256):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be positive")
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, default=None):
+        """Return the cached value for ``key`` (counted as a hit or miss), or ``default``"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            return default
+
+    def put(self, key, value):
+        """Store ``value`` under ``key``, evicting the least recently used entries"""
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """Return the cached value for ``key``, calling ``compute()`` on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Compute outside the lock so slow entries don't block other keys
+        value = compute()
+        self.put(key, value)
+        return value
+
+    def clear(self):
+        """Drop every entry and reset the counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self):
+        """Return hit/miss counters and current occupancy"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._entries),
+                'maxsize': self.maxsize
+            }
+
+
+class ModelResultsCache:
+    """Memoizes model results keyed on a frozen ModelConfig
+
+    Results are shared between callers and must be treated as read-only;
+    DataFrames are returned as copies.
+    """
+
+    def __init__(self, maxsize=256):
+        self._cache = LRUCache(maxsize)
+
+    def _config(self, config):
+        return config if isinstance(config, ModelConfig) else ModelConfig(**config)
+
+    def model(self, config):
+        """Return the shared CallCenterModel built for ``config``"""
+        config = self._config(config)
+        return self._cache.get_or_compute(('model', config), config.to_model)
+
+    def recommendation(self, config, investment_amount, compute=None):
+        """Cached get_investment_recommendation for ``config``
+
+        ``compute`` produces the result on a miss instead of the shared model,
+        e.g. a session's WhatIfModel updated to the same inputs.
+        """
+        config = self._config(config)
+        if compute is None:
+            def compute():
+                return self.model(config).get_investment_recommendation(investment_amount)
+        return self._cache.get_or_compute(('recommendation', config, investment_amount), compute)
+
+    def optimal_split(self, config, investment_amount):
+        """Cached optimize_investment for ``config``"""
+        config = self._config(config)
+        return self._cache.get_or_compute(
+            ('optimal_split', config, investment_amount),
+            lambda: self.model(config).optimize_investment(investment_amount)
+        )
+
+    def metrics(self, config, lead_multipliers=None):
+        """Cached calculate_metrics for ``config``"""
+        config = self._config(config)
+        multipliers = None if lead_multipliers is None else tuple(lead_multipliers)
+        results = self._cache.get_or_compute(
+            ('metrics', config, multipliers),
+            lambda: self.model(config).calculate_metrics(None if multipliers is None else list(multipliers))
+        )
+        return results.copy()
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self):
+        return self._cache.stats()
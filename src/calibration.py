@@ -0,0 +1,184 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+import numpy as np
+
+from .config import ModelConfig, thaw_quality
+from .readers import iter_frames
+
+# Columns read from each historical lead record
+RECORD_COLUMNS = ['tier', 'worked', 'converted', 'month']
+
+
+class CalibrationStats:
+    """Running counts over historical lead records
+
+    ``tiers`` maps each quality tier to ``[leads, worked, converted]`` and
+    ``months`` maps each month to ``[leads, worked]``. Counts only grow by
+    addition, so stats from separate chunks or files merge exactly and memory
+    depends on the number of tiers and months, not records. A conversion only
+    counts when the lead was worked.
+    """
+
+    def __init__(self):
+        self.tiers = {}
+        self.months = {}
+        self.records = 0
+
+    def update(self, frame):
+        """Add the counts from a DataFrame of RECORD_COLUMNS; nulls raise ValueError"""
+        missing = set(RECORD_COLUMNS) - set(frame.columns)
+        if missing:
+            raise ValueError(f"Lead records are missing columns: {sorted(missing)}")
+        # A null flag would otherwise count as True
+        nulls = frame[RECORD_COLUMNS].isna().sum()
+        if nulls.any():
+            raise ValueError(f"Lead records have null values: {nulls[nulls > 0].to_dict()}")
+        worked = frame['worked'].to_numpy().astype(bool)
+        counts = frame[['tier', 'month']].assign(
+            worked=worked, converted=worked & frame['converted'].to_numpy().astype(bool)
+        )
+
+        by_tier = counts.groupby('tier', sort=False)[['worked', 'converted']].agg(['size', 'sum'])
+        for tier, leads, worked_leads, converted in zip(
+            by_tier.index, by_tier[('worked', 'size')], by_tier[('worked', 'sum')], by_tier[('converted', 'sum')]
+        ):
+            _add(self.tiers, tier, [leads, worked_leads, converted])
+
+        by_month = counts.groupby('month', sort=False)['worked'].agg(['size', 'sum'])
+        for month, leads, worked_leads in zip(by_month.index, by_month['size'], by_month['sum']):
+            _add(self.months, month, [leads, worked_leads])
+        self.records += len(frame)
+        return self
+
+    def merge(self, other):
+        """Add another CalibrationStats' counts into this one"""
+        for tier, values in other.tiers.items():
+            _add(self.tiers, tier, values)
+        for month, values in other.months.items():
+            _add(self.months, month, values)
+        self.records += other.records
+        return self
+
+    def quality_distribution(self, fallback=None):
+        """lead_quality_distribution estimated from the counts
+
+        A tier's share is its fraction of all leads and its conversion rate
+        is conversions per worked lead. Tiers that were never worked take
+        their rate from ``fallback`` (a lead_quality_distribution), or 0.
+        """
+        fallback = fallback or {}
+        total = sum(leads for leads, _, _ in self.tiers.values())
+        if total == 0:
+            raise ValueError("No lead records to calibrate from")
+        quality = {}
+        for tier in _ordered(self.tiers):
+            leads, worked, converted = self.tiers[tier]
+            if worked > 0:
+                conversion_rate = converted / worked
+            else:
+                conversion_rate = fallback.get(str(tier), {}).get('conversion_rate', 0.0)
+            quality[str(tier)] = {'conversion_rate': float(conversion_rate), 'distribution': leads / total}
+        return quality
+
+    def capacity(self, salespeople):
+        """Estimate leads one agent works per month
+
+        ``salespeople`` is the headcount, for every month or as a dict by
+        month. Months that left leads unworked ran at capacity, so their
+        worked leads per agent are averaged. When every lead was worked,
+        capacity was never reached and the busiest month's rate is only a
+        lower bound; ``capacity_bound`` says which case applied.
+        """
+        months = _ordered(self.months)
+        headcount = np.array([
+            salespeople[month] if isinstance(salespeople, dict) else salespeople for month in months
+        ], dtype=float)
+        leads, worked = np.array([self.months[month] for month in months], dtype=float).T
+        staffed = headcount > 0
+        if not staffed.any():
+            raise ValueError("Capacity needs a positive headcount")
+        per_agent = worked[staffed] / headcount[staffed]
+        saturated = worked[staffed] < leads[staffed]
+        if saturated.any():
+            return {'max_leads_per_salesperson': float(per_agent[saturated].mean()), 'capacity_bound': True}
+        return {'max_leads_per_salesperson': float(per_agent.max()), 'capacity_bound': False}
+
+    def fit(self, salespeople=None, base=None):
+        """Return a ModelConfig calibrated from the counts
+
+        Starts from ``base`` (default ModelConfig()) and replaces the quality
+        mix and ``base_leads`` (mean leads per month). When ``salespeople`` is
+        given, ``max_leads_per_salesperson`` is estimated with capacity() and
+        ``base_salespeople`` is the latest month's headcount.
+        """
+        base = base or ModelConfig()
+        if not self.months:
+            raise ValueError("No lead records to calibrate from")
+        changes = {
+            'lead_quality_distribution': self.quality_distribution(thaw_quality(base.lead_quality_distribution)),
+            'base_leads': float(np.mean([leads for leads, _ in self.months.values()]))
+        }
+        if salespeople is not None:
+            changes['max_leads_per_salesperson'] = self.capacity(salespeople)['max_leads_per_salesperson']
+            latest = _ordered(self.months)[-1]
+            changes['base_salespeople'] = int(salespeople[latest] if isinstance(salespeople, dict) else salespeople)
+        return base.replace(**changes)
+
+
+def _ordered(keys):
+    """Sort tier or month keys, by their text when they are of mixed types"""
+    try:
+        return sorted(keys)
+    except TypeError:
+        return sorted(keys, key=str)
+
+
+def _add(counts, key, values):
+    if hasattr(key, 'item'):
+        key = key.item()
+    current = counts.setdefault(key, [0] * len(values))
+    for i, value in enumerate(values):
+        current[i] += int(value)
+
+
+def file_stats(path, batch_size=250000, format=None):
+    """CalibrationStats for one CSV, JSON Lines or Parquet file, read in chunks"""
+    stats = CalibrationStats()
+    for frame in iter_frames(path, batch_size=batch_size, format=format, columns=RECORD_COLUMNS):
+        stats.update(frame)
+    return stats
+
+
+def collect_stats(paths, batch_size=250000, format=None, workers=1):
+    """Merged CalibrationStats for several files
+
+    Files are read in-process when ``workers`` is 0 or 1 or there is only one
+    file; otherwise each file is counted in a ProcessPoolExecutor with
+    ``workers`` processes (None for the CPU count).
+    """
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1 or len(paths) <= 1:
+        results = (file_stats(path, batch_size, format) for path in paths)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(paths))) as pool:
+            results = list(pool.map(file_stats, paths, repeat(batch_size), repeat(format)))
+
+    stats = CalibrationStats()
+    for result in results:
+        stats.merge(result)
+    return stats
+
+
+def calibrate(paths, salespeople=None, base=None, batch_size=250000, format=None, workers=1):
+    """Fit a ModelConfig from historical lead records in one or more files
+
+    Each record has a quality ``tier``, whether it was ``worked``, whether it
+    ``converted`` and its ``month``. See CalibrationStats.fit for what is
+    estimated.
+    """
+    return collect_stats(paths, batch_size=batch_size, format=format, workers=workers).fit(salespeople, base)
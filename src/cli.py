@@ -0,0 +1,236 @@
+"""Headless command-line interface for the call center model
+
+Usage:
+    call-center-model recommend --investment 50000
+    call-center-model --config model.json optimize --investment 200000
+    call-center-model --base-leads 7300 metrics --multipliers 1.0 1.5 2.0
+    call-center-model batch configs.csv results.parquet --budgets 10000 50000 --workers 4
+    call-center-model serve --port 8080
+    call-center-model calibrate leads-*.parquet --salespeople 40 --output model.json
+    call-center-model --config model.json surface surfaces/ --leads 0 20000 --headcount 1 50
+
+Only NumPy is imported, so short-lived jobs start quickly. Results are
+printed as JSON (or ``--format text``); ``batch`` writes its results to a
+file and prints throughput stats. ``--timings`` prints per-stage timings
+to stderr and ``--profile FILE`` saves a cProfile dump. Exits with status 1
+on invalid inputs and 2 on invalid arguments.
+"""
+import argparse
+import json
+import sys
+from contextlib import nullcontext
+
+from .main import CallCenterModel
+from .utils.instrumentation import instrument, profile_call
+from .writers import jsonable
+
+# Scalar model arguments that can be set from the command line
+MODEL_OPTIONS = {
+    'base_leads': float,
+    'base_salespeople': int,
+    'max_leads_per_salesperson': float,
+    'salesperson_cost': float,
+    'max_cac': float
+}
+
+
+def load_model(args):
+    """Build a CallCenterModel from ``--config`` JSON and command-line overrides"""
+    kwargs = {}
+    if args.config:
+        with open(args.config) as f:
+            kwargs.update(json.load(f))
+    for name in MODEL_OPTIONS:
+        value = getattr(args, name)
+        if value is not None:
+            kwargs[name] = value
+    return CallCenterModel(**kwargs)
+
+
+def run_recommend(model, args):
+    result = model.get_investment_recommendation(args.investment, salespeople=args.salespeople)
+    return {key: value for key, value in result.items() if not key.endswith('_metrics')}
+
+
+def run_optimize(model, args):
+    return model.optimize_investment(args.investment, salespeople=args.salespeople)
+
+
+def run_metrics(model, args):
+    columns = model.calculate_metric_columns(args.multipliers, salespeople=args.salespeople)
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def _report_progress(stats):
+    print(f"{stats['configs']} configs, {stats['rows']} rows written", file=sys.stderr)
+
+
+def run_batch(model, args):
+    from .batch import run_batch_file
+
+    return run_batch_file(
+        args.input, args.output, budgets=args.budgets, chunk_size=args.chunk_size, workers=args.workers,
+        input_format=args.input_format, output_format=args.output_format,
+        progress=_report_progress if args.progress else None
+    )
+
+
+def run_calibrate(model, args):
+    from .calibration import calibrate
+    from .config import ModelConfig
+
+    config = calibrate(
+        args.inputs, salespeople=args.salespeople, base=ModelConfig.from_model(model),
+        batch_size=args.batch_size, format=args.input_format, workers=args.workers
+    )
+    kwargs = config.model_kwargs()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(jsonable(kwargs), f, indent=2, allow_nan=False)
+    return kwargs
+
+
+def run_surface(model, args):
+    from .config import ModelConfig
+    from .surface import build_surface
+
+    surface = build_surface(
+        args.output, ModelConfig.from_model(model), leads=args.leads, salespeople=args.headcount,
+        budgets=args.budgets, lead_points=args.lead_points
+    )
+    return {
+        'path': args.output,
+        'lead_axis': surface.lead_axis,
+        'agent_axis': surface.agent_axis,
+        'bytes': surface.sales.nbytes
+    }
+
+
+def run_serve(model, args):
+    from .service import serve
+
+    print(f"Serving recommendations on http://{args.host}:{args.port}", file=sys.stderr)
+    return serve(args.host, args.port, max_batch_size=args.max_batch_size,
+                 max_wait_ms=args.max_wait_ms, cache_size=args.cache_size)
+
+
+def format_text(result):
+    """Render a result as ``key: value`` lines, one block per row"""
+    rows = result if isinstance(result, list) else [result]
+    blocks = []
+    for row in rows:
+        lines = []
+        for key, value in row.items():
+            if isinstance(value, float):
+                value = f"{value:,.2f}"
+            lines.append(f"{key}: {value}")
+        blocks.append('\n'.join(lines))
+    return '\n\n'.join(blocks)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='call-center-model', description="Evaluate the call center model without the UI")
+    parser.add_argument('--config', help="JSON file of CallCenterModel arguments")
+    for name, kind in MODEL_OPTIONS.items():
+        parser.add_argument('--' + name.replace('_', '-'), dest=name, type=kind, help=f"override {name}")
+    parser.add_argument('--format', choices=['json', 'text'], default='json', help="output format (default json)")
+    parser.add_argument('--timings', action='store_true', help="print per-stage timings to stderr")
+    parser.add_argument('--profile', metavar='FILE', help="write a cProfile dump of the command to FILE")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    recommend = commands.add_parser('recommend', help="leads vs people recommendation for an investment")
+    recommend.add_argument('--investment', type=float, required=True)
+    recommend.set_defaults(run=run_recommend)
+
+    optimize = commands.add_parser('optimize', help="best split of an investment between agents and leads")
+    optimize.add_argument('--investment', type=float, required=True)
+    optimize.set_defaults(run=run_optimize)
+
+    metrics = commands.add_parser('metrics', help="lead multiplier and extra agent scenarios")
+    metrics.add_argument('--multipliers', type=float, nargs='+', help="lead multipliers (default 1.0 to 2.0)")
+    metrics.set_defaults(run=run_metrics)
+
+    for command in (recommend, optimize, metrics):
+        command.add_argument('--salespeople', type=int, help="headcount to evaluate instead of base_salespeople")
+
+    formats = ['csv', 'jsonl', 'parquet']
+    batch = commands.add_parser(
+        'batch', help="recommendations for many configurations read from a file",
+        description="Each input row holds CallCenterModel arguments (missing ones use the model defaults; "
+                    "the quality mix and rate card may be JSON text). Model options before the command are ignored."
+    )
+    batch.add_argument('input', help="CSV, JSON Lines or Parquet file of configurations")
+    batch.add_argument('output', help="CSV, JSON Lines or Parquet file to write")
+    batch.add_argument('--budgets', type=float, nargs='+',
+                       help="investment amounts to evaluate for every configuration "
+                            "(default: each row's investment_amount column)")
+    batch.add_argument('--chunk-size', type=int, default=10000, help="configurations per chunk (default 10000)")
+    batch.add_argument('--workers', type=int, default=1, help="worker processes (default 1, 0 for in-process)")
+    batch.add_argument('--input-format', choices=formats, help="override the format inferred from the input extension")
+    batch.add_argument('--output-format', choices=formats, help="override the format inferred from the output extension")
+    batch.add_argument('--progress', action='store_true', help="report progress on stderr after each chunk")
+    batch.set_defaults(run=run_batch)
+
+    calibrate = commands.add_parser(
+        'calibrate', help="fit the quality mix and capacity from historical lead records",
+        description="Each record has tier, worked, converted and month columns. Files are read in chunks; "
+                    "model options before the command set everything that is not estimated."
+    )
+    calibrate.add_argument('inputs', nargs='+', help="CSV, JSON Lines or Parquet files of lead records")
+    calibrate.add_argument('--salespeople', type=int,
+                           help="headcount over the period, to estimate max_leads_per_salesperson")
+    calibrate.add_argument('--output', help="also write the configuration as JSON for --config")
+    calibrate.add_argument('--batch-size', type=int, default=250000, help="records per chunk (default 250000)")
+    calibrate.add_argument('--workers', type=int, default=1, help="worker processes across files (default 1)")
+    calibrate.add_argument('--input-format', choices=formats, help="override the format inferred from the extensions")
+    calibrate.set_defaults(run=run_calibrate)
+
+    surface = commands.add_parser(
+        'surface', help="precompute a response surface for instant lookups (see src.surface)",
+        description="Evaluates the model on a grid of lead volumes and headcounts covering the given ranges "
+                    "and writes surface.npy and surface.json into OUTPUT."
+    )
+    surface.add_argument('output', help="directory to write the surface into")
+    surface.add_argument('--leads', type=float, nargs=2, default=[0, 20000], metavar=('LOW', 'HIGH'),
+                         help="base lead volumes to cover (default 0 20000)")
+    surface.add_argument('--headcount', type=int, nargs=2, default=[1, 50], metavar=('LOW', 'HIGH'),
+                         help="base headcounts to cover (default 1 50)")
+    surface.add_argument('--budgets', type=float, nargs=2, default=[0, 200000], metavar=('LOW', 'HIGH'),
+                         help="investment amounts to cover (default 0 200000)")
+    surface.add_argument('--lead-points', type=int, default=2049, help="grid points along lead volume (default 2049)")
+    surface.set_defaults(run=run_surface)
+
+    serve = commands.add_parser('serve', help="HTTP/JSON recommendation service (see src.service)")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8080)
+    serve.add_argument('--max-batch-size', type=int, default=256, help="requests evaluated together (default 256)")
+    serve.add_argument('--max-wait-ms', type=float, default=2.0, help="how long a request waits for a batch (default 2)")
+    serve.add_argument('--cache-size', type=int, default=4096, help="cached recommendations (default 4096)")
+    serve.set_defaults(run=run_serve)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        model = None if args.command in ('batch', 'serve') else load_model(args)
+        with instrument() if args.timings else nullcontext() as stats:
+            if args.profile:
+                result, _ = profile_call(args.run, model, args, output=args.profile)
+            else:
+                result = args.run(model, args)
+    except (ImportError, KeyError, OSError, TypeError, ValueError) as error:
+        print(f"error: {error}", file=sys.stderr)
+        return 1
+    if stats is not None:
+        print(stats.report(), file=sys.stderr)
+
+    if args.format == 'json':
+        print(json.dumps(jsonable(result), indent=2, allow_nan=False))
+    else:
+        print(format_text(result))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
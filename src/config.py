@@ -0,0 +1,87 @@
+import dataclasses
+import inspect
+
+from .main import CallCenterModel
+from .utils.calculations import tier_volume
+
+# Constructor arguments of CallCenterModel with their defaults
+MODEL_DEFAULTS = {
+    name: parameter.default
+    for name, parameter in inspect.signature(CallCenterModel.__init__).parameters.items()
+    if name != 'self'
+}
+
+
+def freeze_quality(lead_quality_distribution):
+    """Convert a lead_quality_distribution dict into a hashable tuple
+
+    Each entry is ``(tier, conversion_rate, distribution)``, sorted by tier name.
+    """
+    return tuple(
+        (tier, float(values['conversion_rate']), float(values['distribution']))
+        for tier, values in sorted(lead_quality_distribution.items())
+    )
+
+
+def thaw_quality(frozen_quality):
+    """Convert a frozen quality tuple back into a lead_quality_distribution dict"""
+    return {
+        tier: {'conversion_rate': conversion_rate, 'distribution': distribution}
+        for tier, conversion_rate, distribution in frozen_quality
+    }
+
+
+def freeze_tiers(lead_cost_tiers):
+    """Convert a lead_cost_tiers list into a hashable tuple of (volume, cost)"""
+    return tuple((tier_volume(tier), float(tier['cost'])) for tier in lead_cost_tiers)
+
+
+def thaw_tiers(frozen_tiers):
+    """Convert frozen tiers back into a lead_cost_tiers list"""
+    return [{'volume': volume, 'cost': cost} for volume, cost in frozen_tiers]
+
+
+@dataclasses.dataclass(frozen=True)
+class ModelConfig:
+    """Immutable, hashable snapshot of a CallCenterModel's inputs
+
+    Quality mix and rate card are stored as tuples so equal inputs hash
+    equally and a config can key a cache. Dicts and lists are accepted and
+    frozen on construction.
+    """
+    base_leads: float = MODEL_DEFAULTS['base_leads']
+    base_salespeople: int = MODEL_DEFAULTS['base_salespeople']
+    max_leads_per_salesperson: float = MODEL_DEFAULTS['max_leads_per_salesperson']
+    salesperson_cost: float = MODEL_DEFAULTS['salesperson_cost']
+    max_cac: float = MODEL_DEFAULTS['max_cac']
+    lead_quality_distribution: tuple = freeze_quality(MODEL_DEFAULTS['lead_quality_distribution'])
+    lead_cost_tiers: tuple = freeze_tiers(MODEL_DEFAULTS['lead_cost_tiers'])
+    capacity_model: object = MODEL_DEFAULTS['capacity_model']
+
+    def __post_init__(self):
+        if isinstance(self.lead_quality_distribution, dict):
+            object.__setattr__(self, 'lead_quality_distribution', freeze_quality(self.lead_quality_distribution))
+        if any(isinstance(tier, dict) for tier in self.lead_cost_tiers):
+            object.__setattr__(self, 'lead_cost_tiers', freeze_tiers(self.lead_cost_tiers))
+        elif not isinstance(self.lead_cost_tiers, tuple):
+            object.__setattr__(self, 'lead_cost_tiers', tuple(tuple(tier) for tier in self.lead_cost_tiers))
+
+    @classmethod
+    def from_model(cls, model):
+        """Snapshot the current inputs of a CallCenterModel"""
+        return cls(**{name: getattr(model, name) for name in MODEL_DEFAULTS})
+
+    def model_kwargs(self):
+        """Return CallCenterModel constructor arguments for this config"""
+        kwargs = {name: getattr(self, name) for name in MODEL_DEFAULTS}
+        kwargs['lead_quality_distribution'] = thaw_quality(self.lead_quality_distribution)
+        kwargs['lead_cost_tiers'] = thaw_tiers(self.lead_cost_tiers)
+        return kwargs
+
+    def to_model(self):
+        """Build a CallCenterModel from this config"""
+        return CallCenterModel(**self.model_kwargs())
+
+    def replace(self, **changes):
+        """Return a copy of this config with some fields changed"""
+        return dataclasses.replace(self, **changes)
@@ -0,0 +1,160 @@
+import numpy as np
+
+from .utils.calculations import fill_capacity, safe_divide
+from .utils.capacity import LinearCapacity
+from .utils.frames import to_frame
+from .utils.instrumentation import timed
+
+# Per-period result columns, in output order
+PERIOD_COLUMNS = [
+    'sales',
+    'handled_leads',
+    'lead_cost',
+    'agent_cost',
+    'total_cost',
+    'total_cac'
+]
+
+
+class HorizonSimulator:
+    """Period-by-period plan built on a CallCenterModel
+
+    ``leads`` and ``salespeople`` hold one value per period (months, days,
+    ...); the model supplies conversion, capacity and prices. New hires work
+    at ``ramp[i]`` of full productivity in their i-th period and at full
+    productivity after that, but are paid in full from day one. Lead prices
+    restart from the bottom of the rate card every
+    ``periods_per_billing_cycle`` periods.
+
+    Results are kept between edits: ``update`` re-evaluates only the periods
+    whose inputs actually changed and rolls the cumulative totals forward from
+    the first of them.
+    """
+
+    def __init__(self, model, leads, salespeople=None, ramp=(), periods_per_billing_cycle=1):
+        if periods_per_billing_cycle < 1:
+            raise ValueError("periods_per_billing_cycle must be at least 1")
+        self.model = model
+        self.leads = np.array(leads, dtype=float).reshape(-1)
+        self.periods = len(self.leads)
+        if salespeople is None:
+            salespeople = model.base_salespeople
+        self.salespeople = np.array(np.broadcast_to(salespeople, self.periods), dtype=float)
+        self.ramp = np.asarray(ramp, dtype=float).reshape(-1)
+        self.periods_per_billing_cycle = int(periods_per_billing_cycle)
+
+        self.hires = np.maximum(np.diff(self.salespeople, prepend=model.base_salespeople), 0)
+        self.effective_salespeople = self._effective(0, self.periods)
+        self.cycle_leads = self._cycle_leads(0, self.periods)
+        self.metrics = {name: np.zeros(self.periods) for name in PERIOD_COLUMNS}
+        self.cumulative = {name: np.zeros(self.periods) for name in ('sales', 'total_cost', 'total_cac')}
+        self.last_recomputed = np.arange(self.periods)
+        self._evaluate(self.last_recomputed)
+        self._roll_forward(0)
+
+    def __len__(self):
+        return self.periods
+
+    def _effective(self, start, stop):
+        """Productive headcount for periods start..stop - 1 after ramp-up losses"""
+        effective = self.salespeople[start:stop].copy()
+        for age, productivity in enumerate(self.ramp):
+            first = max(start - age, 0)
+            if first >= stop - age:
+                continue
+            hires = self.hires[first:stop - age]
+            effective[first + age - start:] -= hires * (1 - productivity)
+        return np.maximum(effective, 0)
+
+    def _cycle_leads(self, start, stop):
+        """Leads bought so far in each period's billing cycle, for whole cycles"""
+        cycle = self.periods_per_billing_cycle
+        cycle_leads = np.empty(stop - start)
+        for cycle_start in range(start, stop, cycle):
+            cycle_stop = min(cycle_start + cycle, stop)
+            cycle_leads[cycle_start - start:cycle_stop - start] = np.cumsum(self.leads[cycle_start:cycle_stop])
+        return cycle_leads
+
+    @timed('horizon.evaluate')
+    def _evaluate(self, periods):
+        """Recompute the per-period metrics of the given period indices"""
+        if len(periods) == 0:
+            return
+        model = self.model
+        leads = self.leads[periods]
+        capacity_model = model.capacity_model if model.capacity_model is not None else LinearCapacity()
+        max_capacity = capacity_model.handled_capacity(
+            leads, self.effective_salespeople[periods], model.max_leads_per_salesperson
+        )
+        handled_leads, sales = fill_capacity(leads, max_capacity, model.tier_distribution, model.tier_conversion)
+
+        # Price each period at the marginal rate reached within its billing cycle
+        cycle_leads = self.cycle_leads[periods]
+        lead_cost = model.lead_cost_table.cost(cycle_leads) - model.lead_cost_table.cost(cycle_leads - leads)
+        agent_cost = self.salespeople[periods] * model.salesperson_cost
+        total_cost = lead_cost + agent_cost
+
+        self.metrics['sales'][periods] = sales
+        self.metrics['handled_leads'][periods] = handled_leads
+        self.metrics['lead_cost'][periods] = lead_cost
+        self.metrics['agent_cost'][periods] = agent_cost
+        self.metrics['total_cost'][periods] = total_cost
+        self.metrics['total_cac'][periods] = safe_divide(total_cost, sales)
+
+    def _roll_forward(self, start):
+        """Rebuild cumulative totals from period ``start`` to the end of the horizon"""
+        for name in ('sales', 'total_cost'):
+            previous = self.cumulative[name][start - 1] if start > 0 else 0.0
+            self.cumulative[name][start:] = previous + np.cumsum(self.metrics[name][start:])
+        self.cumulative['total_cac'][start:] = safe_divide(
+            self.cumulative['total_cost'][start:], self.cumulative['sales'][start:]
+        )
+
+    def update(self, period, leads=None, salespeople=None):
+        """Change one period's inputs and recompute what depends on them
+
+        A lead change re-prices the rest of that billing cycle; a headcount
+        change affects the ramp of the hires it implies. Returns the indices
+        of the periods whose metrics were re-evaluated.
+        """
+        if not 0 <= period < self.periods:
+            raise IndexError(f"period {period} is outside the {self.periods}-period horizon")
+        changed = set()
+
+        if leads is not None and leads != self.leads[period]:
+            self.leads[period] = leads
+            cycle_start = period - period % self.periods_per_billing_cycle
+            cycle_stop = min(cycle_start + self.periods_per_billing_cycle, self.periods)
+            self.cycle_leads[cycle_start:cycle_stop] = self._cycle_leads(cycle_start, cycle_stop)
+            changed.update(range(period, cycle_stop))
+
+        if salespeople is not None and salespeople != self.salespeople[period]:
+            self.salespeople[period] = salespeople
+            stop = min(period + 2, self.periods)
+            previous = self.salespeople[period - 1] if period > 0 else self.model.base_salespeople
+            self.hires[period:stop] = np.maximum(np.diff(self.salespeople[period:stop], prepend=previous), 0)
+            # Those hires ramp up over the following len(ramp) periods
+            stop = min(period + len(self.ramp) + 1, self.periods)
+            self.effective_salespeople[period:stop] = self._effective(period, stop)
+            changed.update(range(period, stop))
+
+        self.last_recomputed = np.array(sorted(changed), dtype=np.int64)
+        if changed:
+            self._evaluate(self.last_recomputed)
+            self._roll_forward(int(self.last_recomputed[0]))
+        return self.last_recomputed
+
+    def results(self):
+        """Return per-period and cumulative results as a dict of arrays"""
+        return {
+            'period': np.arange(self.periods),
+            'leads': self.leads.copy(),
+            'salespeople': self.salespeople.copy(),
+            'effective_salespeople': self.effective_salespeople.copy(),
+            **{name: values.copy() for name, values in self.metrics.items()},
+            **{f'cumulative_{name}': values.copy() for name, values in self.cumulative.items()}
+        }
+
+    def to_frame(self):
+        """Return results() as a DataFrame with one row per period"""
+        return to_frame(self.results())
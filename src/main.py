@@ -1,6 +1,31 @@
+"""Call center investment model
+
+The module is part of the ``src`` package and uses relative imports, so run
+it as ``python -m src.main`` from the project root (the same as
+``python -m src.cli`` or the installed ``call-center-model`` command), not as
+``python src/main.py``.
+"""
 # Import required libraries
+import sys
+
 import numpy as np
-import pandas as pd
+
+from .utils.breakeven import break_even, lead_breakpoints, sensitivities
+from .utils.calculations import (
+    LeadCostTable,
+    investment_recommendation,
+    quality_tiers,
+    scenario_labels,
+    scenario_metrics
+)
+from .utils.frames import to_frame
+from .utils.instrumentation import timed
+from .horizon import HorizonSimulator
+from .montecarlo import risk_adjusted_recommendation
+from .utils.optimizer import optimal_split
+from .utils.ratecards import compare_rate_cards
+from .utils.results import ScenarioResults
+from .whatif import WhatIfModel
 
 class CallCenterModel:
     def __init__(self, 
@@ -28,7 +53,8 @@ class CallCenterModel:
                      {'volume': 2000, 'cost': 52},    
                      {'volume': 5000, 'cost': 64},    
                      {'volume': float('inf'), 'cost': 80}  
-                 ]):
+                 ],
+                 capacity_model=None):  # None = linear max_leads_per_salesperson cap
         self.base_leads = base_leads
         self.base_salespeople = base_salespeople
         self.max_leads_per_salesperson = max_leads_per_salesperson
@@ -36,210 +62,342 @@ class CallCenterModel:
         self.max_cac = max_cac  # Store CAC limit
         self.lead_quality_distribution = lead_quality_distribution
         self.lead_cost_tiers = lead_cost_tiers
+        self.capacity_model = capacity_model  # e.g. ErlangA from src.utils.capacity
+
+    @property
+    def lead_quality_distribution(self):
+        return self._lead_quality_distribution
 
+    @lead_quality_distribution.setter
+    def lead_quality_distribution(self, lead_quality_distribution):
+        # Keep tiers as parallel arrays sorted by conversion rate, best first
+        tier_names, tier_distribution, tier_conversion = quality_tiers(lead_quality_distribution)
+        self._lead_quality_distribution = lead_quality_distribution
+        self.tier_names = tier_names
+        self.tier_distribution = tier_distribution
+        self.tier_conversion = tier_conversion
+
+    @property
+    def lead_cost_tiers(self):
+        return self._lead_cost_tiers
+
+    @lead_cost_tiers.setter
+    def lead_cost_tiers(self, lead_cost_tiers):
+        # Rebuild the cumulative price index whenever the rate card changes.
+        # The table is built before it is published so readers never see a half-built index.
+        lead_cost_table = LeadCostTable(lead_cost_tiers)
+        self._lead_cost_tiers = lead_cost_tiers
+        self.lead_cost_table = lead_cost_table
+
+    @timed('model.calculate_lead_cost')
     def calculate_lead_cost(self, total_leads):
-        """Calculate total cost for a given number of leads using tiered pricing"""
-        total_cost = 0
-        remaining_leads = total_leads
-        
-        for tier in self.lead_cost_tiers:
-            if remaining_leads <= 0:
-                break
-                
-            # Calculate leads in this tier
-            prev_volume = 0 if self.lead_cost_tiers.index(tier) == 0 else self.lead_cost_tiers[self.lead_cost_tiers.index(tier)-1]['volume']
-            tier_volume = tier['volume'] - prev_volume
-            leads_in_tier = min(remaining_leads, tier_volume)
-            
-            # Add cost for this tier
-            total_cost += leads_in_tier * tier['cost']
-            remaining_leads -= leads_in_tier
-            
-        return total_cost
-
-    def calculate_metrics(self, lead_multipliers=None, investment_amount=None):
-        results = []
-        
+        """Calculate total cost for a given number of leads using tiered pricing
+
+        Accepts a scalar or an array of lead volumes.
+        """
+        cost = self.lead_cost_table.cost(total_leads)
+        return float(cost) if np.ndim(cost) == 0 else cost
+
+    @timed('model.calculate_leads_for_budget')
+    def calculate_leads_for_budget(self, investment_amount, start_leads=None):
+        """Calculate how many extra leads an investment buys at marginal tier prices
+
+        Purchases start at ``start_leads`` (defaults to base_leads). Accepts
+        scalars or arrays.
+        """
+        if start_leads is None:
+            start_leads = self.base_leads
+        leads = self.lead_cost_table.leads_for_budget(investment_amount, start_leads)
+        return float(leads) if np.ndim(leads) == 0 else leads
+
+    def _tier_arrays(self):
+        """Return distribution and conversion arrays in fill order"""
+        return self.tier_distribution, self.tier_conversion
+
+    def _metric_arrays(self, total_leads, salespeople):
+        """Evaluate all metrics for arrays of lead volumes and headcounts"""
+        distribution, conversion = self._tier_arrays()
+        return scenario_metrics(
+            total_leads,
+            salespeople,
+            self.max_leads_per_salesperson,
+            self.salesperson_cost,
+            distribution,
+            conversion,
+            self.lead_cost_table,
+            self.capacity_model
+        )
+
+    def _scenario_batch(self, multipliers, salespeople):
+        """Evaluate one flat batch of lead multipliers and headcounts into columns"""
+        metrics = self._metric_arrays(self.base_leads * multipliers, salespeople)
+        return {'scenario': scenario_labels(multipliers), **metrics}
+
+    @timed('model.evaluate_scenarios')
+    def evaluate_scenarios(self, lead_multipliers, salespeople=None):
+        """Evaluate many lead multipliers (and optional headcounts) in one vectorized pass
+
+        ``lead_multipliers`` and ``salespeople`` may be scalars or arrays and are
+        broadcast against each other. Returns the same columns as calculate_metrics.
+        """
+        multipliers = np.asarray(lead_multipliers, dtype=float)
+        if salespeople is None:
+            salespeople = self.base_salespeople
+        multipliers, salespeople = np.broadcast_arrays(multipliers, np.asarray(salespeople))
+        return to_frame(self._scenario_batch(multipliers.ravel(), salespeople.ravel()))
+
+    def iter_scenarios(self, lead_multipliers, salespeople=None, batch_size=65536):
+        """Yield evaluate_scenarios results as fixed-size batches of columns
+
+        Each batch is a dict mapping the calculate_metrics column names to
+        arrays of at most ``batch_size`` rows, so memory stays flat however many
+        scenarios are swept. Batches can be passed straight to the writers in
+        src.writers.
+        """
+        multipliers = np.asarray(lead_multipliers, dtype=float)
+        if salespeople is None:
+            salespeople = self.base_salespeople
+        multipliers, salespeople = np.broadcast_arrays(multipliers, np.asarray(salespeople))
+        multipliers = multipliers.reshape(-1)
+        salespeople = salespeople.reshape(-1)
+
+        for start in range(0, len(multipliers), batch_size):
+            stop = start + batch_size
+            yield self._scenario_batch(multipliers[start:stop], salespeople[start:stop])
+
+    @timed('model.evaluate_scenario_results')
+    def evaluate_scenario_results(self, lead_multipliers, salespeople=None):
+        """evaluate_scenarios as a ScenarioResults (src.utils.results) instead of a DataFrame
+
+        Rows carry their multiplier and whole extra agents over
+        base_salespeople as numeric columns, so large sweeps skip the text
+        labels and can be filtered by kind.
+        """
+        multipliers = np.asarray(lead_multipliers, dtype=float)
+        if salespeople is None:
+            salespeople = self.base_salespeople
+        multipliers, salespeople = [values.ravel() for values in np.broadcast_arrays(multipliers, np.asarray(salespeople))]
+        additional_agents = salespeople - self.base_salespeople
+        if not np.array_equal(additional_agents, np.round(additional_agents)):
+            raise ValueError("Scenario results need whole headcounts")
+        metrics = self._metric_arrays(self.base_leads * multipliers, salespeople)
+        return ScenarioResults.from_scenarios(multipliers, additional_agents, metrics)
+
+    @timed('model.scenario_results')
+    def scenario_results(self, lead_multipliers=None, salespeople=None):
+        """Evaluate lead-multiplier scenarios and +1..+3 agent scenarios into a ScenarioResults
+
+        Lead rows have kind 'leads' and agent rows kind 'agents', with the
+        extra agents counted from ``salespeople`` (base_salespeople by default).
+        """
+        if salespeople is None:
+            salespeople = self.base_salespeople
+
         # Lead scenarios
         multipliers_to_use = lead_multipliers if lead_multipliers is not None else np.arange(1.0, 2.1, 0.1)
-        for multiplier in multipliers_to_use:
-            total_leads = self.base_leads * multiplier
-            max_capacity = self.base_salespeople * self.max_leads_per_salesperson
-            
-            leads_by_quality = {
-                tier: {
-                    'total': total_leads * dist['distribution'],
-                    'conversion': dist['conversion_rate']
-                }
-                for tier, dist in self.lead_quality_distribution.items()
-            }
-            
-            remaining_capacity = max_capacity
-            handled_leads = 0
-            total_conversions = 0
-            
-            for tier in ['A', 'B', 'C']:
-                tier_leads = leads_by_quality[tier]['total']
-                leads_handled = min(remaining_capacity, tier_leads)
-                handled_leads += leads_handled
-                total_conversions += leads_handled * leads_by_quality[tier]['conversion']
-                remaining_capacity -= leads_handled
-                if remaining_capacity <= 0:
-                    break
-            
-            lead_cost = self.calculate_lead_cost(total_leads)
-            total_cost = lead_cost + (self.salesperson_cost * self.base_salespeople)
-            cost_per_sale = total_cost / total_conversions if total_conversions > 0 else float('inf')
-            
-            # Calculate separate CACs for detailed view only
-            lead_cac = lead_cost / total_conversions if total_conversions > 0 else float('inf')
-            agent_cac = (self.salesperson_cost * self.base_salespeople) / total_conversions if total_conversions > 0 else float('inf')
-            
-            results.append({
-                'scenario': f"{multiplier:.1f}x leads",
-                'sales': total_conversions,
-                'total_cac': cost_per_sale,    # Renamed for clarity
-                'lead_cac': lead_cac,
-                'agent_cac': agent_cac,
-                'handled_leads': handled_leads,
-                'total_leads': total_leads,
-                'total_cost': total_cost,
-                'lead_cost': lead_cost,
-                'agent_cost': self.salesperson_cost * self.base_salespeople
-            })
-        
+        multipliers = np.atleast_1d(np.asarray(multipliers_to_use, dtype=float))
+
         # Agent scenarios
-        original_salespeople = self.base_salespeople
-        for additional_agents in range(1, 4):
-            new_total = original_salespeople + additional_agents
-            self.base_salespeople = new_total
-            
-            total_leads = self.base_leads
-            max_capacity = self.base_salespeople * self.max_leads_per_salesperson
-            
-            leads_by_quality = {
-                tier: {
-                    'total': total_leads * dist['distribution'],
-                    'conversion': dist['conversion_rate']
-                }
-                for tier, dist in self.lead_quality_distribution.items()
-            }
-            
-            remaining_capacity = max_capacity
-            handled_leads = 0
-            total_conversions = 0
-            
-            for tier in ['A', 'B', 'C']:
-                tier_leads = leads_by_quality[tier]['total']
-                leads_handled = min(remaining_capacity, tier_leads)
-                handled_leads += leads_handled
-                total_conversions += leads_handled * leads_by_quality[tier]['conversion']
-                remaining_capacity -= leads_handled
-                if remaining_capacity <= 0:
-                    break
-            
-            lead_cost = self.calculate_lead_cost(total_leads)
-            agent_cost = self.salesperson_cost * self.base_salespeople
-            total_cost = lead_cost + agent_cost
-            cost_per_sale = total_cost / total_conversions if total_conversions > 0 else float('inf')
-            
-            # Calculate separate CACs for detailed view only
-            lead_cac = lead_cost / total_conversions if total_conversions > 0 else float('inf')
-            agent_cac = (self.salesperson_cost * self.base_salespeople) / total_conversions if total_conversions > 0 else float('inf')
-            
-            results.append({
-                'scenario': f"+{additional_agents} agent{'s' if additional_agents > 1 else ''}",
-                'sales': total_conversions,
-                'total_cac': cost_per_sale,    # Renamed for clarity
-                'lead_cac': lead_cac,
-                'agent_cac': agent_cac,
-                'handled_leads': handled_leads,
-                'total_leads': total_leads,
-                'total_cost': total_cost,
-                'lead_cost': lead_cost,
-                'agent_cost': agent_cost
-            })
-        
-        self.base_salespeople = original_salespeople
-        return pd.DataFrame(results)
-
-    def get_investment_recommendation(self, investment_amount):
-        """Analyze whether to invest in more leads, more salespeople, or nothing"""
-        # Calculate baseline metrics
-        base_metrics = self.calculate_metrics([1.0]).iloc[0]
-        current_cac = base_metrics['total_cac']
+        additional_agents = np.arange(1, 4)
+
+        # Evaluate both scenario groups in a single vectorized pass
+        total_leads = np.concatenate([self.base_leads * multipliers, np.full(len(additional_agents), self.base_leads, dtype=float)])
+        headcounts = np.concatenate([np.full(len(multipliers), salespeople), salespeople + additional_agents])
+        metrics = self._metric_arrays(total_leads, headcounts)
+
+        kind = np.repeat(np.array([0, 1], dtype=np.int8), [len(multipliers), len(additional_agents)])
+        return ScenarioResults(
+            kind,
+            np.concatenate([multipliers, np.ones(len(additional_agents))]),
+            np.concatenate([np.zeros(len(multipliers), dtype=int), additional_agents]),
+            metrics
+        )
+
+    @timed('model.calculate_metric_columns')
+    def calculate_metric_columns(self, lead_multipliers=None, salespeople=None):
+        """Evaluate lead-multiplier scenarios and +1..+3 agent scenarios into a dict of columns
+
+        Same results as calculate_metrics without building a DataFrame, so it
+        only needs NumPy.
+        """
+        return self.scenario_results(lead_multipliers, salespeople).as_columns()
+
+    @timed('model.calculate_metrics')
+    def calculate_metrics(self, lead_multipliers=None, investment_amount=None, salespeople=None):
+        """Evaluate lead-multiplier scenarios and +1..+3 agent scenarios
+
+        ``salespeople`` overrides base_salespeople for this call only; the model
+        itself is never modified, so one instance can be shared across threads.
+        """
+        return to_frame(self.calculate_metric_columns(lead_multipliers, salespeople))
+
+    @timed('model.get_investment_recommendation')
+    def get_investment_recommendation(self, investment_amount, salespeople=None, uncertainty=None):
+        """Analyze whether to invest in more leads, more salespeople, or nothing
+
+        ``salespeople`` overrides base_salespeople for this call only. Passing
+        an ``Uncertainty`` (src.montecarlo) adds a ``risk`` entry holding the
+        Monte Carlo risk-adjusted recommendation and percentile bands.
+        """
+        if salespeople is None:
+            salespeople = self.base_salespeople
         
         # Calculate how many whole agents we can hire
         additional_agents = investment_amount // self.salesperson_cost
         
-        # Calculate leads scenario
-        additional_leads_possible = investment_amount / self.calculate_lead_cost(1)  # How many leads we can buy
-        lead_multiplier = (self.base_leads + additional_leads_possible) / self.base_leads
-        leads_metrics = self.calculate_metrics([lead_multiplier]).iloc[0]
-        leads_cac = leads_metrics['total_cac']
+        # Leads bought at marginal tier prices
+        additional_leads_possible = self.calculate_leads_for_budget(investment_amount)
         
-        # Calculate people scenario
-        if additional_agents > 0:
-            original_salespeople = self.base_salespeople
-            self.base_salespeople += additional_agents
-            people_metrics = self.calculate_metrics([1.0]).iloc[0]
-            self.base_salespeople = original_salespeople  # Reset back
-            people_cac = people_metrics['total_cac']
-        else:
-            people_metrics = base_metrics
-            people_cac = current_cac
-        
-        # Determine recommendation based on CAC and incremental sales
-        leads_incremental = leads_metrics['sales'] - base_metrics['sales'] if leads_cac <= self.max_cac else 0
-        people_incremental = people_metrics['sales'] - base_metrics['sales'] if people_cac <= self.max_cac else 0
-        
-        if max(leads_incremental, people_incremental) <= 0:
-            recommendation = 'do_nothing'
-            reason = 'No investment scenario meets CAC requirements'
-        else:
-            recommendation = 'people' if people_incremental > leads_incremental else 'leads'
-            reason = f'Best incremental sales achieved by investing in {recommendation}'
-        
-        return {
-            'recommendation': recommendation,
-            'reason': reason,
-            'current_cac': current_cac,
-            'leads_cac': leads_cac,
-            'people_cac': people_cac,
-            'base_metrics': base_metrics,
-            'leads_metrics': leads_metrics,
-            'people_metrics': people_metrics,
-            'leads_incremental': leads_incremental,
-            'people_incremental': people_incremental
-        }
-
-def main():
-    # Create model with default parameters
-    model = CallCenterModel()
-    
-    # Calculate results
-    results = model.calculate_metrics()
-    
-    # Print optimal points
-    optimal_sales = results.loc[results['sales'].idxmax()]
-    optimal_cost = results.loc[results['cost_per_sale'].idxmin()]
-    
-    print("\nOptimal Points:")
-    print(f"Maximum Sales at multiplier: {optimal_sales['lead_multiplier']:.1f}")
-    print(f"- Sales: {optimal_sales['sales']:.0f}")
-    print(f"- Cost per Sale: ${optimal_sales['cost_per_sale']:.2f}")
-    print(f"\nMinimum Cost per Sale at multiplier: {optimal_cost['lead_multiplier']:.1f}")
-    print(f"- Sales: {optimal_cost['sales']:.0f}")
-    print(f"- Cost per Sale: ${optimal_cost['cost_per_sale']:.2f}")
-    
-    # Get investment recommendation
-    investment = 50000  # Example investment amount
-    recommendation = model.get_investment_recommendation(investment)
-    
-    print(f"\nInvestment Recommendation for ${investment:,}:")
-    print(f"ROI from investing in leads: {recommendation['leads_incremental'] / investment:.2%}")
-    print(f"ROI from investing in people: {recommendation['people_incremental'] / investment:.2%}")
-    print(f"Recommendation: Invest in {recommendation['recommendation']}")
+        # Evaluate baseline, leads and people scenarios in one pass
+        total_leads = [self.base_leads, self.base_leads + additional_leads_possible, self.base_leads]
+        headcounts = [salespeople, salespeople, salespeople + additional_agents]
+        metrics = self._metric_arrays(total_leads, headcounts)
+        result = investment_recommendation(metrics, self.base_leads, self.max_cac)
+        if uncertainty is not None:
+            result['risk'] = risk_adjusted_recommendation(self, investment_amount, uncertainty, salespeople=salespeople)
+        return result
+
+    @timed('model.optimize_investment')
+    def optimize_investment(self, investment_amount, salespeople=None):
+        """Find the split of an investment between agents and leads with the most sales
+
+        Unlike get_investment_recommendation, which compares spending everything
+        on one option, this considers every whole number of extra agents with the
+        remainder (or less) spent on leads, subject to max_cac. ``salespeople``
+        overrides base_salespeople for this call only.
+        """
+        if salespeople is None:
+            salespeople = self.base_salespeople
+        distribution, conversion = self._tier_arrays()
+        return optimal_split(
+            investment_amount,
+            self.base_leads,
+            salespeople,
+            self.max_leads_per_salesperson,
+            self.salesperson_cost,
+            self.max_cac,
+            distribution,
+            conversion,
+            self.lead_cost_table,
+            self.capacity_model
+        )
+
+    def lead_breakpoints(self, salespeople=None):
+        """List the lead volumes where sales or lead cost change slope
+
+        Returns a list of dicts with ``volume``, ``kind`` ('capacity' or
+        'price') and ``tier``: the quality tier that stops being fully worked,
+        or the index of the rate card tier that ends. Capacity points assume
+        linear capacity.
+        """
+        if salespeople is None:
+            salespeople = self.base_salespeople
+        volumes, kinds, tiers = lead_breakpoints(
+            self.lead_cost_table, salespeople, self.max_leads_per_salesperson, self.tier_distribution
+        )
+        return [
+            {
+                'volume': float(volume),
+                'kind': str(kind),
+                'tier': self.tier_names[tier] if kind == 'capacity' else int(tier)
+            }
+            for volume, kind, tier in zip(volumes, kinds, tiers)
+        ]
+
+    def break_even(self, salespeople=None, total_leads=None, max_cac=None):
+        """Exact lead volumes and headcounts where CAC meets max_cac
+
+        ``lead_ranges`` are the lead volumes within ``max_cac`` at
+        ``salespeople`` agents and ``salespeople_ranges`` the headcounts within
+        it at ``total_leads`` leads (both default to the base values).
+        ``saturation_leads`` and ``saturation_salespeople`` are where extra
+        leads or agents stop adding sales. Only linear capacity is piecewise
+        linear, so queueing capacity models raise ValueError.
+        """
+        if not getattr(self.capacity_model, 'piecewise_linear', True):
+            raise ValueError("break_even needs a piecewise linear capacity model")
+        if salespeople is None:
+            salespeople = self.base_salespeople
+        if total_leads is None:
+            total_leads = self.base_leads
+        if max_cac is None:
+            max_cac = self.max_cac
+        return break_even(
+            total_leads,
+            salespeople,
+            self.max_leads_per_salesperson,
+            self.salesperson_cost,
+            max_cac,
+            self.tier_distribution,
+            self.tier_conversion,
+            self.lead_cost_table
+        )
+
+    def sensitivities(self, total_leads=None, salespeople=None):
+        """Marginal sales, cost and CAC per extra lead and per extra agent
+
+        Inputs default to the base values and broadcast; scalar inputs give a
+        dict of floats, otherwise a dict of arrays. See
+        src.utils.breakeven.sensitivities.
+        """
+        if total_leads is None:
+            total_leads = self.base_leads
+        if salespeople is None:
+            salespeople = self.base_salespeople
+        result = sensitivities(
+            total_leads,
+            salespeople,
+            self.max_leads_per_salesperson,
+            self.salesperson_cost,
+            self.tier_distribution,
+            self.tier_conversion,
+            self.lead_cost_table,
+            self.capacity_model
+        )
+        if np.ndim(total_leads) == 0 and np.ndim(salespeople) == 0:
+            return {name: float(values[0]) for name, values in result.items()}
+        return result
+
+    def simulate_horizon(self, leads, salespeople=None, ramp=(), periods_per_billing_cycle=1):
+        """Plan several periods ahead from per-period lead volumes and headcounts
+
+        Returns a HorizonSimulator (src.horizon) whose ``update`` recomputes
+        only the periods affected by an edit.
+        """
+        return HorizonSimulator(self, leads, salespeople, ramp=ramp,
+                                periods_per_billing_cycle=periods_per_billing_cycle)
+
+    def compare_rate_cards(self, rate_cards, total_leads=None, salespeople=None):
+        """Compare vendor rate cards, alone and blended, at several lead volumes
+
+        ``rate_cards`` maps vendor names to lead_cost_tiers lists (or is a
+        list of them). ``total_leads`` defaults to 1.0x to 2.0x base_leads.
+        Returns per-vendor lead cost and CAC arrays shaped (vendors, volumes),
+        the cheapest vendor at each volume, the volumes where it changes, and
+        the cost, CAC, card and per-vendor split of buying from all vendors
+        cheapest tier first. This model's own rate card is not included.
+        """
+        if salespeople is None:
+            salespeople = self.base_salespeople
+        if total_leads is None:
+            total_leads = self.base_leads * np.arange(1.0, 2.1, 0.1)
+        total_leads = np.atleast_1d(np.asarray(total_leads, dtype=float))
+        sales = self._metric_arrays(total_leads, salespeople)['sales']
+        return compare_rate_cards(rate_cards, total_leads, sales, self.salesperson_cost * salespeople)
+
+    def what_if(self, investment_amount=0, lead_multipliers=None):
+        """Snapshot the inputs into a WhatIfModel (src.whatif) for incremental edits
+
+        ``update`` on the result changes one or more inputs and recomputes
+        only the results that depend on them; this model is not modified.
+        """
+        return WhatIfModel(self, investment_amount, lead_multipliers)
+
+def main(argv=None):
+    """Command-line entry point; see src.cli. Run with ``python -m src.main``"""
+    from .cli import main as cli_main
+
+    return cli_main(argv)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
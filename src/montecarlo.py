@@ -0,0 +1,140 @@
+import numpy as np
+
+from .utils.calculations import recommendation_reason, scenario_metrics
+from .utils.instrumentation import timed
+
+PERCENTILES = (10, 50, 90)
+
+
+class Uncertainty:
+    """Sampling settings for Monte Carlo evaluation of a CallCenterModel
+
+    Each tier's conversion rate is drawn from a Beta distribution centred on
+    the model's point estimate, with ``conversion_concentration`` (alpha +
+    beta) controlling how tight it is. Lead volume is scaled by a per-sample
+    factor drawn from a Poisson around base_leads (``lead_volume='poisson'``)
+    or a lognormal with coefficient of variation ``lead_volume_cv``. Samples
+    are drawn from a seeded generator, so equal settings reproduce equal
+    results.
+    """
+
+    def __init__(self, n_samples=100000, conversion_concentration=200.0, lead_volume='poisson',
+                 lead_volume_cv=0.1, max_breach_probability=0.1, seed=None):
+        if lead_volume not in ('poisson', 'lognormal', 'fixed'):
+            raise ValueError("lead_volume must be 'poisson', 'lognormal' or 'fixed'")
+        self.n_samples = n_samples
+        self.conversion_concentration = conversion_concentration
+        self.lead_volume = lead_volume
+        self.lead_volume_cv = lead_volume_cv
+        self.max_breach_probability = max_breach_probability
+        self.seed = seed
+
+    def draw(self, base_leads, conversion):
+        """Draw lead volume factors (samples,) and conversion rates (samples, tiers)"""
+        rng = np.random.default_rng(self.seed)
+        conversion = np.clip(np.asarray(conversion, dtype=float), 1e-12, 1 - 1e-12)
+        alpha = conversion * self.conversion_concentration
+        beta = (1 - conversion) * self.conversion_concentration
+        conversion_samples = rng.beta(alpha, beta, size=(self.n_samples, len(conversion)))
+
+        if self.lead_volume == 'poisson' and base_leads > 0:
+            lead_factor = rng.poisson(base_leads, size=self.n_samples) / base_leads
+        elif self.lead_volume == 'lognormal':
+            sigma = np.sqrt(np.log1p(self.lead_volume_cv ** 2))
+            lead_factor = rng.lognormal(-sigma ** 2 / 2, sigma, size=self.n_samples)
+        else:
+            lead_factor = np.ones(self.n_samples)
+        return lead_factor, conversion_samples
+
+
+@timed('monte_carlo')
+def simulate_scenarios(model, total_leads, salespeople, uncertainty):
+    """Evaluate scenarios under sampled conversion rates and lead volumes
+
+    ``total_leads`` and ``salespeople`` are planned values for each scenario.
+    Every scenario sees the same draws (common random numbers), so differences
+    between scenarios are not blurred by sampling noise. Returns a dict of
+    metric arrays shaped (scenarios, samples).
+    """
+    total_leads = np.atleast_1d(np.asarray(total_leads, dtype=float))
+    salespeople = np.atleast_1d(np.asarray(salespeople))
+    total_leads, salespeople = np.broadcast_arrays(total_leads, salespeople)
+    distribution, conversion = model._tier_arrays()
+    lead_factor, conversion_samples = uncertainty.draw(model.base_leads, conversion)
+
+    n_scenarios, n_samples = len(total_leads), len(lead_factor)
+    metrics = scenario_metrics(
+        total_leads[:, None] * lead_factor[None, :],
+        salespeople[:, None],
+        model.max_leads_per_salesperson,
+        model.salesperson_cost,
+        distribution,
+        np.tile(conversion_samples, (n_scenarios, 1)),
+        model.lead_cost_table,
+        model.capacity_model
+    )
+    return {name: values.reshape(n_scenarios, n_samples) for name, values in metrics.items()}
+
+
+def summarize(metrics, max_cac, percentiles=PERCENTILES):
+    """Percentile bands on sales and CAC plus the chance of breaching max_cac
+
+    ``metrics`` holds arrays whose last axis is samples. Returns a dict of
+    arrays with one value per scenario (or scalars for a single scenario).
+    """
+    summary = {'sales_mean': metrics['sales'].mean(axis=-1)}
+    for percentile in percentiles:
+        summary[f'sales_p{percentile}'] = np.percentile(metrics['sales'], percentile, axis=-1)
+    for percentile in percentiles:
+        summary[f'total_cac_p{percentile}'] = np.percentile(metrics['total_cac'], percentile, axis=-1)
+    summary['breach_probability'] = (metrics['total_cac'] > max_cac).mean(axis=-1)
+    return summary
+
+
+def risk_adjusted_recommendation(model, investment_amount, uncertainty, salespeople=None):
+    """Leads vs people decision that accounts for uncertainty
+
+    An option only counts when its probability of exceeding max_cac is at most
+    ``uncertainty.max_breach_probability``; among those, the one with the
+    higher mean incremental sales wins.
+    """
+    if salespeople is None:
+        salespeople = model.base_salespeople
+    additional_agents = investment_amount // model.salesperson_cost
+    additional_leads = model.calculate_leads_for_budget(investment_amount)
+
+    metrics = simulate_scenarios(
+        model,
+        [model.base_leads, model.base_leads + additional_leads, model.base_leads],
+        [salespeople, salespeople, salespeople + additional_agents],
+        uncertainty
+    )
+    summary = summarize(metrics, model.max_cac)
+    incremental = metrics['sales'][1:] - metrics['sales'][0]
+
+    scenarios = {}
+    for i, option in enumerate(['base', 'leads', 'people']):
+        scenarios[option] = {name: float(values[i]) for name, values in summary.items()}
+    for i, option in enumerate(['leads', 'people']):
+        scenarios[option]['incremental_mean'] = float(incremental[i].mean())
+        for percentile in PERCENTILES:
+            scenarios[option][f'incremental_p{percentile}'] = float(np.percentile(incremental[i], percentile))
+
+    def score(option):
+        acceptable = scenarios[option]['breach_probability'] <= uncertainty.max_breach_probability
+        return scenarios[option]['incremental_mean'] if acceptable else 0.0
+
+    leads_incremental, people_incremental = score('leads'), score('people')
+    if max(leads_incremental, people_incremental) <= 0:
+        recommendation = 'do_nothing'
+    else:
+        recommendation = 'people' if people_incremental > leads_incremental else 'leads'
+
+    return {
+        'recommendation': recommendation,
+        'reason': recommendation_reason(recommendation),
+        'leads_incremental': leads_incremental,
+        'people_incremental': people_incremental,
+        'n_samples': uncertainty.n_samples,
+        'scenarios': scenarios
+    }
@@ -0,0 +1,440 @@
+import numpy as np
+
+from .config import MODEL_DEFAULTS, ModelConfig, freeze_quality, freeze_tiers
+from .main import CallCenterModel
+from .utils.calculations import LeadCostTable, quality_arrays, safe_divide, scenario_metrics
+from .utils.instrumentation import timed
+
+# Per-site columns of an allocation, matching optimize_investment's keys
+SITE_COLUMNS = [
+    'recommendation',
+    'additional_agents',
+    'additional_leads',
+    'agent_spend',
+    'lead_spend',
+    'total_spend',
+    'sales',
+    'incremental_sales',
+    'total_cac'
+]
+
+
+def _site_kwargs(site):
+    """CallCenterModel arguments for a model, ModelConfig or dict of overrides"""
+    if isinstance(site, CallCenterModel):
+        return {name: getattr(site, name) for name in MODEL_DEFAULTS}
+    if isinstance(site, ModelConfig):
+        return site.model_kwargs()
+    unknown = set(site) - set(MODEL_DEFAULTS)
+    if unknown:
+        raise ValueError(f"Unknown model configuration keys: {sorted(unknown)}")
+    return {**MODEL_DEFAULTS, **site}
+
+
+class _SiteGroup:
+    """Sites sharing a rate card, quality mix and capacity model, as parameter arrays"""
+
+    def __init__(self, rows, sites, lead_cost_tiers, lead_quality_distribution, capacity_model):
+        if not getattr(capacity_model, 'piecewise_linear', True):
+            raise ValueError("Portfolio allocation needs a piecewise linear capacity model")
+        self.rows = np.array(rows)
+        self.lead_cost_table = LeadCostTable(lead_cost_tiers)
+        self.distribution, self.conversion = quality_arrays(lead_quality_distribution)
+        self.capacity_model = capacity_model
+
+        def column(name):
+            return np.array([sites[row][name] for row in rows], dtype=float)[:, None]
+
+        self.base_leads = column('base_leads')
+        self.base_salespeople = column('base_salespeople')
+        self.max_leads = column('max_leads_per_salesperson')
+        self.salesperson_cost = column('salesperson_cost')
+        self.max_cac = column('max_cac')
+        self.base = self.evaluate(self.base_leads, self.base_salespeople)
+
+    def evaluate(self, total_leads, salespeople, rows=None):
+        """Evaluate scenarios shaped (sites, points), or flat ones for the sites in ``rows``"""
+        shape = np.broadcast_shapes(np.shape(total_leads), np.shape(salespeople))
+        max_leads, salesperson_cost = self.max_leads, self.salesperson_cost
+        if rows is not None:
+            max_leads, salesperson_cost = max_leads[rows, 0], salesperson_cost[rows, 0]
+        metrics = scenario_metrics(
+            total_leads, salespeople, max_leads, salesperson_cost,
+            self.distribution, self.conversion, self.lead_cost_table, self.capacity_model
+        )
+        return {name: values.reshape(shape) for name, values in metrics.items()}
+
+    def candidates(self, budget):
+        """Lead volumes and headcounts that can be vertices of each site's frontier
+
+        With agents treated as continuous, sales are a concave piecewise-linear
+        function of (leads, capacity) and spend is convex, so the best way to
+        spend any amount is a vertex where leads sit at a price boundary or
+        where agents exactly cover the best tiers. Those headcounts are
+        rounded both ways to whole agents and each is paired with the lead
+        volume that fills it. Along the base headcount every breakpoint is
+        listed.
+        """
+        table = self.lead_cost_table
+        base_leads, base_salespeople, max_leads = self.base_leads, self.base_salespeople, self.max_leads
+        with np.errstate(divide='ignore', invalid='ignore'):
+            max_agents = np.where(self.salesperson_cost > 0, budget // self.salesperson_cost, 0)
+        max_volume = base_leads + table.leads_for_budget(budget, base_leads)
+
+        cumulative_distribution = np.cumsum(self.distribution)
+        cumulative_distribution = cumulative_distribution[cumulative_distribution > 0]
+        price_ends = table.ends[np.isfinite(table.ends)]
+        lead_points = np.concatenate(
+            [base_leads, max_volume, np.broadcast_to(price_ends, (len(base_leads), len(price_ends)))], axis=1
+        )
+        lead_points = np.clip(lead_points, base_leads, max_volume)
+
+        # Headcount at the current volume, with every slope change along the way
+        fill_base = base_salespeople * max_leads / cumulative_distribution
+        base_series = np.sort(np.concatenate([lead_points, np.clip(fill_base, base_leads, max_volume)], axis=1), axis=1)
+
+        # Whole-agent headcounts that cover the best tiers at each listed volume
+        balanced = (lead_points[:, :, None] * cumulative_distribution / max_leads[:, :, None]).reshape(len(base_leads), -1)
+        shares = np.broadcast_to(cumulative_distribution, lead_points.shape + cumulative_distribution.shape).reshape(balanced.shape)
+        volumes = np.repeat(lead_points, len(cumulative_distribution), axis=1)
+        headcounts = np.concatenate([np.floor(balanced), np.ceil(balanced)], axis=1)
+        headcounts = np.clip(headcounts, base_salespeople, base_salespeople + max_agents)
+        shares = np.concatenate([shares, shares], axis=1)
+        volumes = np.concatenate([volumes, volumes], axis=1)
+        filled = np.clip(headcounts * max_leads / shares, base_leads, max_volume)
+
+        # Segments along which only the lead volume changes: (start, end, headcount)
+        starts = np.concatenate([base_series[:, :-1], volumes], axis=1)
+        ends = np.concatenate([base_series[:, 1:], filled], axis=1)
+        segment_agents = np.concatenate(
+            [np.broadcast_to(base_salespeople, base_series[:, 1:].shape), headcounts], axis=1
+        )
+        return starts, ends, segment_agents
+
+    def frontier(self, budget):
+        """Upper concave hull of spend against sales for every site
+
+        Returns ``(spend, sales, leads, agents, hull)`` where the first four are
+        (sites, points) candidate arrays and ``hull`` lists, per step, the
+        point index each site moves to (or -1 once its hull has ended).
+        Column 0 is the current position. Only points within the site's
+        max_cac are used.
+        """
+        starts, ends, agents = self.candidates(budget)
+        at_start = self.evaluate(starts, agents)
+        at_end = self.evaluate(ends, agents)
+
+        # Along a lead-only segment slack is linear between breakpoints, so a
+        # CAC crossing solves in closed form; points past it are re-checked below
+        left = at_start['total_cost'] - self.max_cac * at_start['sales']
+        right = at_end['total_cost'] - self.max_cac * at_end['sales']
+        crosses = (left <= 0) != (right <= 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(crosses, left / (left - right), 0.0)
+        roots = starts + np.nan_to_num(fraction) * (ends - starts)
+        # Few segments cross, so only those roots are evaluated; the rest stay invalid (no sales)
+        at_root = {name: np.zeros(roots.shape) for name in ('sales', 'total_cost')}
+        rows, columns = np.nonzero(crosses)
+        crossing = self.evaluate(roots[rows, columns], agents[rows, columns], rows)
+        for name in at_root:
+            at_root[name][rows, columns] = crossing[name]
+
+        leads = np.concatenate([self.base_leads, starts, ends, roots], axis=1)
+        agents = np.concatenate([self.base_salespeople, agents, agents, agents], axis=1)
+        metrics = {
+            name: np.concatenate([self.base[name], at_start[name], at_end[name], at_root[name]], axis=1)
+            for name in ('sales', 'total_cost')
+        }
+        spend = metrics['total_cost'] - self.base['total_cost']
+        sales = metrics['sales']
+        valid = (metrics['total_cost'] <= self.max_cac * sales) & (sales > 0)
+        valid[:, 0] = True
+
+        # Only points with more sales than every cheaper point can be on the
+        # hull; keep those, cheapest first, to shrink the arrays wrapped below
+        order = np.argsort(np.where(valid, spend, np.inf), axis=1, kind='stable')
+        sales = np.take_along_axis(np.where(valid, sales, -np.inf), order, axis=1)
+        best_cheaper = np.maximum.accumulate(sales, axis=1)
+        keep = np.concatenate([np.ones((len(sales), 1), dtype=bool), sales[:, 1:] > best_cheaper[:, :-1] + 1e-9], axis=1)
+        kept_first = np.argsort(~keep, axis=1, kind='stable')[:, :keep.sum(axis=1).max()]
+        compact = np.take_along_axis(order, kept_first, axis=1)
+        valid = np.take_along_axis(valid, compact, axis=1) & np.take_along_axis(keep, kept_first, axis=1)
+        spend, sales, leads, agents = [
+            np.take_along_axis(values, compact, axis=1) for values in (spend, metrics['sales'], leads, agents)
+        ]
+
+        # Gift wrapping: from the current vertex, step to the point with the best sales per dollar
+        rows = np.arange(len(spend))
+        current = np.zeros(len(spend), dtype=int)
+        hull = []
+        while True:
+            gained = sales - sales[rows, current][:, None]
+            cost = spend - spend[rows, current][:, None]
+            ahead = valid & (gained > 1e-9) & (cost >= 0)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                slope = np.where(ahead, np.where(cost > 0, gained / cost, np.inf), -np.inf)
+            step = np.argmax(slope, axis=1)
+            moved = ahead[rows, step]
+            if not moved.any():
+                break
+            hull.append(np.where(moved, step, -1))
+            current = np.where(moved, step, current)
+        return spend, sales, leads, agents, hull
+
+
+def _segments(groups, frontiers):
+    """Flatten every site's hull into segment arrays, one entry per hull step
+
+    ``slope`` is sales per dollar, forced to be non-increasing along each
+    site's hull: collinear steps whose slopes differ only by rounding would
+    otherwise sort out of order.
+    """
+    columns = {name: [] for name in ('site', 'group', 'row', 'order', 'start', 'end', 'spend', 'sales', 'slope')}
+    for index, (group, (spend, sales, _, _, hull)) in enumerate(zip(groups, frontiers)):
+        rows = np.arange(len(group.rows))
+        previous = np.zeros(len(rows), dtype=int)
+        previous_slope = np.full(len(rows), np.inf)
+        for order, step in enumerate(hull):
+            moved = step >= 0
+            row, start, end = rows[moved], previous[moved], step[moved]
+            step_spend = spend[row, end] - spend[row, start]
+            step_sales = sales[row, end] - sales[row, start]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                slope = np.where(step_spend > 0, step_sales / step_spend, np.inf)
+            slope = np.minimum(slope, previous_slope[row])
+            previous_slope[row] = slope
+            columns['site'].append(group.rows[moved])
+            columns['group'].append(np.full(len(row), index))
+            columns['row'].append(row)
+            columns['order'].append(np.full(len(row), order))
+            columns['start'].append(start)
+            columns['end'].append(end)
+            columns['spend'].append(step_spend)
+            columns['sales'].append(step_sales)
+            columns['slope'].append(slope)
+            previous = np.where(moved, step, previous)
+    return {
+        name: np.concatenate(values) if values else np.array([], dtype=float if name in ('spend', 'sales', 'slope') else int)
+        for name, values in columns.items()
+    }
+
+
+@timed('allocate_portfolio')
+def allocate_portfolio(sites, budget, max_cac=None):
+    """Split one budget across sites, and within each between leads and agents
+
+    ``sites`` is a sequence of CallCenterModels, ModelConfigs or dicts of
+    constructor arguments. Incremental sales are maximized subject to the
+    budget, each site's own max_cac and, when ``max_cac`` is given, a cap on
+    the portfolio's total cost per sale.
+
+    Each site's spend-to-sales frontier is reduced to its upper concave hull
+    (see _SiteGroup.frontier), and hull segments from every site are taken
+    best sales-per-dollar first. Once a segment no longer fits, the
+    remaining budget goes to later segments that do, and what is left after
+    that buys part of a site's next segment. Whole agents make the result an
+    approximation when sites compete for the last few agents. Sites sharing a
+    rate card, quality mix and capacity model are handled as one array
+    batch, so run time grows with the number of distinct rate cards rather
+    than sites.
+
+    Returns a dict with a ``sites`` dict of per-site columns (SITE_COLUMNS)
+    and portfolio totals.
+    """
+    if not budget >= 0:
+        raise ValueError("budget must be a non-negative number")
+    sites = [_site_kwargs(site) for site in sites]
+    grouped = {}
+    frozen = {}  # sites often share one rate card or quality mix object
+    for row, site in enumerate(sites):
+        tiers, quality = site['lead_cost_tiers'], site['lead_quality_distribution']
+        if id(tiers) not in frozen:
+            frozen[id(tiers)] = freeze_tiers(tiers)
+        if id(quality) not in frozen:
+            frozen[id(quality)] = freeze_quality(quality)
+        key = (frozen[id(tiers)], frozen[id(quality)], site['capacity_model'])
+        grouped.setdefault(key, []).append(row)
+    groups = [
+        _SiteGroup(rows, sites, sites[rows[0]]['lead_cost_tiers'], sites[rows[0]]['lead_quality_distribution'], capacity_model)
+        for (_, _, capacity_model), rows in grouped.items()
+    ]
+    frontiers = [group.frontier(budget) for group in groups]
+    segments = _segments(groups, frontiers)
+
+    base_cost = sum(group.base['total_cost'].sum() for group in groups)
+    base_sales = sum(group.base['sales'].sum() for group in groups)
+    if max_cac is None:
+        terms = np.zeros(len(segments['spend']))
+        slack = 0.0
+    else:
+        terms = segments['spend'] - max_cac * segments['sales']
+        slack = base_cost - max_cac * base_sales
+
+    # Within a site slopes never rise along its hull, so sorting keeps each site's segments in order
+    order = np.lexsort((segments['order'], segments['site'], -segments['slope']))
+    spend, terms = segments['spend'][order], terms[order]
+
+    # Longest prefix within the budget that leaves the portfolio within max_cac.
+    # Cheap-per-sale segments come first, so slack falls and then rises.
+    cumulative_spend = np.concatenate([[0.0], np.cumsum(spend)])
+    cumulative_slack = slack + np.concatenate([[0.0], np.cumsum(terms)])
+    within_budget = cumulative_spend <= budget * (1 + 1e-12)
+    feasible = np.nonzero(within_budget & (cumulative_slack <= 1e-9 * max(abs(base_cost), 1.0)))[0]
+
+    meets_cac = len(feasible) > 0
+    taken = np.zeros(len(sites), dtype=int)
+    if meets_cac:
+        prefix = feasible[-1]
+        np.add.at(taken, segments['site'][order[:prefix]], 1)
+        remaining, slack = _fill(
+            taken, segments['site'][order], segments['order'][order], spend, terms,
+            prefix, budget - cumulative_spend[prefix], cumulative_slack[prefix]
+        )
+    positions = _vertices(groups, frontiers, segments, taken)
+    if meets_cac:
+        _spend_remainder(groups, frontiers, segments, taken, positions, remaining, slack, max_cac)
+    return _allocation(groups, positions, meets_cac)
+
+
+def _fill(taken, site, step, spend, terms, prefix, remaining, slack):
+    """After the prefix, take every later segment that still fits whole
+
+    A site stops at its first segment that does not fit. Updates ``taken``
+    (segments per site) in place and returns the budget and CAC slack left.
+    """
+    blocked = np.zeros(len(taken), dtype=bool)
+    for i in range(prefix, len(site)):
+        s = site[i]
+        if blocked[s] or taken[s] != step[i]:
+            continue
+        if spend[i] <= remaining and slack + terms[i] <= 0:
+            taken[s] += 1
+            remaining -= spend[i]
+            slack += terms[i]
+        else:
+            blocked[s] = True
+    return remaining, slack
+
+
+def _vertices(groups, frontiers, segments, taken):
+    """Per group, the hull vertex index, lead volume and headcount each site stops at"""
+    vertex = np.zeros(len(taken), dtype=int)
+    last = taken[segments['site']] == segments['order'] + 1
+    vertex[segments['site'][last]] = segments['end'][last]
+    positions = []
+    for group, (_, _, leads, agents, _) in zip(groups, frontiers):
+        rows = np.arange(len(group.rows))
+        start = vertex[group.rows]
+        positions.append([start, leads[rows, start], agents[rows, start]])
+    return positions
+
+
+def _spend_remainder(groups, frontiers, segments, taken, positions, remaining, slack, max_cac):
+    """Spend what whole segments left over on part of a site's next segment
+
+    Whole agents make a partial step worth less than the hull promised, so
+    every site's option is realized exactly and the best one is kept; this
+    repeats while money and positive gains remain. Updates ``positions``.
+    """
+    following = np.full(len(taken), -1)
+    next_segment = taken[segments['site']] == segments['order']
+    following[segments['site'][next_segment]] = segments['end'][next_segment]
+
+    while remaining > 1e-9:
+        best = None
+        for index, (group, (spend, _, leads, agents, _)) in enumerate(zip(groups, frontiers)):
+            start = positions[index][0]
+            end = following[group.rows]
+            rows = np.nonzero(end >= 0)[0]
+            if len(rows) == 0:
+                continue
+            step_spend = spend[rows, end[rows]] - spend[rows, start[rows]]
+            fraction = np.minimum(remaining / np.maximum(step_spend, 1e-12), 1.0)
+            total_leads, salespeople, usable = _partial_step(group, rows, leads, agents, start[rows], end[rows], fraction, spend)
+            metrics = group.evaluate(total_leads, salespeople, rows)
+            base = group.evaluate(positions[index][1][rows], positions[index][2][rows], rows)
+            gain = metrics['sales'] - base['sales']
+            cost = metrics['total_cost'] - base['total_cost']
+            ok = usable & (gain > 1e-9) & (cost <= remaining + 1e-6)
+            if max_cac is not None:
+                ok &= slack + cost - max_cac * gain <= 0
+            if ok.any():
+                pick = np.argmax(np.where(ok, gain, -np.inf))
+                if best is None or gain[pick] > best[0]:
+                    best = (gain[pick], cost[pick], index, rows[pick], total_leads[pick], salespeople[pick])
+        if best is None:
+            return
+        gain, cost, index, row, total_leads, salespeople = best
+        positions[index][1][row], positions[index][2][row] = total_leads, salespeople
+        following[groups[index].rows[row]] = -1  # a site takes at most one partial step
+        remaining -= cost
+        if max_cac is not None:
+            slack += cost - max_cac * gain
+
+
+def _partial_step(group, rows, leads, agents, start, end, fraction, spend):
+    """Realize ``fraction`` of a hull segment with whole agents for the sites in ``rows``
+
+    The headcount at that point of the segment is rounded down and up, the
+    rest of the segment's spend buys leads, and the option with more sales
+    within the site's max_cac is returned; ``usable`` is False when neither
+    qualifies.
+    """
+    agents_a = agents[rows, start]
+    headcount = agents_a + fraction * (agents[rows, end] - agents_a)
+    allowed = group.base['total_cost'][rows, 0] + spend[rows, start] + fraction * (spend[rows, end] - spend[rows, start])
+    base_leads = group.base_leads[rows, 0]
+
+    options = []
+    for salespeople in (np.floor(headcount + 1e-9), np.ceil(headcount - 1e-9)):
+        lead_budget = allowed - salespeople * group.salesperson_cost[rows, 0] - group.base['lead_cost'][rows, 0]
+        total_leads = base_leads + group.lead_cost_table.leads_for_budget(lead_budget, base_leads)
+        metrics = group.evaluate(total_leads, salespeople, rows)
+        usable = (lead_budget >= 0) & (metrics['total_cac'] <= group.max_cac[rows, 0])
+        options.append((np.where(usable, metrics['sales'], -np.inf), total_leads, salespeople))
+
+    (low_sales, low_leads, low_agents), (high_sales, high_leads, high_agents) = options
+    higher = high_sales > low_sales
+    usable = np.maximum(low_sales, high_sales) > -np.inf
+    return np.where(higher, high_leads, low_leads), np.where(higher, high_agents, low_agents), usable
+
+
+def _allocation(groups, positions, meets_cac):
+    """Evaluate each site's chosen position exactly and assemble the result"""
+    n_sites = sum(len(group.rows) for group in groups)
+    columns = {name: np.zeros(n_sites) for name in SITE_COLUMNS if name != 'recommendation'}
+    base_sales = np.zeros(n_sites)
+    base_cost = np.zeros(n_sites)
+    for group, (_, total_leads, salespeople) in zip(groups, positions):
+        metrics = group.evaluate(total_leads[:, None], salespeople[:, None])
+        additional_agents = salespeople - group.base_salespeople[:, 0]
+        columns['additional_agents'][group.rows] = additional_agents
+        columns['additional_leads'][group.rows] = total_leads - group.base_leads[:, 0]
+        columns['agent_spend'][group.rows] = additional_agents * group.salesperson_cost[:, 0]
+        columns['lead_spend'][group.rows] = metrics['lead_cost'][:, 0] - group.base['lead_cost'][:, 0]
+        columns['sales'][group.rows] = metrics['sales'][:, 0]
+        columns['total_cac'][group.rows] = metrics['total_cac'][:, 0]
+        base_sales[group.rows] = group.base['sales'][:, 0]
+        base_cost[group.rows] = group.base['total_cost'][:, 0]
+
+    columns['total_spend'] = columns['agent_spend'] + columns['lead_spend']
+    columns['incremental_sales'] = columns['sales'] - base_sales
+    invested = columns['incremental_sales'] > 0
+    columns['recommendation'] = np.where(
+        ~invested, 'do_nothing',
+        np.where(columns['additional_agents'] == 0, 'leads',
+                 np.where(columns['additional_leads'] <= 0, 'people', 'mixed'))
+    )
+    columns['additional_agents'] = columns['additional_agents'].astype(int)
+
+    total_spend = float(columns['total_spend'].sum())
+    sales = float(columns['sales'].sum())
+    return {
+        'sites': {name: columns[name] for name in SITE_COLUMNS},
+        'total_spend': total_spend,
+        'sales': sales,
+        'incremental_sales': float(columns['incremental_sales'].sum()),
+        'base_cac': float(safe_divide(base_cost.sum(), base_sales.sum())),
+        'total_cac': float(safe_divide(base_cost.sum() + total_spend, sales)),
+        'meets_cac': meets_cac
+    }
@@ -0,0 +1,63 @@
+import json
+
+from .utils.frames import require_pandas
+from .writers import infer_format
+
+
+def _iter_csv(path, batch_size, columns=None):
+    pd = require_pandas()
+    with pd.read_csv(path, chunksize=batch_size, usecols=columns) as reader:
+        yield from reader
+
+
+def _jsonl_frame(pd, records, columns):
+    # Requested columns no record has are left out, not filled with NaN, so callers see them missing
+    frame = pd.DataFrame(records)
+    if columns is not None:
+        frame = frame[[column for column in columns if column in frame.columns]]
+    return frame
+
+
+def _iter_jsonl(path, batch_size, columns=None):
+    # Parsed with the json module so Infinity volumes in rate cards survive
+    pd = require_pandas()
+    records = []
+    with open(path) as f:
+        for line in f:
+            if line.strip():
+                records.append(json.loads(line))
+            if len(records) == batch_size:
+                yield _jsonl_frame(pd, records, columns)
+                records = []
+    if records:
+        yield _jsonl_frame(pd, records, columns)
+
+
+def _iter_parquet(path, batch_size, columns=None):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError("Reading Parquet requires pyarrow: pip install pyarrow") from error
+    # Memory-mapped, so only the requested columns of each row group are paged in
+    for batch in pq.ParquetFile(path, memory_map=True).iter_batches(batch_size=batch_size, columns=columns):
+        yield batch.to_pandas()
+
+
+READERS = {
+    'csv': _iter_csv,
+    'jsonl': _iter_jsonl,
+    'parquet': _iter_parquet
+}
+
+
+def iter_frames(path, batch_size=10000, format=None, columns=None):
+    """Read a CSV, JSON Lines or Parquet file as DataFrames of at most ``batch_size`` rows
+
+    Only one batch is held in memory at a time. ``columns`` limits the
+    columns read; a JSON Lines batch leaves out requested columns none of its
+    records have.
+    """
+    format = format or infer_format(path)
+    if format not in READERS:
+        raise ValueError(f"Unsupported input format: {format}")
+    return READERS[format](path, batch_size, columns)
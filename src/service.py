@@ -0,0 +1,363 @@
+"""Asyncio HTTP/JSON scoring service for investment recommendations
+
+Endpoints:
+    POST /recommend  one request object, or a list of them
+    GET  /metrics    latency, throughput, batching and cache counters
+    GET  /health
+
+A request object holds CallCenterModel arguments plus ``investment_amount``;
+missing arguments use the model defaults. Concurrent requests are collected
+for up to ``max_wait_ms`` (or ``max_batch_size`` requests) and evaluated
+together with batch_investment_recommendations; results are cached per
+(configuration, investment amount).
+"""
+import asyncio
+import json
+import math
+import time
+from collections import deque
+
+import numpy as np
+
+from .batch import batch_investment_recommendations
+from .cache import LRUCache
+from .config import ModelConfig, thaw_quality, thaw_tiers
+from .utils.calculations import LeadCostTable, quality_arrays
+
+# Fields returned for each recommendation, in order
+RESULT_FIELDS = [
+    'recommendation',
+    'reason',
+    'current_cac',
+    'leads_cac',
+    'people_cac',
+    'base_sales',
+    'leads_sales',
+    'people_sales',
+    'leads_incremental',
+    'people_incremental',
+    'additional_leads',
+    'additional_agents'
+]
+
+# Model arguments a request may set as plain numbers
+NUMERIC_FIELDS = ['base_leads', 'base_salespeople', 'max_leads_per_salesperson', 'salesperson_cost', 'max_cac']
+
+STATUS_TEXT = {
+    200: 'OK',
+    400: 'Bad Request',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    500: 'Internal Server Error'
+}
+
+
+def _json_value(value):
+    # Strict JSON has no Infinity: an undefined CAC is reported as null
+    if isinstance(value, (float, np.floating)):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def evaluate_requests(configs, investment_amounts):
+    """Evaluate (ModelConfig, investment amount) pairs in one vectorized batch"""
+    frame = batch_investment_recommendations([
+        dict(config.model_kwargs(), investment_amount=investment_amount)
+        for config, investment_amount in zip(configs, investment_amounts)
+    ])
+    columns = [frame[name].tolist() for name in RESULT_FIELDS]
+    return [
+        {name: _json_value(value) for name, value in zip(RESULT_FIELDS, row)}
+        for row in zip(*columns)
+    ]
+
+
+def _number(payload, name, label=None, allow_inf=False):
+    """A request field as a finite (or, with ``allow_inf``, infinite) non-negative float
+
+    Raises ValueError otherwise.
+    """
+    try:
+        value = float(payload[name]) if not isinstance(payload[name], bool) else math.nan
+    except (TypeError, ValueError):
+        value = math.nan
+    if math.isnan(value) or value < 0 or (math.isinf(value) and not allow_inf):
+        raise ValueError(f"{label or name} must be a non-negative number")
+    return value
+
+
+def _rate_card(tiers):
+    """lead_cost_tiers as a list of {'volume', 'cost'} floats; a null volume is open-ended"""
+    if not isinstance(tiers, list) or not all(isinstance(tier, dict) for tier in tiers):
+        raise ValueError("lead_cost_tiers must be a list of objects with volume and cost")
+    card = []
+    for i, tier in enumerate(tiers):
+        for name in ('volume', 'cost'):
+            if name not in tier:
+                raise ValueError(f"lead_cost_tiers[{i}] is missing {name}")
+        volume = math.inf if tier['volume'] is None else _number(
+            tier, 'volume', f"lead_cost_tiers[{i}].volume", allow_inf=True
+        )
+        card.append({'volume': volume, 'cost': _number(tier, 'cost', f"lead_cost_tiers[{i}].cost")})
+    return card
+
+
+def _quality_mix(quality):
+    """lead_quality_distribution as {tier: {'conversion_rate', 'distribution'}} floats"""
+    if not isinstance(quality, dict) or not all(isinstance(values, dict) for values in quality.values()):
+        raise ValueError("lead_quality_distribution must map each tier to an object")
+    mix = {}
+    for tier, values in quality.items():
+        for name in ('conversion_rate', 'distribution'):
+            if name not in values:
+                raise ValueError(f"lead_quality_distribution['{tier}'] is missing {name}")
+        mix[tier] = {
+            name: _number(values, name, f"lead_quality_distribution['{tier}'].{name}")
+            for name in ('conversion_rate', 'distribution')
+        }
+    return mix
+
+
+def parse_request(payload):
+    """Split a request object into a (ModelConfig, investment_amount) cache key
+
+    Every numeric field, the rate card and the quality mix are checked here,
+    so a bad value is reported for its own request instead of failing the
+    batch it would be evaluated in.
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("Each request must be a JSON object")
+    payload = dict(payload)
+    if 'investment_amount' not in payload:
+        raise ValueError("investment_amount is required")
+    investment_amount = _number(payload, 'investment_amount')
+    del payload['investment_amount']
+    for name in NUMERIC_FIELDS:
+        if name in payload:
+            payload[name] = _number(payload, name)
+    if 'base_salespeople' in payload:
+        if not payload['base_salespeople'].is_integer():
+            raise ValueError("base_salespeople must be a whole number")
+        payload['base_salespeople'] = int(payload['base_salespeople'])
+    if 'lead_cost_tiers' in payload:
+        payload['lead_cost_tiers'] = _rate_card(payload['lead_cost_tiers'])
+    if 'lead_quality_distribution' in payload:
+        payload['lead_quality_distribution'] = _quality_mix(payload['lead_quality_distribution'])
+    if 'capacity_model' in payload:
+        raise ValueError("capacity_model cannot be set over HTTP")
+    try:
+        config = ModelConfig(**payload)
+    except TypeError as error:
+        raise ValueError(str(error)) from error
+    return config, investment_amount
+
+
+class ServiceMetrics:
+    """Request counters and a rolling window of latencies"""
+
+    def __init__(self, window=10000):
+        self.started = time.perf_counter()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.evaluated = 0
+        self.latencies = deque(maxlen=window)
+
+    def record_request(self, seconds, error=False):
+        self.requests += 1
+        self.errors += int(error)
+        self.latencies.append(seconds)
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.evaluated += size
+
+    def snapshot(self):
+        uptime = time.perf_counter() - self.started
+        latencies = np.array(self.latencies) * 1000
+        latency = {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+        if len(latencies):
+            latency = {f'p{q}': float(np.percentile(latencies, q)) for q in (50, 95, 99)}
+            latency['max'] = float(latencies.max())
+        return {
+            'uptime_seconds': uptime,
+            'requests': self.requests,
+            'errors': self.errors,
+            'requests_per_second': self.requests / uptime if uptime > 0 else 0.0,
+            'latency_ms': latency,
+            'batches': self.batches,
+            'evaluated': self.evaluated,
+            'mean_batch_size': self.evaluated / self.batches if self.batches else 0.0
+        }
+
+
+class RecommendationService:
+    """Micro-batching, caching front end for investment recommendations
+
+    ``recommend`` may be awaited from many coroutines at once. Cache misses
+    wait for up to ``max_wait_ms`` so they can share one evaluation with other
+    requests (at most ``max_batch_size`` per batch); identical requests in
+    flight share a single result. Evaluation runs in a worker thread so the
+    event loop keeps accepting connections.
+    """
+
+    def __init__(self, max_batch_size=256, max_wait_ms=2.0, cache_size=4096):
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.cache = LRUCache(cache_size)
+        self.metrics = ServiceMetrics()
+        self._pending = {}
+        self._flush_timer = None
+
+    async def recommend(self, payload):
+        """Return the recommendation for one request object"""
+        key = parse_request(payload)
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        future = self._pending.get(key)
+        if future is None:
+            # Reject a bad rate card or quality mix here so it cannot fail the whole batch
+            config, _ = key
+            LeadCostTable(thaw_tiers(config.lead_cost_tiers))
+            quality_arrays(thaw_quality(config.lead_quality_distribution))
+            future = asyncio.get_running_loop().create_future()
+            self._pending[key] = future
+            if len(self._pending) >= self.max_batch_size:
+                self._flush()
+            elif self._flush_timer is None:
+                self._flush_timer = asyncio.get_running_loop().call_later(self.max_wait, self._flush)
+        return await asyncio.shield(future)
+
+    def _flush(self):
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            asyncio.get_running_loop().create_task(self._evaluate(batch))
+
+    async def _evaluate(self, batch):
+        keys = list(batch)
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                None, evaluate_requests, [config for config, _ in keys], [amount for _, amount in keys]
+            )
+        except Exception as error:
+            if len(keys) > 1:
+                # Keep the error with the request that caused it: retry each on its own
+                for key, future in batch.items():
+                    await self._evaluate({key: future})
+                return
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(error)
+            return
+        self.metrics.record_batch(len(keys))
+        for key, result in zip(keys, results):
+            self.cache.put(key, result)
+            if not batch[key].done():
+                batch[key].set_result(result)
+
+    def stats(self):
+        """Service metrics plus cache counters"""
+        return {**self.metrics.snapshot(), 'cache': self.cache.stats()}
+
+    async def handle(self, method, path, body):
+        """Route one HTTP request; returns (status, JSON-serializable body)"""
+        path = path.split('?', 1)[0]
+        if path == '/health':
+            return (200, {'status': 'ok'}) if method == 'GET' else (405, {'error': 'use GET'})
+        if path == '/metrics':
+            return (200, self.stats()) if method == 'GET' else (405, {'error': 'use GET'})
+        if path != '/recommend':
+            return 404, {'error': f'no route for {path}'}
+        if method != 'POST':
+            return 405, {'error': 'use POST'}
+
+        started = time.perf_counter()
+        try:
+            payload = json.loads(body or b'null')
+            if isinstance(payload, list):
+                result = list(await asyncio.gather(*(self.recommend(item) for item in payload)))
+            else:
+                result = await self.recommend(payload)
+            status = 200
+        except ValueError as error:
+            status, result = 400, {'error': str(error)}
+        except Exception as error:
+            status, result = 500, {'error': str(error)}
+        self.metrics.record_request(time.perf_counter() - started, error=status != 200)
+        return status, result
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, path, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                try:
+                    length = int(headers.get('content-length', 0))
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    # The body cannot be found, so answer and drop the connection
+                    status, result, keep_alive = 400, {'error': 'invalid Content-Length'}, False
+                    self.metrics.record_request(0.0, error=True)
+                else:
+                    body = await reader.readexactly(length)
+                    status, result = await self.handle(method, path, body)
+                content = json.dumps(result).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(content)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + content
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8080):
+        """Start listening and return the asyncio server
+
+        One throwaway evaluation runs first so the first real batch does not
+        pay for lazy imports.
+        """
+        await asyncio.get_running_loop().run_in_executor(None, evaluate_requests, [ModelConfig()], [0.0])
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+
+def serve(host='127.0.0.1', port=8080, **options):
+    """Run a RecommendationService until interrupted; returns its final stats"""
+    service = RecommendationService(**options)
+
+    async def run():
+        server = await service.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
+    return service.stats()
@@ -0,0 +1,204 @@
+import heapq
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .utils.calculations import METRIC_COLUMNS, safe_divide
+from .utils.capacity import HOURS_PER_PERIOD
+from .utils.instrumentation import timed
+
+
+class EventSimulation:
+    """Settings for a discrete-event simulation of one period
+
+    Leads arrive at uniformly random times over ``hours_per_period`` with
+    tiers drawn from the model's quality mix. Waiting leads are answered best
+    tier first (oldest first within a tier), each taking an exponential
+    (``handle_time='exponential'``) or fixed handle time, and abandon after an
+    exponential wait with mean ``patience_minutes`` (None waits until the end
+    of the period). Handle time and patience default to the model's
+    capacity_model when it defines them; otherwise handle time is set so one
+    agent can work max_leads_per_salesperson leads per period.
+    """
+
+    def __init__(self, handle_time_minutes=None, patience_minutes=None, hours_per_period=HOURS_PER_PERIOD,
+                 handle_time='exponential', seed=None):
+        if handle_time not in ('exponential', 'fixed'):
+            raise ValueError("handle_time must be 'exponential' or 'fixed'")
+        self.handle_time_minutes = handle_time_minutes
+        self.patience_minutes = patience_minutes
+        self.hours_per_period = hours_per_period
+        self.handle_time = handle_time
+        self.seed = seed
+
+    def resolve(self, model):
+        """Return (handle_time_minutes, patience_minutes) for a model"""
+        capacity_model = model.capacity_model
+        handle_time_minutes = self.handle_time_minutes
+        if handle_time_minutes is None:
+            handle_time_minutes = getattr(capacity_model, 'handle_time_minutes', None)
+        if handle_time_minutes is None:
+            handle_time_minutes = self.hours_per_period * 60 / model.max_leads_per_salesperson
+        patience_minutes = self.patience_minutes
+        if patience_minutes is None:
+            patience_minutes = getattr(capacity_model, 'patience_minutes', None)
+        return handle_time_minutes, patience_minutes
+
+    def draw(self, rng, n_leads, distribution, handle_time_minutes, patience_minutes):
+        """Draw arrival hours, tier indices, handle hours and abandon deadlines"""
+        arrivals = np.sort(rng.uniform(0, self.hours_per_period, size=n_leads))
+        tiers = rng.choice(len(distribution), size=n_leads, p=distribution / distribution.sum())
+        if self.handle_time == 'exponential':
+            handle_hours = rng.exponential(handle_time_minutes / 60, size=n_leads)
+        else:
+            handle_hours = np.full(n_leads, handle_time_minutes / 60)
+        if patience_minutes is None:
+            deadlines = np.full(n_leads, np.inf)
+        else:
+            deadlines = arrivals + rng.exponential(patience_minutes / 60, size=n_leads)
+        return arrivals, tiers, handle_hours, deadlines
+
+
+def _run_queue(arrivals, tiers, handle_hours, deadlines, n_tiers, salespeople, hours_per_period):
+    """Event loop: return a bool array marking the leads an agent answered
+
+    ``agents_free`` is a heap holding the time each agent next becomes free;
+    an idle agent jumps to the next arrival. Abandoned leads are dropped
+    lazily when they reach the front of their tier's queue. Inputs are plain
+    lists so the loop allocates nothing beyond the queued indices.
+    """
+    n_leads = len(arrivals)
+    handled = np.zeros(n_leads, dtype=bool)
+    if salespeople <= 0 or n_leads == 0:
+        return handled
+
+    queues = [deque() for _ in range(n_tiers)]
+    agents_free = [0.0] * int(salespeople)
+    heapreplace = heapq.heapreplace
+    answered = []
+    next_lead = 0
+
+    while True:
+        now = agents_free[0]
+        if now >= hours_per_period:
+            break
+        while next_lead < n_leads and arrivals[next_lead] <= now:
+            queues[tiers[next_lead]].append(next_lead)
+            next_lead += 1
+
+        lead = -1
+        for queue in queues:
+            while queue and deadlines[queue[0]] < now:
+                queue.popleft()
+            if queue:
+                lead = queue.popleft()
+                break
+
+        if lead >= 0:
+            answered.append(lead)
+            heapreplace(agents_free, now + handle_hours[lead])
+        elif next_lead < n_leads:
+            heapreplace(agents_free, arrivals[next_lead])
+        else:
+            break
+
+    handled[answered] = True
+    return handled
+
+
+@timed('simulate_period')
+def simulate_period(model, simulation=None, total_leads=None, salespeople=None, seed=None):
+    """Simulate one period lead by lead and return metrics like calculate_metrics
+
+    ``total_leads`` and ``salespeople`` default to the model's base values;
+    ``seed`` overrides ``simulation.seed``. Sales are drawn per answered lead
+    from its tier's conversion rate; ``expected_sales`` is their mean. The
+    result holds every METRIC_COLUMNS entry plus ``expected_sales`` and
+    ``abandoned_leads``.
+    """
+    if simulation is None:
+        simulation = EventSimulation()
+    if total_leads is None:
+        total_leads = model.base_leads
+    if salespeople is None:
+        salespeople = model.base_salespeople
+    rng = np.random.default_rng(simulation.seed if seed is None else seed)
+
+    n_leads = int(round(total_leads))
+    handle_time_minutes, patience_minutes = simulation.resolve(model)
+    arrivals, tiers, handle_hours, deadlines = simulation.draw(
+        rng, n_leads, model.tier_distribution, handle_time_minutes, patience_minutes
+    )
+    handled = _run_queue(
+        arrivals.tolist(), tiers.tolist(), handle_hours.tolist(), deadlines.tolist(),
+        len(model.tier_conversion), salespeople, simulation.hours_per_period
+    )
+
+    conversion = model.tier_conversion[tiers[handled]]
+    sales = float((rng.random(len(conversion)) < conversion).sum())
+    lead_cost = float(model.lead_cost_table.cost(n_leads))
+    agent_cost = float(salespeople * model.salesperson_cost)
+    total_cost = lead_cost + agent_cost
+    abandoned = int(((deadlines < simulation.hours_per_period) & ~handled).sum())
+
+    return {
+        'sales': sales,
+        'total_cac': float(safe_divide(total_cost, sales)),
+        'lead_cac': float(safe_divide(lead_cost, sales)),
+        'agent_cac': float(safe_divide(agent_cost, sales)),
+        'handled_leads': float(handled.sum()),
+        'total_leads': float(n_leads),
+        'total_cost': total_cost,
+        'lead_cost': lead_cost,
+        'agent_cost': agent_cost,
+        'expected_sales': float(conversion.sum()),
+        'abandoned_leads': float(abandoned)
+    }
+
+
+def _replicate(args):
+    model, simulation, total_leads, salespeople, seed = args
+    return simulate_period(model, simulation, total_leads, salespeople, seed=seed)
+
+
+def run_replications(model, simulation=None, replications=8, total_leads=None, salespeople=None, workers=None):
+    """Run independent replications of simulate_period, in parallel when possible
+
+    Replication seeds are spawned from ``simulation.seed``, so results are
+    reproducible and identical whatever ``workers`` is. Replications run in
+    a ProcessPoolExecutor with ``workers`` processes (defaults to the CPU
+    count), or in-process when ``workers`` is 0 or 1. Returns a dict of arrays
+    with one value per replication.
+    """
+    if simulation is None:
+        simulation = EventSimulation()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    seeds = np.random.SeedSequence(simulation.seed).spawn(replications)
+    tasks = [(model, simulation, total_leads, salespeople, seed) for seed in seeds]
+
+    if workers <= 1 or replications <= 1:
+        results = [_replicate(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, replications)) as pool:
+            results = list(pool.map(_replicate, tasks))
+    return {name: np.array([result[name] for result in results]) for name in results[0]}
+
+
+def compare_with_analytic(model, replications, total_leads=None, salespeople=None):
+    """Compare replication means against the model's analytic metrics
+
+    Returns a dict mapping each METRIC_COLUMNS name to
+    ``(analytic, simulated_mean, simulated_std)``.
+    """
+    if total_leads is None:
+        total_leads = model.base_leads
+    if salespeople is None:
+        salespeople = model.base_salespeople
+    analytic = model._metric_arrays([total_leads], [salespeople])
+    return {
+        name: (float(analytic[name][0]), float(replications[name].mean()), float(replications[name].std()))
+        for name in METRIC_COLUMNS
+    }
@@ -0,0 +1,211 @@
+import dataclasses
+import json
+import os
+
+import numpy as np
+
+from .config import ModelConfig
+from .utils import capacity
+from .utils.calculations import LeadCostTable, quality_arrays, recommend, safe_divide, scenario_metrics
+from .utils.instrumentation import timed
+from .writers import jsonable
+
+# Columns returned by ResponseSurface.lookup, as batch_investment_recommendations names them
+LOOKUP_COLUMNS = [
+    'recommendation',
+    'current_cac',
+    'leads_cac',
+    'people_cac',
+    'base_sales',
+    'leads_sales',
+    'people_sales',
+    'leads_incremental',
+    'people_incremental',
+    'additional_leads',
+    'additional_agents'
+]
+
+CAPACITY_MODELS = {cls.__name__: cls for cls in (capacity.LinearCapacity, capacity.ErlangC, capacity.ErlangA)}
+
+
+def _capacity_to_json(capacity_model):
+    if capacity_model is None:
+        return None
+    name = type(capacity_model).__name__
+    if name not in CAPACITY_MODELS:
+        raise ValueError(f"Cannot store capacity model {name} in a response surface")
+    return {'name': name, **dataclasses.asdict(capacity_model)}
+
+
+def _capacity_from_json(value):
+    if value is None:
+        return None
+    value = dict(value)
+    return CAPACITY_MODELS[value.pop('name')](**value)
+
+
+class _Inputs:
+    """The fixed model inputs a surface is built for, as evaluation arrays"""
+
+    def __init__(self, config):
+        self.config = config
+        kwargs = config.model_kwargs()
+        self.lead_cost_table = LeadCostTable(kwargs['lead_cost_tiers'])
+        self.distribution, self.conversion = quality_arrays(kwargs['lead_quality_distribution'])
+
+    def evaluate(self, total_leads, salespeople):
+        return scenario_metrics(
+            total_leads, salespeople, self.config.max_leads_per_salesperson, self.config.salesperson_cost,
+            self.distribution, self.conversion, self.lead_cost_table, self.config.capacity_model
+        )
+
+    def scenarios(self, total_leads, salespeople, investment_amount):
+        """Lead volumes and headcounts of the baseline, leads and people options"""
+        total_leads, salespeople, investment_amount = [
+            values.ravel() for values in np.broadcast_arrays(
+                np.asarray(total_leads, dtype=float), np.asarray(salespeople, dtype=float),
+                np.asarray(investment_amount, dtype=float)
+            )
+        ]
+        additional_leads = self.lead_cost_table.leads_for_budget(investment_amount, total_leads)
+        additional_agents = investment_amount // self.config.salesperson_cost
+        leads = np.concatenate([total_leads, total_leads + additional_leads, total_leads])
+        agents = np.concatenate([salespeople, salespeople, salespeople + additional_agents])
+        return leads, agents, additional_leads, additional_agents
+
+    def recommendation(self, sales, leads, agents, additional_leads, additional_agents):
+        """Recommendation columns from the sales of the stacked scenarios; costs are exact"""
+        cost = self.lead_cost_table.cost(leads) + self.config.salesperson_cost * agents
+        base_sales, leads_sales, people_sales = np.split(sales, 3)
+        base_cac, leads_cac, people_cac = np.split(safe_divide(cost, sales), 3)
+        recommendation, leads_incremental, people_incremental = recommend(
+            base_sales, leads_sales, leads_cac, people_sales, people_cac, self.config.max_cac
+        )
+        return dict(zip(LOOKUP_COLUMNS, (
+            recommendation, base_cac, leads_cac, people_cac, base_sales, leads_sales, people_sales,
+            leads_incremental, people_incremental, additional_leads, additional_agents
+        )))
+
+
+@timed('build_surface')
+def build_surface(path, config=None, leads=(0, 20000), salespeople=(1, 50), budgets=(0, 200000), lead_points=2049):
+    """Evaluate a model over a grid and save it as a memory-mappable surface
+
+    ``config`` (a ModelConfig, default ModelConfig()) fixes the rate card,
+    quality mix, capacity model and costs. ``leads``, ``salespeople`` and
+    ``budgets`` are (low, high) ranges of base lead volume, base headcount
+    and investment amount to answer instantly. A budget only changes the
+    lead volume (through the rate card) or the whole agent count, so the grid
+    spans total lead volume, with ``lead_points`` even steps, against every
+    whole headcount, far enough to cover every leads or people option in
+    range. Writes ``surface.npy`` and ``surface.json`` into the directory
+    ``path`` and returns the opened ResponseSurface.
+    """
+    config = config or ModelConfig()
+    inputs = _Inputs(config)
+    budget_high = float(budgets[1])
+    # Queries beyond the grid are still answered exactly, so sampled starts are enough here
+    starts = np.linspace(float(leads[0]), float(leads[1]), 65)
+    most_leads = np.max(starts + inputs.lead_cost_table.leads_for_budget(budget_high, starts))
+    lead_axis = (float(leads[0]), float(most_leads), int(lead_points))
+    most_agents = int(salespeople[1]) + int(budget_high // config.salesperson_cost)
+    agent_axis = (int(salespeople[0]), most_agents)
+
+    grid_leads, grid_agents = np.meshgrid(
+        np.linspace(*lead_axis), np.arange(agent_axis[0], agent_axis[1] + 1), indexing='ij'
+    )
+    sales = inputs.evaluate(grid_leads, grid_agents)['sales'].reshape(grid_leads.shape)
+
+    os.makedirs(path, exist_ok=True)
+    np.save(os.path.join(path, 'surface.npy'), sales)
+    header = {
+        'config': {**config.model_kwargs(), 'capacity_model': _capacity_to_json(config.capacity_model)},
+        'lead_axis': lead_axis,
+        'agent_axis': agent_axis,
+        'budgets': [float(budgets[0]), budget_high]
+    }
+    with open(os.path.join(path, 'surface.json'), 'w') as f:
+        # Strict JSON: an open-ended tier volume is written as null and read back as open-ended
+        json.dump(jsonable(header), f, indent=2, allow_nan=False)
+    return ResponseSurface(path)
+
+
+class ResponseSurface:
+    """Interpolated recommendations from a surface written by build_surface
+
+    ``surface.npy`` holds sales for every (total leads, headcount) grid point
+    and is opened read-only with ``mmap_mode='r'``, so worker
+    processes that open the same file share its pages through the OS cache
+    instead of each holding a copy, and a lookup only touches the grid
+    points around its query. Sales are interpolated along lead volume at the
+    two nearest whole headcounts; lead and agent costs, and so the CACs, are
+    recomputed exactly. Queries whose scenarios fall outside the grid are
+    evaluated exactly instead.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, 'surface.json')) as f:
+            header = json.load(f)
+        config = header['config']
+        config['capacity_model'] = _capacity_from_json(config['capacity_model'])
+        self.config = ModelConfig(**config)
+        self.lead_axis = tuple(header['lead_axis'])
+        self.agent_axis = tuple(header['agent_axis'])
+        self.budgets = tuple(header['budgets'])
+        self.sales = np.load(os.path.join(path, 'surface.npy'), mmap_mode='r')
+        self._inputs = _Inputs(self.config)
+
+    def _interpolate(self, total_leads, salespeople):
+        """Interpolate sales at points known to be inside the grid"""
+        start, stop, count = self.lead_axis
+        step = (stop - start) / (count - 1) if count > 1 else 1.0
+        position = np.clip((total_leads - start) / step, 0, count - 1)
+        low = np.minimum(position.astype(int), max(count - 2, 0))
+        high = np.minimum(low + 1, count - 1)
+        weight = position - low
+
+        agents = salespeople - self.agent_axis[0]
+        agent_low = np.floor(agents).astype(int)
+        agent_high = np.minimum(agent_low + 1, self.sales.shape[1] - 1)
+        agent_weight = agents - agent_low
+
+        sales = self.sales
+        at_low = sales[low, agent_low] * (1 - weight) + sales[high, agent_low] * weight
+        at_high = sales[low, agent_high] * (1 - weight) + sales[high, agent_high] * weight
+        return at_low * (1 - agent_weight) + at_high * agent_weight
+
+    def contains(self, total_leads, salespeople):
+        """True where a scenario's lead volume and headcount lie inside the grid"""
+        start, stop, _ = self.lead_axis
+        return (
+            (total_leads >= start) & (total_leads <= stop)
+            & (salespeople >= self.agent_axis[0]) & (salespeople <= self.agent_axis[1])
+        )
+
+    @timed('surface.lookup')
+    def lookup(self, total_leads, salespeople, investment_amount):
+        """get_investment_recommendation figures for base leads, headcount and budget
+
+        Inputs broadcast. Returns LOOKUP_COLUMNS plus ``exact``, which marks
+        results evaluated exactly because they fell outside the grid; values
+        are floats (and a str recommendation) for scalar inputs.
+        """
+        scalar = all(np.ndim(value) == 0 for value in (total_leads, salespeople, investment_amount))
+        leads, agents, additional_leads, additional_agents = self._inputs.scenarios(
+            total_leads, salespeople, investment_amount
+        )
+        inside = np.all(np.split(self.contains(leads, agents), 3), axis=0)
+        stacked_inside = np.tile(inside, 3)
+
+        sales = np.empty(len(leads))
+        sales[stacked_inside] = self._interpolate(leads[stacked_inside], agents[stacked_inside])
+        outside = ~stacked_inside
+        if outside.any():
+            sales[outside] = self._inputs.evaluate(leads[outside], agents[outside])['sales']
+
+        result = self._inputs.recommendation(sales, leads, agents, additional_leads, additional_agents)
+        result['exact'] = ~inside
+        if scalar:
+            return {name: values[0].item() for name, values in result.items()}
+        return result
@@ -0,0 +1,140 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .config import ModelConfig, thaw_quality, thaw_tiers
+from .utils.calculations import METRIC_COLUMNS, LeadCostTable, quality_arrays, scenario_metrics
+
+# Grid dimensions in the order they are enumerated (last one varies fastest)
+DIMENSIONS = [
+    'base_leads',
+    'base_salespeople',
+    'max_leads_per_salesperson',
+    'conversion_scale',
+    'rate_card'
+]
+
+
+class SweepGrid:
+    """Cartesian grid of model inputs for sensitivity analysis
+
+    Each numeric dimension is a 1-D sequence of values; ``conversion_scale``
+    multiplies every tier's conversion rate and ``lead_cost_tiers`` is a list of
+    alternative rate cards. Dimensions left as None use the value from
+    ``base`` (a ModelConfig). Grid points are numbered in C order over
+    DIMENSIONS, so any chunk of point indices can be evaluated independently.
+    """
+
+    def __init__(self, base=None, base_leads=None, base_salespeople=None,
+                 max_leads_per_salesperson=None, conversion_scale=None, lead_cost_tiers=None):
+        self.base = base if base is not None else ModelConfig()
+        self.values = {
+            'base_leads': self._axis(base_leads, self.base.base_leads),
+            'base_salespeople': self._axis(base_salespeople, self.base.base_salespeople),
+            'max_leads_per_salesperson': self._axis(max_leads_per_salesperson, self.base.max_leads_per_salesperson),
+            'conversion_scale': self._axis(conversion_scale, 1.0),
+            'rate_card': np.arange(1 if lead_cost_tiers is None else len(lead_cost_tiers))
+        }
+        self.rate_cards = [thaw_tiers(self.base.lead_cost_tiers)] if lead_cost_tiers is None else list(lead_cost_tiers)
+        self.cost_tables = [LeadCostTable(rate_card) for rate_card in self.rate_cards]
+        self.shape = tuple(len(self.values[name]) for name in DIMENSIONS)
+        self.size = int(np.prod(self.shape))
+
+    @staticmethod
+    def _axis(values, default):
+        return np.atleast_1d(np.asarray(default if values is None else values, dtype=float))
+
+    def __len__(self):
+        return self.size
+
+    def points(self, start, stop):
+        """Return the input values of grid points ``start``..``stop - 1``"""
+        index = np.arange(start, stop)
+        coordinates = np.unravel_index(index, self.shape)
+        points = {'point': index}
+        for name, coordinate in zip(DIMENSIONS, coordinates):
+            points[name] = self.values[name][coordinate]
+        points['rate_card'] = points['rate_card'].astype(np.int64)
+        return points
+
+
+def evaluate_chunk(grid, start, stop):
+    """Evaluate grid points ``start``..``stop - 1`` into a dict of columns"""
+    points = grid.points(start, stop)
+    distribution, conversion = quality_arrays(thaw_quality(grid.base.lead_quality_distribution))
+    # Conversion rates per grid point, shaped (points, tiers)
+    conversion = points['conversion_scale'][:, None] * conversion[None, :]
+
+    metrics = {name: np.empty(stop - start) for name in METRIC_COLUMNS}
+    for rate_card in np.unique(points['rate_card']):
+        rows = points['rate_card'] == rate_card
+        values = scenario_metrics(
+            points['base_leads'][rows],
+            points['base_salespeople'][rows],
+            points['max_leads_per_salesperson'][rows],
+            grid.base.salesperson_cost,
+            distribution,
+            conversion[rows],
+            grid.cost_tables[rate_card],
+            grid.base.capacity_model
+        )
+        for name in METRIC_COLUMNS:
+            metrics[name][rows] = values[name]
+    return {**points, **metrics}
+
+
+def _chunks(size, chunk_size):
+    for start in range(0, size, chunk_size):
+        yield start, min(start + chunk_size, size)
+
+
+def iter_sweep(grid, chunk_size=100000, workers=None, progress=None):
+    """Stream sweep results chunk by chunk, in grid order
+
+    Chunks are evaluated in-process when ``workers`` is 0 or 1 or the grid fits
+    in one chunk; otherwise they are farmed out to a ProcessPoolExecutor with
+    ``workers`` processes (defaults to the CPU count). At most two chunks per
+    worker are in flight, so memory stays bounded. ``progress`` is called as
+    ``progress(points_done, total_points)`` after each chunk.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    in_process = workers <= 1 or grid.size <= chunk_size
+
+    def ordered_results():
+        if in_process:
+            for start, stop in _chunks(grid.size, chunk_size):
+                yield stop - start, evaluate_chunk(grid, start, stop)
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = deque()
+            for start, stop in _chunks(grid.size, chunk_size):
+                pending.append((stop - start, pool.submit(evaluate_chunk, grid, start, stop)))
+                if len(pending) >= 2 * workers:
+                    size, future = pending.popleft()
+                    yield size, future.result()
+            while pending:
+                size, future = pending.popleft()
+                yield size, future.result()
+
+    done = 0
+    for size, result in ordered_results():
+        done += size
+        if progress is not None:
+            progress(done, grid.size)
+        yield result
+
+
+def run_sweep(grid, chunk_size=100000, workers=None, progress=None):
+    """Evaluate a whole grid and return its columns as a dict of arrays
+
+    The result is identical whatever ``chunk_size`` or ``workers`` is used.
+    """
+    columns = {}
+    for chunk in iter_sweep(grid, chunk_size=chunk_size, workers=workers, progress=progress):
+        for name, values in chunk.items():
+            columns.setdefault(name, []).append(values)
+    return {name: np.concatenate(values) for name, values in columns.items()}
@@ -0,0 +1,178 @@
+import numpy as np
+
+from .calculations import scenario_metrics
+from .instrumentation import timed
+
+
+def lead_breakpoints(lead_cost_table, salespeople, max_leads_per_salesperson, distribution):
+    """Lead volumes where sales or lead cost change slope at a fixed headcount
+
+    Returns ``(volumes, kinds, tiers)`` sorted by volume. ``kinds`` is
+    'capacity' where the quality tier ``tiers[i]`` stops being fully worked
+    (the tiers before it fill the agents) and 'price' where rate card tier
+    ``tiers[i]`` ends.
+    """
+    max_capacity = salespeople * float(max_leads_per_salesperson)
+    cumulative_distribution = np.cumsum(distribution)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        capacity_points = np.where(cumulative_distribution > 0, max_capacity / cumulative_distribution, np.inf)
+    price_points = lead_cost_table.ends
+
+    volumes = np.concatenate([capacity_points, price_points])
+    kinds = np.array(['capacity'] * len(capacity_points) + ['price'] * len(price_points))
+    tiers = np.concatenate([np.arange(len(capacity_points)), np.arange(len(price_points))])
+    keep = np.isfinite(volumes)
+    order = np.argsort(volumes[keep], kind='stable')
+    return volumes[keep][order], kinds[keep][order], tiers[keep][order]
+
+
+def _slack_ranges(points, slack, tail_slope, bounded):
+    """Intervals where a piecewise-linear slack is <= 0
+
+    ``points`` are sorted breakpoints with ``slack`` evaluated on them; slack
+    is linear between points and, unless ``bounded``, continues past the last
+    point with ``tail_slope``.
+    """
+    ranges = []
+    inside = slack <= 0
+    low = points[0] if inside[0] else None
+    for i in range(1, len(points)):
+        if inside[i] == inside[i - 1]:
+            continue
+        root = points[i - 1] + slack[i - 1] / (slack[i - 1] - slack[i]) * (points[i] - points[i - 1])
+        if inside[i]:
+            low = root
+        else:
+            ranges.append((float(low), float(root)))
+            low = None
+
+    if bounded:
+        if low is not None:
+            ranges.append((float(low), float(points[-1])))
+    elif low is not None:
+        high = points[-1] - slack[-1] / tail_slope if tail_slope > 0 else np.inf
+        ranges.append((float(low), float(high)))
+    elif tail_slope < 0:
+        ranges.append((float(points[-1] - slack[-1] / tail_slope), float(np.inf)))
+    return ranges
+
+
+@timed('break_even')
+def break_even(total_leads, salespeople, max_leads_per_salesperson, salesperson_cost, max_cac,
+               distribution, conversion, lead_cost_table):
+    """Exact break-even and saturation points for a linear-capacity model
+
+    Sales are piecewise linear in lead volume (for a fixed headcount) and in
+    headcount (for a fixed lead volume), and lead cost is piecewise linear in
+    volume, so CAC - max_cac changes sign only on segments between known
+    breakpoints and every crossing solves in closed form. Headcounts are
+    treated as continuous; round ``salespeople_ranges`` inwards for whole
+    agents.
+    """
+    def evaluate(leads, agents):
+        return scenario_metrics(
+            leads, agents, max_leads_per_salesperson, salesperson_cost,
+            distribution, conversion, lead_cost_table
+        )
+
+    # Lead volume at the current headcount
+    volumes, kinds, _ = lead_breakpoints(lead_cost_table, salespeople, max_leads_per_salesperson, distribution)
+    bounded = np.isfinite(lead_cost_table.max_volume)
+    points = np.unique(np.concatenate([[0.0], volumes]))
+    if bounded:
+        points = points[points <= lead_cost_table.max_volume]
+    tail = points[-1] + 1.0
+    metrics = evaluate(np.append(points, tail), salespeople)
+    slack = metrics['total_cost'] - max_cac * metrics['sales']
+    lead_ranges = _slack_ranges(points, slack[:-1], slack[-1] - slack[-2], bounded)
+
+    # Sales stop growing once the agents only have time for the best tier
+    capacity_points = volumes[kinds == 'capacity']
+    points = np.unique(np.concatenate([[0.0], capacity_points, capacity_points + 1.0]))
+    sales = evaluate(points, salespeople)['sales']
+    growing = np.nonzero(np.diff(sales) > 1e-12 * np.maximum(sales[1:], 1.0))[0]
+    if len(growing) == 0:
+        saturation_leads = 0.0
+    elif growing[-1] == len(points) - 2:
+        saturation_leads = float('inf')
+    else:
+        saturation_leads = float(points[growing[-1] + 1])
+
+    # Headcount at the current lead volume: sales bend where each tier becomes fully worked
+    cumulative_distribution = np.cumsum(distribution)
+    agent_points = np.unique(np.concatenate([[0.0], total_leads * cumulative_distribution / max_leads_per_salesperson]))
+    metrics = evaluate(total_leads, np.append(agent_points, agent_points[-1] + 1.0))
+    slack = metrics['total_cost'] - max_cac * metrics['sales']
+    salespeople_ranges = _slack_ranges(agent_points, slack[:-1], slack[-1] - slack[-2], False)
+
+    return {
+        'lead_ranges': lead_ranges,
+        'min_leads': lead_ranges[0][0] if lead_ranges else None,
+        'max_leads': lead_ranges[-1][1] if lead_ranges else None,
+        'saturation_leads': saturation_leads,
+        'salespeople_ranges': salespeople_ranges,
+        'min_salespeople': salespeople_ranges[0][0] if salespeople_ranges else None,
+        'max_salespeople': salespeople_ranges[-1][1] if salespeople_ranges else None,
+        'saturation_salespeople': float(agent_points[-1])
+    }
+
+
+@timed('sensitivities')
+def sensitivities(total_leads, salespeople, max_leads_per_salesperson, salesperson_cost,
+                  distribution, conversion, lead_cost_table, capacity_model=None):
+    """Marginal sales, cost and CAC per extra lead and per extra agent
+
+    Lead derivatives are exact right-hand slopes (the effect of the next lead)
+    for linear capacity, and a one-lead forward difference for queueing
+    capacity models. Agent effects are exact differences for one more whole
+    agent. Inputs broadcast; returns a dict of flat arrays.
+    """
+    total_leads, salespeople = [
+        values.ravel() for values in np.broadcast_arrays(np.asarray(total_leads, dtype=float), np.asarray(salespeople))
+    ]
+
+    def evaluate(leads, agents):
+        return scenario_metrics(
+            leads, agents, max_leads_per_salesperson, salesperson_cost,
+            distribution, conversion, lead_cost_table, capacity_model
+        )
+
+    base = evaluate(total_leads, salespeople)
+    plus_agent = evaluate(total_leads, salespeople + 1)
+    marginal_cost = lead_cost_table.marginal_cost(total_leads)
+
+    if capacity_model is None or capacity_model.piecewise_linear:
+        # Slope of the greedy fill on the segment just above each volume
+        cumulative_distribution = np.concatenate([[0.0], np.cumsum(distribution)])
+        cumulative_conversions = np.concatenate([[0.0], np.cumsum(distribution * conversion)])
+        max_capacity = salespeople * np.asarray(max_leads_per_salesperson, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            capacity_share = np.where(total_leads > 0, max_capacity / total_leads, np.inf)
+        full_tiers = np.searchsorted(cumulative_distribution[1:], capacity_share, side='left')
+        partial_conversion = np.append(conversion, 0.0)[full_tiers]
+        sales_per_lead = cumulative_conversions[full_tiers] - cumulative_distribution[full_tiers] * partial_conversion
+    else:
+        plus_lead = evaluate(total_leads + 1, salespeople)
+        sales_per_lead = plus_lead['sales'] - base['sales']
+
+    sales, total_cost = base['sales'], base['total_cost']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cac_per_lead = np.where(sales > 0, (marginal_cost * sales - total_cost * sales_per_lead) / sales ** 2, np.nan)
+        incremental_cac_per_lead = np.where(sales_per_lead > 0, marginal_cost / sales_per_lead, np.inf)
+        sales_per_agent = plus_agent['sales'] - sales
+        incremental_cac_per_agent = np.where(
+            sales_per_agent > 0, (plus_agent['total_cost'] - total_cost) / sales_per_agent, np.inf
+        )
+
+    return {
+        'sales': sales,
+        'total_cost': total_cost,
+        'total_cac': base['total_cac'],
+        'marginal_sales_per_lead': sales_per_lead,
+        'marginal_cost_per_lead': marginal_cost,
+        'marginal_cac_per_lead': cac_per_lead,
+        'incremental_cac_per_lead': incremental_cac_per_lead,
+        'marginal_sales_per_agent': sales_per_agent,
+        'marginal_cac_per_agent': plus_agent['total_cac'] - base['total_cac'],
+        'incremental_cac_per_agent': incremental_cac_per_agent
+    }
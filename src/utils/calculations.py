@@ -0,0 +1,290 @@
+import numpy as np
+
+from .capacity import LinearCapacity
+from .instrumentation import timed
+
+# Columns produced for every scenario, in the order calculate_metrics reports them
+METRIC_COLUMNS = [
+    'sales',
+    'total_cac',
+    'lead_cac',
+    'agent_cac',
+    'handled_leads',
+    'total_leads',
+    'total_cost',
+    'lead_cost',
+    'agent_cost'
+]
+
+
+def tier_volume(tier):
+    """A rate card tier's end volume; None, which strict JSON writes for inf, is open-ended"""
+    return float('inf') if tier['volume'] is None else float(tier['volume'])
+
+
+class LeadCostTable:
+    """Cumulative index over a tiered lead price card
+
+    Each tier's ``volume`` is the cumulative lead count at which it ends and
+    ``cost`` is the price per lead inside it. Breakpoints and the cumulative cost
+    at the start of every tier are computed once, so cost queries are a binary
+    search plus one multiply-add regardless of the number of tiers. Leads beyond
+    the last finite volume are not priced, matching the original tier walk. A
+    ``volume`` of None (null in strict JSON) is open-ended.
+    """
+
+    def __init__(self, lead_cost_tiers):
+        ends = np.array([tier_volume(tier) for tier in lead_cost_tiers], dtype=float)
+        unit_costs = np.array([tier['cost'] for tier in lead_cost_tiers], dtype=float)
+        if len(ends) == 0:
+            raise ValueError("lead_cost_tiers must contain at least one tier")
+        if np.isnan(ends).any() or ends[0] < 0 or np.any(np.diff(ends) < 0):
+            raise ValueError("lead_cost_tiers volumes must be non-negative and non-decreasing")
+
+        starts = np.concatenate([[0.0], ends[:-1]])
+        widths = ends - starts
+        # Avoid inf * 0 for an unbounded tier that happens to be free
+        tier_totals = np.where(unit_costs == 0, 0.0, widths * unit_costs)
+
+        self.starts = starts
+        self.ends = ends
+        self.unit_costs = unit_costs
+        self.start_costs = np.concatenate([[0.0], np.cumsum(tier_totals[:-1])])
+        self.end_costs = self.start_costs + tier_totals
+        self.max_volume = ends[-1]
+
+    def __len__(self):
+        return len(self.ends)
+
+    def tier_index(self, total_leads):
+        """Return the index of the tier each lead volume falls into"""
+        index = np.searchsorted(self.starts, total_leads, side='right') - 1
+        return np.clip(index, 0, len(self) - 1)
+
+    @timed('lead_cost')
+    def cost(self, total_leads):
+        """Calculate total cost for a scalar or array of lead volumes"""
+        total_leads = np.clip(np.asarray(total_leads, dtype=float), 0, self.max_volume)
+        index = self.tier_index(total_leads)
+        return self.start_costs[index] + (total_leads - self.starts[index]) * self.unit_costs[index]
+
+    def marginal_cost(self, total_leads):
+        """Return the price of the next lead bought at each volume"""
+        total_leads = np.asarray(total_leads, dtype=float)
+        marginal = self.unit_costs[self.tier_index(total_leads)]
+        return np.where(total_leads >= self.max_volume, 0.0, marginal)
+
+    @timed('leads_for_budget')
+    def leads_for_budget(self, budget, start_leads=0):
+        """Return how many extra leads a budget buys at marginal tier prices
+
+        Purchases start at ``start_leads`` and climb the price card from there.
+        Volume beyond the last finite tier is not for sale, so the answer is
+        capped at the end of the rate card.
+        """
+        start_leads = np.clip(np.asarray(start_leads, dtype=float), 0, self.max_volume)
+        target_cost = self.cost(start_leads) + np.maximum(np.asarray(budget, dtype=float), 0)
+
+        index = np.clip(np.searchsorted(self.end_costs, target_cost, side='left'), 0, len(self) - 1)
+        unit_costs = self.unit_costs[index]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            within_tier = (target_cost - self.start_costs[index]) / unit_costs
+        total_leads = np.where(unit_costs > 0, self.starts[index] + within_tier, self.ends[index])
+        total_leads = np.minimum(total_leads, self.max_volume)
+        return np.maximum(total_leads - start_leads, 0)
+
+
+def quality_tiers(lead_quality_distribution):
+    """Return tier names, distribution and conversion arrays in fill order
+
+    Agents work the best-converting leads first, so tiers are sorted by
+    conversion rate, highest first; ties keep their original order. Any number
+    of tiers is supported.
+    """
+    names = list(lead_quality_distribution)
+    distribution = np.array([lead_quality_distribution[tier]['distribution'] for tier in names], dtype=float)
+    conversion = np.array([lead_quality_distribution[tier]['conversion_rate'] for tier in names], dtype=float)
+
+    order = np.argsort(-conversion, kind='stable')
+    return [names[i] for i in order], distribution[order], conversion[order]
+
+
+def quality_arrays(lead_quality_distribution):
+    """Return distribution and conversion arrays in fill order"""
+    _, distribution, conversion = quality_tiers(lead_quality_distribution)
+    return distribution, conversion
+
+
+@timed('fill_capacity')
+def fill_capacity(total_leads, max_capacity, distribution, conversion):
+    """Greedily assign capacity to lead tiers in the given order
+
+    Returns arrays of handled leads and conversions. Tiers are filled in the
+    order of ``distribution``; each takes as many leads as the capacity left
+    by the tiers before it allows. With cumulative sums over the tiers, the
+    number of fully worked tiers is a binary search on ``capacity / leads`` and
+    only the next tier is clipped, so the cost per scenario does not grow with
+    the number of tiers. Summing shares before scaling by lead volume rounds
+    differently from adding tier by tier, so results can differ from a
+    per-tier loop in the last bit or two (relative error around 1e-15).
+
+    ``conversion`` is either one rate per tier, or an array shaped
+    (scenarios, tiers) holding per-scenario rates.
+    """
+    total_leads, max_capacity = np.broadcast_arrays(
+        np.asarray(total_leads, dtype=float), np.asarray(max_capacity, dtype=float)
+    )
+    distribution = np.asarray(distribution, dtype=float)
+    conversion = np.asarray(conversion, dtype=float)
+
+    # Cumulative share of leads in the tiers before each tier, padded with an
+    # empty tier so "every tier fully worked" indexes safely
+    cumulative_distribution = np.concatenate([[0.0], np.cumsum(distribution)])
+    padded_distribution = np.concatenate([distribution, [0.0]])
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        capacity_share = np.where(total_leads > 0, max_capacity / total_leads, np.inf)
+    full_tiers = np.searchsorted(cumulative_distribution[1:], capacity_share, side='right')
+
+    full_leads = total_leads * cumulative_distribution[full_tiers]
+    partial_leads = np.clip(max_capacity - full_leads, 0, total_leads * padded_distribution[full_tiers])
+    handled_leads = full_leads + partial_leads
+
+    tier_conversions = distribution * conversion
+    padding = [(0, 0)] * (conversion.ndim - 1) + [(1, 0)]
+    cumulative_conversions = np.pad(np.cumsum(tier_conversions, axis=-1), padding)
+    padded_conversion = np.pad(conversion, [(0, 0)] * (conversion.ndim - 1) + [(0, 1)])
+    if conversion.ndim == 1:
+        full_rate = cumulative_conversions[full_tiers]
+        partial_rate = padded_conversion[full_tiers]
+    else:
+        rows = np.arange(len(conversion)).reshape(total_leads.shape)
+        full_rate = cumulative_conversions[rows, full_tiers]
+        partial_rate = padded_conversion[rows, full_tiers]
+    total_conversions = total_leads * full_rate + partial_leads * partial_rate
+
+    return handled_leads, total_conversions
+
+
+def safe_divide(numerator, denominator):
+    """Divide element-wise, returning inf where the denominator is not positive"""
+    numerator, denominator = np.broadcast_arrays(
+        np.asarray(numerator, dtype=float), np.asarray(denominator, dtype=float)
+    )
+    out = np.full(numerator.shape, np.inf)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+@timed('scenario_metrics')
+def scenario_metrics(total_leads, salespeople, max_leads_per_salesperson, salesperson_cost,
+                     distribution, conversion, lead_cost_table, capacity_model=None):
+    """Evaluate every scenario metric as array operations
+
+    ``total_leads``, ``salespeople``, ``max_leads_per_salesperson`` and
+    ``salesperson_cost`` broadcast against each other; the result maps each name
+    in METRIC_COLUMNS to a flat array with one value per scenario.
+    ``capacity_model`` decides how many leads agents work (LinearCapacity when
+    None).
+    """
+    total_leads, salespeople, max_leads_per_salesperson, salesperson_cost = [
+        values.ravel() for values in np.broadcast_arrays(
+            np.asarray(total_leads, dtype=float),
+            np.asarray(salespeople),
+            np.asarray(max_leads_per_salesperson),
+            np.asarray(salesperson_cost)
+        )
+    ]
+
+    if capacity_model is None:
+        capacity_model = LinearCapacity()
+    max_capacity = capacity_model.handled_capacity(total_leads, salespeople, max_leads_per_salesperson)
+    handled_leads, total_conversions = fill_capacity(total_leads, max_capacity, distribution, conversion)
+
+    lead_cost = lead_cost_table.cost(total_leads)
+    agent_cost = salesperson_cost * salespeople
+    return metric_columns(total_leads, handled_leads, total_conversions, lead_cost, agent_cost)
+
+
+def metric_columns(total_leads, handled_leads, total_conversions, lead_cost, agent_cost):
+    """Assemble the METRIC_COLUMNS dict from handled leads, conversions and costs"""
+    total_cost = lead_cost + agent_cost
+    return {
+        'sales': total_conversions,
+        'total_cac': safe_divide(total_cost, total_conversions),
+        'lead_cac': safe_divide(lead_cost, total_conversions),
+        'agent_cac': safe_divide(agent_cost, total_conversions),
+        'handled_leads': handled_leads,
+        'total_leads': total_leads,
+        'total_cost': total_cost,
+        'lead_cost': lead_cost,
+        'agent_cost': agent_cost
+    }
+
+
+def recommend(base_sales, leads_sales, leads_cac, people_sales, people_cac, max_cac):
+    """Choose between leads, people or doing nothing for arrays of scenarios
+
+    A scenario only counts when its CAC is within ``max_cac``. Returns the
+    recommendation labels and the incremental sales of each option.
+    """
+    leads_incremental = np.where(leads_cac <= max_cac, leads_sales - base_sales, 0.0)
+    people_incremental = np.where(people_cac <= max_cac, people_sales - base_sales, 0.0)
+
+    recommendation = np.where(
+        np.maximum(leads_incremental, people_incremental) <= 0,
+        'do_nothing',
+        np.where(people_incremental > leads_incremental, 'people', 'leads')
+    )
+    return recommendation, leads_incremental, people_incremental
+
+
+def scenario_labels(lead_multipliers, additional_agents=(), mixed=()):
+    """Label lead-multiplier scenarios, extra-agent scenarios and (multiplier, agents) pairs"""
+    def agent_label(agents):
+        return f"{agents:+d} agent{'s' if abs(agents) > 1 else ''}"
+
+    labels = [f"{multiplier:.1f}x leads" for multiplier in lead_multipliers]
+    labels += [agent_label(agents) for agents in additional_agents]
+    labels += [f"{multiplier:.1f}x leads {agent_label(agents)}" for multiplier, agents in mixed]
+    return labels
+
+
+def investment_recommendation(metrics, base_leads, max_cac):
+    """Build get_investment_recommendation's result from three evaluated scenarios
+
+    ``metrics`` maps METRIC_COLUMNS to arrays whose rows are the baseline, the
+    budget spent on leads and the budget spent on agents.
+    """
+    leads_multiplier = metrics['total_leads'][1] / base_leads if base_leads else float('inf')
+    scenarios = ["1.0x leads", f"{leads_multiplier:.1f}x leads", "1.0x leads"]
+    base_metrics, leads_metrics, people_metrics = [
+        {'scenario': scenario, **{column: float(metrics[column][i]) for column in METRIC_COLUMNS}}
+        for i, scenario in enumerate(scenarios)
+    ]
+
+    # Determine recommendation based on CAC and incremental sales
+    recommendation, leads_incremental, people_incremental = recommend(
+        base_metrics['sales'], leads_metrics['sales'], leads_metrics['total_cac'],
+        people_metrics['sales'], people_metrics['total_cac'], max_cac
+    )
+    recommendation = str(recommendation)
+    return {
+        'recommendation': recommendation,
+        'reason': recommendation_reason(recommendation),
+        'current_cac': base_metrics['total_cac'],
+        'leads_cac': leads_metrics['total_cac'],
+        'people_cac': people_metrics['total_cac'],
+        'base_metrics': base_metrics,
+        'leads_metrics': leads_metrics,
+        'people_metrics': people_metrics,
+        'leads_incremental': float(leads_incremental),
+        'people_incremental': float(people_incremental)
+    }
+
+
+def recommendation_reason(recommendation):
+    """Explain a recommendation label"""
+    if recommendation == 'do_nothing':
+        return 'No investment scenario meets CAC requirements'
+    return f'Best incremental sales achieved by investing in {recommendation}'
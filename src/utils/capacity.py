@@ -0,0 +1,204 @@
+import dataclasses
+import functools
+import math
+
+import numpy as np
+
+from .instrumentation import timed
+
+# Default operating hours per monthly period (22 days x 8 hours)
+HOURS_PER_PERIOD = 176.0
+
+
+@dataclasses.dataclass(frozen=True)
+class LinearCapacity:
+    """Each agent works up to max_leads_per_salesperson leads per period
+
+    This is the model's original flat-rate capacity: no waiting and no
+    abandonment.
+    """
+    piecewise_linear = True
+
+    @timed('capacity')
+    def handled_capacity(self, offered_leads, salespeople, max_leads_per_salesperson):
+        """Return the number of leads agents can work in the period"""
+        return salespeople * max_leads_per_salesperson
+
+
+def _log_sum_exp(values):
+    peak = values.max()
+    return peak + math.log(np.exp(values - peak).sum())
+
+
+def _per_headcount(offered_leads, salespeople, evaluate, max_points=256):
+    """Evaluate ``evaluate(leads, agents)`` once per distinct input and scatter back
+
+    Values are computed once per distinct headcount and lead volume. When a
+    headcount has more than ``max_points`` distinct volumes (e.g. Monte Carlo
+    samples) the smooth curve is evaluated on an even grid and interpolated.
+    """
+    offered_leads, salespeople = np.broadcast_arrays(
+        np.asarray(offered_leads, dtype=float), np.floor(np.asarray(salespeople, dtype=float))
+    )
+    leads, agents = offered_leads.ravel(), salespeople.ravel()
+    values = np.empty(len(leads))
+    for headcount in np.unique(agents):
+        rows = agents == headcount
+        unique_leads, inverse = np.unique(leads[rows], return_inverse=True)
+        if len(unique_leads) > max_points:
+            grid = np.linspace(unique_leads[0], unique_leads[-1], max_points)
+            curve = np.array([evaluate(volume, int(headcount)) for volume in grid])
+            values[rows] = np.interp(leads[rows], grid, curve)
+        else:
+            curve = np.array([evaluate(volume, int(headcount)) for volume in unique_leads])
+            values[rows] = curve[inverse.ravel()]
+    return values.reshape(offered_leads.shape)
+
+
+def erlang_c(agents, offered_load):
+    """Probability that an arriving contact has to wait (Erlang C)
+
+    Erlang B is evaluated in log space, so this stays stable for thousands of
+    agents. Returns 1 when the offered load is at or above the agent count.
+    """
+    if agents <= 0 or offered_load >= agents:
+        return 1.0
+    if offered_load <= 0:
+        return 0.0
+    k = np.arange(agents + 1)
+    log_factorials = np.concatenate([[0.0], np.cumsum(np.log(k[1:]))])
+    log_terms = k * math.log(offered_load) - log_factorials
+    erlang_b = math.exp(log_terms[-1] - _log_sum_exp(log_terms))
+    return agents * erlang_b / (agents - offered_load * (1 - erlang_b))
+
+
+def _answered_share(agents, offered_load, answer_ratio):
+    """Share of contacts answered within ``answer_ratio`` handle times (M/M/N)"""
+    if agents <= 0 or offered_load >= agents:
+        return 0.0
+    wait_probability = erlang_c(agents, offered_load)
+    return 1 - wait_probability * math.exp(-(agents - offered_load) * answer_ratio)
+
+
+@functools.lru_cache(maxsize=4096)
+def _peak_answered_load(agents, answer_ratio):
+    """Offered load at which ``agents`` answer the most contacts in time
+
+    Answered load ``a * share(a)`` rises with the offered load ``a`` and then
+    falls to zero as ``a`` approaches the headcount; a golden-section search
+    finds its peak.
+    """
+    def answered(load):
+        return load * _answered_share(agents, load, answer_ratio)
+
+    low, high = 0.0, float(agents)
+    ratio = (math.sqrt(5) - 1) / 2
+    left, right = high - ratio * (high - low), low + ratio * (high - low)
+    left_value, right_value = answered(left), answered(right)
+    while high - low > 1e-9 * max(agents, 1):
+        if left_value < right_value:
+            low, left, left_value = left, right, right_value
+            right = low + ratio * (high - low)
+            right_value = answered(right)
+        else:
+            high, right, right_value = right, left, left_value
+            left = high - ratio * (high - low)
+            left_value = answered(left)
+    return (low + high) / 2
+
+
+@dataclasses.dataclass(frozen=True)
+class ErlangC:
+    """Queueing capacity where leads not answered quickly are lost
+
+    Leads arrive evenly over ``hours_per_period`` and each takes
+    ``handle_time_minutes`` to work. Callers wait patiently (M/M/N), but a
+    lead only counts as worked when it is answered within
+    ``answer_within_minutes``; speed-to-lead decides conversion. Handled leads
+    are offered leads times that service level. The service level falls to
+    zero as the load approaches the headcount, so past the load that answers
+    the most leads in time the extra leads are treated as overflow and not
+    taken: handled leads level off instead of collapsing. Each agent still
+    works at most ``max_leads_per_salesperson`` leads.
+    """
+    handle_time_minutes: float = 20.0
+    answer_within_minutes: float = 5.0
+    hours_per_period: float = HOURS_PER_PERIOD
+    piecewise_linear = False
+
+    def _offered_load(self, leads):
+        return leads / self.hours_per_period * self.handle_time_minutes / 60
+
+    def service_level(self, offered_leads, salespeople):
+        """Share of leads answered within answer_within_minutes"""
+        answer_ratio = self.answer_within_minutes / self.handle_time_minutes
+
+        def evaluate(leads, agents):
+            return _answered_share(agents, self._offered_load(leads), answer_ratio)
+        return _per_headcount(offered_leads, salespeople, evaluate)
+
+    @timed('capacity')
+    def handled_capacity(self, offered_leads, salespeople, max_leads_per_salesperson):
+        """Return the number of leads answered within the service-level target"""
+        answer_ratio = self.answer_within_minutes / self.handle_time_minutes
+
+        def evaluate(leads, agents):
+            if agents <= 0:
+                return 0.0
+            # Leads beyond the peak are overflow; they neither add nor cost answered leads
+            taken = min(leads, _peak_answered_load(agents, answer_ratio) / self._offered_load(1.0))
+            return taken * _answered_share(agents, self._offered_load(taken), answer_ratio)
+        handled = _per_headcount(offered_leads, salespeople, evaluate)
+        return np.minimum(handled, np.floor(np.asarray(salespeople, dtype=float)) * max_leads_per_salesperson)
+
+
+@dataclasses.dataclass(frozen=True)
+class ErlangA:
+    """Queueing capacity with customer abandonment (M/M/N+M)
+
+    Leads arrive evenly over ``hours_per_period``, take
+    ``handle_time_minutes`` to work and abandon after an exponentially
+    distributed wait with mean ``patience_minutes``. The stationary
+    distribution of the birth-death chain is built in log space, truncated
+    where the tail is negligible, so large headcounts stay fast and stable.
+    Each agent still works at most ``max_leads_per_salesperson`` leads.
+    """
+    handle_time_minutes: float = 20.0
+    patience_minutes: float = 10.0
+    hours_per_period: float = HOURS_PER_PERIOD
+    piecewise_linear = False
+
+    def __post_init__(self):
+        if self.patience_minutes <= 0:
+            raise ValueError("patience_minutes must be positive; use ErlangC for infinite patience")
+
+    def handled_fraction(self, offered_leads, salespeople):
+        """Share of offered leads that are worked rather than abandoned"""
+        service_rate = 60 / self.handle_time_minutes
+        abandon_rate = 60 / self.patience_minutes
+
+        def evaluate(leads, agents):
+            arrival_rate = leads / self.hours_per_period
+            if arrival_rate <= 0:
+                return 1.0
+            if agents <= 0:
+                return 0.0
+            # Enough queue states that the remaining tail probability is negligible
+            overload = max(0.0, (arrival_rate - agents * service_rate) / abandon_rate)
+            spread = math.sqrt(arrival_rate / abandon_rate)
+            n_max = int(agents + overload + 10 * spread + 50)
+
+            n = np.arange(1, n_max + 1)
+            departure_rate = service_rate * np.minimum(n, agents) + abandon_rate * np.maximum(n - agents, 0)
+            log_weights = np.concatenate([[0.0], np.cumsum(math.log(arrival_rate) - np.log(departure_rate))])
+            probabilities = np.exp(log_weights - _log_sum_exp(log_weights))
+
+            busy_agents = np.minimum(np.arange(n_max + 1), agents)
+            return min(1.0, float(probabilities @ busy_agents) * service_rate / arrival_rate)
+        return _per_headcount(offered_leads, salespeople, evaluate)
+
+    @timed('capacity')
+    def handled_capacity(self, offered_leads, salespeople, max_leads_per_salesperson):
+        """Return the number of leads worked before callers abandon"""
+        handled = np.asarray(offered_leads, dtype=float) * self.handled_fraction(offered_leads, salespeople)
+        return np.minimum(handled, np.floor(np.asarray(salespeople, dtype=float)) * max_leads_per_salesperson)
@@ -0,0 +1,16 @@
+from .instrumentation import timed
+
+
+def require_pandas():
+    """Import pandas on first use so the numeric core runs with NumPy alone"""
+    try:
+        import pandas as pd
+    except ImportError as error:
+        raise ImportError("DataFrame output requires pandas: pip install pandas") from error
+    return pd
+
+
+@timed('dataframe')
+def to_frame(columns):
+    """Build a DataFrame from a dict of columns"""
+    return require_pandas().DataFrame(columns)
@@ -0,0 +1,163 @@
+"""Opt-in timing of the model's hot paths
+
+Hot-path functions are wrapped with ``timed(stage)``. While no Stats object
+is active the wrapper only checks one attribute before calling through, so
+instrumentation can stay compiled in:
+
+    with instrument() as stats:
+        model.get_investment_recommendation(50000)
+    print(stats.report())
+
+Stage times are inclusive: a stage's time includes any stages it calls.
+"""
+import cProfile
+import functools
+import io
+import pstats
+import threading
+import time
+
+
+class Stats:
+    """Call counts and wall-clock totals per stage"""
+
+    def __init__(self):
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            entry = self._stages.get(stage)
+            if entry is None:
+                self._stages[stage] = [1, seconds, seconds, seconds]
+            else:
+                entry[0] += 1
+                entry[1] += seconds
+                entry[2] = min(entry[2], seconds)
+                entry[3] = max(entry[3], seconds)
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+
+    def __contains__(self, stage):
+        return stage in self._stages
+
+    def __getitem__(self, stage):
+        return self.as_dict()[stage]
+
+    def as_dict(self):
+        """Return {stage: {calls, total_seconds, mean_seconds, min_seconds, max_seconds}}, slowest first"""
+        with self._lock:
+            entries = sorted(self._stages.items(), key=lambda item: item[1][1], reverse=True)
+            return {
+                stage: {
+                    'calls': calls,
+                    'total_seconds': total,
+                    'mean_seconds': total / calls,
+                    'min_seconds': fastest,
+                    'max_seconds': slowest
+                }
+                for stage, (calls, total, fastest, slowest) in entries
+            }
+
+    def report(self):
+        """Format the stats as a text table"""
+        lines = [f"{'stage':<40} {'calls':>8} {'total ms':>12} {'mean ms':>10} {'max ms':>10}"]
+        for stage, entry in self.as_dict().items():
+            lines.append(
+                f"{stage:<40} {entry['calls']:>8} {entry['total_seconds'] * 1000:>12.3f} "
+                f"{entry['mean_seconds'] * 1000:>10.3f} {entry['max_seconds'] * 1000:>10.3f}"
+            )
+        return '\n'.join(lines)
+
+
+class _State:
+    stats = None
+
+
+_state = _State()
+
+
+def enable(stats=None):
+    """Start recording into ``stats`` (a new Stats by default) and return it"""
+    _state.stats = stats if stats is not None else Stats()
+    return _state.stats
+
+
+def disable():
+    """Stop recording and return the Stats that was active, if any"""
+    stats, _state.stats = _state.stats, None
+    return stats
+
+
+def active_stats():
+    return _state.stats
+
+
+class instrument:
+    """Context manager that records stage timings for the enclosed calls"""
+
+    def __init__(self, stats=None):
+        self.stats = stats if stats is not None else Stats()
+
+    def __enter__(self):
+        self._previous = _state.stats
+        _state.stats = self.stats
+        return self.stats
+
+    def __exit__(self, *exc_info):
+        _state.stats = self._previous
+
+
+def timed(stage):
+    """Decorator recording each call's wall time under ``stage`` while enabled"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            stats = _state.stats
+            if stats is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                stats.record(stage, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+def profile_call(func, *args, output=None, profiler='cprofile', sort='cumulative', limit=30, **kwargs):
+    """Run ``func(*args, **kwargs)`` once under a profiler
+
+    Returns ``(result, report_text)``. With ``profiler='cprofile'`` and an
+    ``output`` path, the raw profile is also written there for snakeviz or
+    pstats. ``profiler='pyinstrument'`` needs pyinstrument installed; its
+    HTML report is written to ``output`` when given.
+    """
+    if profiler == 'cprofile':
+        profile = cProfile.Profile()
+        result = profile.runcall(func, *args, **kwargs)
+        if output is not None:
+            profile.dump_stats(output)
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats(sort).print_stats(limit)
+        return result, text.getvalue()
+
+    if profiler == 'pyinstrument':
+        try:
+            from pyinstrument import Profiler
+        except ImportError as error:
+            raise ImportError("profiler='pyinstrument' requires pyinstrument: pip install pyinstrument") from error
+        sampler = Profiler()
+        sampler.start()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            sampler.stop()
+        if output is not None:
+            with open(output, 'w') as f:
+                f.write(sampler.output_html())
+        return result, sampler.output_text()
+
+    raise ValueError("profiler must be 'cprofile' or 'pyinstrument'")
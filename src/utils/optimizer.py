@@ -0,0 +1,128 @@
+import numpy as np
+
+from .calculations import scenario_metrics
+from .instrumentation import timed
+
+
+def _lead_breakpoints(lead_cost_table, max_capacity, distribution):
+    """Lead volumes where sales or lead cost change slope
+
+    Lead cost bends at every rate card boundary and sales bend wherever the
+    cumulative volume of the tiers filled so far reaches capacity. Returns an
+    array shaped (len(max_capacity), n_breakpoints).
+    """
+    cumulative_distribution = np.cumsum(distribution)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        capacity_points = max_capacity[:, None] / cumulative_distribution[None, :]
+    capacity_points = np.where(cumulative_distribution[None, :] > 0, capacity_points, np.inf)
+
+    cost_points = lead_cost_table.ends[np.isfinite(lead_cost_table.ends)]
+    cost_points = np.broadcast_to(cost_points, (len(max_capacity), len(cost_points)))
+    return np.concatenate([capacity_points, cost_points], axis=1)
+
+
+@timed('optimal_split')
+def optimal_split(investment_amount, base_leads, base_salespeople, max_leads_per_salesperson,
+                  salesperson_cost, max_cac, distribution, conversion, lead_cost_table,
+                  capacity_model=None, resolution=256):
+    """Find the split of a budget between agents and leads with the most sales
+
+    Every whole number of extra agents the budget affords is considered. For
+    each headcount the lead volume is solved exactly: sales and total cost are
+    piecewise linear in leads, so the best volume is either a breakpoint or the
+    point on a segment where CAC crosses ``max_cac``. Ties in sales go to the
+    cheaper split. Returns a dict describing the winning split.
+
+    With a queueing ``capacity_model`` sales are no longer piecewise linear, so
+    ``resolution`` evenly spaced volumes per headcount are added to the
+    breakpoints and the answer is accurate to that grid.
+    """
+    max_agents = int(max(investment_amount, 0) // salesperson_cost) if salesperson_cost > 0 else 0
+    additional_agents = np.arange(max_agents + 1)
+    salespeople = base_salespeople + additional_agents
+    max_capacity = salespeople * float(max_leads_per_salesperson)
+
+    # Lead volume range affordable with the budget left after hiring
+    lead_budget = investment_amount - additional_agents * salesperson_cost
+    low = np.full(len(additional_agents), float(base_leads))
+    high = low + lead_cost_table.leads_for_budget(lead_budget, base_leads)
+
+    if capacity_model is None or capacity_model.piecewise_linear:
+        points = _lead_breakpoints(lead_cost_table, max_capacity, distribution)
+    else:
+        cost_points = lead_cost_table.ends[np.isfinite(lead_cost_table.ends)]
+        grid = low[:, None] + (high - low)[:, None] * np.linspace(0, 1, resolution)[None, :]
+        points = np.concatenate([grid, np.broadcast_to(cost_points, (len(low), len(cost_points)))], axis=1)
+    points = np.concatenate([low[:, None], high[:, None], points], axis=1)
+    points = np.sort(np.clip(points, low[:, None], high[:, None]), axis=1)
+
+    def evaluate(total_leads):
+        metrics = scenario_metrics(
+            total_leads, salespeople[:, None], max_leads_per_salesperson, salesperson_cost,
+            distribution, conversion, lead_cost_table, capacity_model
+        )
+        return {name: values.reshape(total_leads.shape) for name, values in metrics.items()}
+
+    at_points = evaluate(points)
+    slack = at_points['total_cost'] - max_cac * at_points['sales']
+
+    # Between consecutive breakpoints slack is linear, so a sign change has an exact root
+    left, right = slack[:, :-1], slack[:, 1:]
+    crosses = (left <= 0) != (right <= 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        fraction = np.where(crosses, left / (left - right), 0.0)
+    roots = points[:, :-1] + fraction * (points[:, 1:] - points[:, :-1])
+    at_roots = evaluate(roots)
+
+    candidates = {
+        name: np.concatenate([at_points[name], at_roots[name]], axis=1)
+        for name in at_points
+    }
+    feasible = np.concatenate([slack <= 0, crosses], axis=1) & (candidates['sales'] > 0)
+    agents = np.broadcast_to(additional_agents[:, None], feasible.shape)
+
+    base_sales = at_points['sales'][0, 0]
+    result = {
+        'recommendation': 'do_nothing',
+        'additional_agents': 0,
+        'additional_leads': 0.0,
+        'agent_spend': 0.0,
+        'lead_spend': 0.0,
+        'total_spend': 0.0,
+        'sales': float(base_sales),
+        'incremental_sales': 0.0,
+        'total_cac': float(at_points['total_cac'][0, 0])
+    }
+    if not feasible.any():
+        return result
+
+    sales = candidates['sales'][feasible]
+    cost = candidates['total_cost'][feasible]
+    best = np.lexsort((cost, -sales))[0]
+    incremental_sales = sales[best] - base_sales
+    if incremental_sales <= 0:
+        return result
+
+    best_agents = int(agents[feasible][best])
+    additional_leads = candidates['total_leads'][feasible][best] - base_leads
+    agent_spend = float(best_agents * salesperson_cost)
+    lead_spend = float(candidates['lead_cost'][feasible][best] - at_points['lead_cost'][0, 0])
+    if best_agents == 0:
+        recommendation = 'leads'
+    elif additional_leads <= 0:
+        recommendation = 'people'
+    else:
+        recommendation = 'mixed'
+
+    result.update({
+        'recommendation': recommendation,
+        'additional_agents': best_agents,
+        'additional_leads': float(additional_leads),
+        'agent_spend': agent_spend,
+        'lead_spend': lead_spend,
+        'total_spend': agent_spend + lead_spend,
+        'sales': float(sales[best]),
+        'incremental_sales': float(incremental_sales),
+        'total_cac': float(candidates['total_cac'][feasible][best])
+    })
+    return result
@@ -0,0 +1,167 @@
+import heapq
+
+import numpy as np
+
+from .calculations import LeadCostTable, safe_divide
+from .instrumentation import timed
+
+
+class RateCardSet:
+    """Several vendors' lead_cost_tiers indexed on one merged set of breakpoints
+
+    Every tier boundary of every card is a breakpoint, so between two
+    consecutive breakpoints each vendor's cost is a straight line. The cost
+    at each breakpoint and the price after it are tabulated per vendor once;
+    pricing any volumes for all vendors is then one binary search and a
+    multiply-add. A vendor cannot sell beyond its last finite tier, so its
+    cost there is inf.
+    """
+
+    def __init__(self, rate_cards):
+        if isinstance(rate_cards, dict):
+            self.names = [str(name) for name in rate_cards]
+            cards = list(rate_cards.values())
+        else:
+            cards = list(rate_cards)
+            self.names = [f'vendor_{i}' for i in range(len(cards))]
+        if not cards:
+            raise ValueError("Compare at least one rate card")
+        self.tables = [LeadCostTable(card) for card in cards]
+        self.max_volumes = np.array([table.max_volume for table in self.tables])
+
+        ends = np.concatenate([table.ends for table in self.tables])
+        self.breakpoints = np.unique(np.concatenate([[0.0], ends[np.isfinite(ends)]]))
+        self.start_costs = np.array([table.cost(self.breakpoints) for table in self.tables])
+        self.prices = np.array([table.marginal_cost(self.breakpoints) for table in self.tables])
+        self.available = self.breakpoints[None, :] < self.max_volumes[:, None]
+
+    def __len__(self):
+        return len(self.tables)
+
+    def costs(self, total_leads):
+        """Cost of ``total_leads`` from each vendor, shaped (vendors, volumes)
+
+        ``total_leads`` is 1-D (the same volumes for every vendor) or
+        (vendors, volumes).
+        """
+        total_leads = np.asarray(total_leads, dtype=float)
+        interval = np.clip(np.searchsorted(self.breakpoints, total_leads, side='right') - 1, 0, None)
+        offset = total_leads - self.breakpoints[interval]
+        if total_leads.ndim < 2:
+            # Breakpoints are shared, so one search serves every vendor
+            interval, offset = np.atleast_1d(interval), np.atleast_1d(offset)
+            cost = self.start_costs[:, interval] + self.prices[:, interval] * offset
+        else:
+            cost = (np.take_along_axis(self.start_costs, interval, axis=1)
+                    + np.take_along_axis(self.prices, interval, axis=1) * offset)
+        return np.where(np.atleast_1d(total_leads) <= self.max_volumes[:, None], cost, np.inf)
+
+    def cheapest(self, total_leads):
+        """Index of the cheapest vendor for each volume"""
+        return np.argmin(self.costs(total_leads), axis=0)
+
+    def crossovers(self):
+        """Volumes where the cheapest single vendor changes, in order
+
+        Returns ``(volume, from, to)`` vendor index triples. Within each
+        merged interval the cheapest line is followed to its next crossing
+        with a cheaper-per-lead line; ties go to the lower price.
+        """
+        events = []
+        current = None
+        edges = np.append(self.breakpoints, np.inf)
+        for j in range(len(self.breakpoints)):
+            costs, prices, available = self.start_costs[:, j], self.prices[:, j], self.available[:, j]
+            if not available.any():
+                break
+            start = edges[j]
+            candidates = np.nonzero(available & (costs <= costs[available].min()))[0]
+            best = candidates[np.argmin(prices[candidates])]
+            if current is not None and best != current:
+                events.append((float(start), int(current), int(best)))
+            current, offset = best, 0.0
+            while True:
+                cheaper = available & (prices < prices[current])
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    distance = np.where(cheaper, (costs - costs[current]) / (prices[current] - prices), np.inf)
+                distance = np.where(distance >= offset, distance, np.inf)
+                nearest = distance.min()
+                if not start + nearest < edges[j + 1]:
+                    break
+                ties = np.nonzero(distance == nearest)[0]
+                following = ties[np.argmin(prices[ties])]
+                events.append((float(start + nearest), int(current), int(following)))
+                current, offset = following, nearest
+        return events
+
+    def blend(self):
+        """Rate card for buying from all vendors, cheapest marginal tier first
+
+        Each vendor's tiers are bought in their own order, and the next tier
+        taken is always the cheapest one any vendor offers next. Returns
+        ``(lead_cost_tiers, vendors)``: the blended card and the vendor behind
+        each of its tiers. When every card's prices rise with volume this is
+        the cheapest way to buy any volume.
+        """
+        offers = [(table.unit_costs[0], vendor, 0) for vendor, table in enumerate(self.tables)]
+        heapq.heapify(offers)
+        volume = 0.0
+        tiers, vendors = [], []
+        while offers and np.isfinite(volume):
+            price, vendor, tier = heapq.heappop(offers)
+            table = self.tables[vendor]
+            width = table.ends[tier] - table.starts[tier]
+            if width > 0:
+                volume += width
+                tiers.append({'volume': float(volume), 'cost': float(price)})
+                vendors.append(vendor)
+            if tier + 1 < len(table):
+                heapq.heappush(offers, (table.unit_costs[tier + 1], vendor, tier + 1))
+        return tiers, np.array(vendors, dtype=int)
+
+    def allocation(self, total_leads):
+        """Leads bought from each vendor when blending, shaped (vendors, volumes)"""
+        tiers, vendors = self.blend()
+        ends = np.array([tier['volume'] for tier in tiers])
+        starts = np.concatenate([[0.0], ends[:-1]])
+        total_leads = np.atleast_1d(np.asarray(total_leads, dtype=float))
+        bought = np.clip(total_leads[None, :] - starts[:, None], 0, (ends - starts)[:, None])
+        allocation = np.zeros((len(self), len(total_leads)))
+        np.add.at(allocation, vendors, bought)
+        return allocation
+
+
+@timed('compare_rate_cards')
+def compare_rate_cards(rate_cards, total_leads, sales, agent_cost):
+    """Cost and CAC of every vendor's rate card, and of blending them, at each volume
+
+    ``sales`` and ``agent_cost`` are the model's figures at ``total_leads``;
+    neither depends on who sells the leads. Per-vendor arrays are shaped
+    (vendors, volumes).
+    """
+    cards = RateCardSet(rate_cards)
+    total_leads = np.atleast_1d(np.asarray(total_leads, dtype=float))
+    lead_cost = cards.costs(total_leads)
+    allocation = cards.allocation(total_leads)
+    blended_cost = cards.costs(allocation).sum(axis=0)
+    # Volumes beyond every vendor's combined supply cannot be bought
+    blended_cost = np.where(allocation.sum(axis=0) < total_leads - 1e-9 * np.maximum(total_leads, 1), np.inf, blended_cost)
+    blended_tiers, _ = cards.blend()
+
+    names = np.array(cards.names, dtype=object)
+    return {
+        'vendors': cards.names,
+        'total_leads': total_leads,
+        'sales': sales,
+        'lead_cost': lead_cost,
+        'total_cac': safe_divide(lead_cost + agent_cost, sales),
+        'cheapest': names[cards.cheapest(total_leads)],
+        'crossovers': [
+            {'volume': volume, 'from': cards.names[before], 'to': cards.names[after]}
+            for volume, before, after in cards.crossovers()
+        ],
+        'blended_tiers': blended_tiers,
+        'blended_allocation': allocation,
+        'blended_lead_cost': blended_cost,
+        'blended_total_cac': safe_divide(blended_cost + agent_cost, sales)
+    }
@@ -0,0 +1,117 @@
+import numpy as np
+
+from .calculations import METRIC_COLUMNS, scenario_labels
+from .frames import require_pandas
+
+# Scenario kinds, indexed by ScenarioResults.kind codes
+SCENARIO_KINDS = ('leads', 'agents', 'mixed')
+
+# Columns describing each scenario, ahead of METRIC_COLUMNS
+KEY_COLUMNS = ['kind', 'multiplier', 'additional_agents']
+
+
+def scenario_kinds(multipliers, additional_agents):
+    """Kind codes: extra leads only, extra agents only at 1.0x leads, or both"""
+    return np.where(
+        additional_agents == 0, 0, np.where(multipliers == 1.0, 1, 2)
+    ).astype(np.int8)
+
+
+class ScenarioResults:
+    """Scenario metrics as one array per column instead of one dict per row
+
+    ``kind`` holds int8 codes into SCENARIO_KINDS, ``multiplier`` the lead
+    multiplier on base_leads and ``additional_agents`` the headcount over the
+    base as int64; ``metrics`` maps each METRIC_COLUMNS name to a float64
+    array. Filtering by kind compares codes, and to_pandas / to_arrow hand the
+    arrays over without copying them. Text labels are only built on request.
+    """
+
+    def __init__(self, kind, multiplier, additional_agents, metrics):
+        self.kind = np.asarray(kind, dtype=np.int8)
+        self.multiplier = np.asarray(multiplier, dtype=float)
+        self.additional_agents = np.asarray(additional_agents, dtype=np.int64)
+        self.metrics = {name: np.asarray(metrics[name], dtype=float) for name in METRIC_COLUMNS}
+
+    @classmethod
+    def from_scenarios(cls, multipliers, additional_agents, metrics):
+        """Build results whose kinds follow from each row's multiplier and extra agents"""
+        multipliers, additional_agents = np.broadcast_arrays(
+            np.asarray(multipliers, dtype=float), np.asarray(additional_agents, dtype=np.int64)
+        )
+        return cls(scenario_kinds(multipliers, additional_agents), multipliers, additional_agents, metrics)
+
+    def __len__(self):
+        return len(self.kind)
+
+    @property
+    def columns(self):
+        return KEY_COLUMNS + METRIC_COLUMNS
+
+    def __getitem__(self, name):
+        if name in self.metrics:
+            return self.metrics[name]
+        if name in KEY_COLUMNS:
+            return getattr(self, name)
+        if name == 'scenario':
+            return self.labels()
+        raise KeyError(name)
+
+    def mask(self, kind):
+        """Boolean mask of the rows of ``kind`` (a name in SCENARIO_KINDS)"""
+        if kind not in SCENARIO_KINDS:
+            raise ValueError(f"Unknown scenario kind '{kind}'; use one of {SCENARIO_KINDS}")
+        return self.kind == SCENARIO_KINDS.index(kind)
+
+    def take(self, rows):
+        """Results for the rows selected by an index or boolean mask"""
+        return ScenarioResults(
+            self.kind[rows], self.multiplier[rows], self.additional_agents[rows],
+            {name: values[rows] for name, values in self.metrics.items()}
+        )
+
+    def select(self, kind):
+        """Results for the rows of one scenario kind"""
+        return self.take(self.mask(kind))
+
+    def copy(self):
+        return self.take(np.arange(len(self)))
+
+    def labels(self):
+        """Display labels such as '1.3x leads' and '+2 agents', one per row"""
+        leads, agents, mixed = [self.kind == code for code in range(len(SCENARIO_KINDS))]
+        labels = np.empty(len(self), dtype=object)
+        labels[leads] = scenario_labels(self.multiplier[leads])
+        labels[agents] = scenario_labels((), self.additional_agents[agents])
+        labels[mixed] = scenario_labels((), (), zip(self.multiplier[mixed], self.additional_agents[mixed]))
+        return labels.tolist()
+
+    def as_columns(self):
+        """The calculate_metric_columns dict: text labels plus METRIC_COLUMNS"""
+        return {'scenario': self.labels(), **self.metrics}
+
+    def to_pandas(self, labels=False):
+        """DataFrame sharing the numeric arrays, with ``kind`` as a categorical
+
+        ``labels`` adds the text ``scenario`` column first.
+        """
+        pd = require_pandas()
+        columns = {
+            'kind': pd.Categorical.from_codes(self.kind, categories=list(SCENARIO_KINDS)),
+            'multiplier': self.multiplier,
+            'additional_agents': self.additional_agents,
+            **self.metrics
+        }
+        if labels:
+            columns = {'scenario': self.labels(), **columns}
+        return pd.DataFrame(columns, copy=False)
+
+    def to_arrow(self):
+        """pyarrow Table sharing the numeric arrays, with ``kind`` dictionary encoded"""
+        try:
+            import pyarrow as pa
+        except ImportError as error:
+            raise ImportError("Arrow output requires pyarrow: pip install pyarrow") from error
+        kind = pa.DictionaryArray.from_arrays(pa.array(self.kind), pa.array(SCENARIO_KINDS))
+        numeric = {'multiplier': self.multiplier, 'additional_agents': self.additional_agents, **self.metrics}
+        return pa.table({'kind': kind, **{name: pa.array(values) for name, values in numeric.items()}})
@@ -0,0 +1,261 @@
+import numpy as np
+
+from .utils.calculations import (
+    LeadCostTable,
+    fill_capacity,
+    investment_recommendation,
+    metric_columns,
+    quality_tiers,
+    scenario_labels
+)
+from .utils.capacity import LinearCapacity
+from .utils.frames import to_frame
+from .utils.instrumentation import timed
+from .utils.results import ScenarioResults
+
+# Inputs a WhatIfModel tracks: the CallCenterModel constructor arguments plus
+# what get_investment_recommendation and calculate_metrics are asked for
+PARAMETERS = (
+    'base_leads',
+    'base_salespeople',
+    'max_leads_per_salesperson',
+    'salesperson_cost',
+    'max_cac',
+    'lead_quality_distribution',
+    'lead_cost_tiers',
+    'capacity_model',
+    'investment_amount',
+    'lead_multipliers'
+)
+
+# Extra agents in the calculate_metrics agent scenarios
+ADDITIONAL_AGENTS = np.arange(1, 4)
+
+
+def _same(old, new):
+    """True when a recomputed value equals the cached one, so dependents can be kept"""
+    if isinstance(old, np.ndarray) or isinstance(new, np.ndarray):
+        return (
+            isinstance(old, np.ndarray) and isinstance(new, np.ndarray)
+            and old.shape == new.shape and np.array_equal(old, new, equal_nan=old.dtype.kind == 'f')
+        )
+    if isinstance(old, (tuple, list)) and isinstance(new, (tuple, list)):
+        return type(old) is type(new) and len(old) == len(new) and all(map(_same, old, new))
+    if isinstance(old, dict) and isinstance(new, dict):
+        return old.keys() == new.keys() and all(_same(old[key], new[key]) for key in old)
+    try:
+        return bool(old == new)
+    except (TypeError, ValueError):
+        return False
+
+
+def _copy(value):
+    """Copy the nested dicts, lists and arrays the inputs and outputs are built from"""
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_copy(item) for item in value]
+    if isinstance(value, (np.ndarray, ScenarioResults)):
+        return value.copy()
+    return value
+
+
+def _scenario_leads(base_leads, additional_leads, multipliers):
+    # Baseline, budget on leads and budget on agents, then the metric scenarios
+    return np.concatenate([
+        [base_leads, base_leads + additional_leads, base_leads],
+        base_leads * multipliers,
+        np.full(len(ADDITIONAL_AGENTS), base_leads, dtype=float)
+    ]).astype(float)
+
+
+def _scenario_salespeople(base_salespeople, additional_agents, multipliers):
+    return np.concatenate([
+        [base_salespeople, base_salespeople, base_salespeople + additional_agents],
+        np.full(len(multipliers), base_salespeople),
+        base_salespeople + ADDITIONAL_AGENTS
+    ])
+
+
+def _capacity(total_leads, salespeople, max_leads_per_salesperson, capacity_model):
+    if capacity_model is None:
+        capacity_model = LinearCapacity()
+    return capacity_model.handled_capacity(total_leads, salespeople, max_leads_per_salesperson)
+
+
+def _multipliers(lead_multipliers):
+    if lead_multipliers is None:
+        lead_multipliers = np.arange(1.0, 2.1, 0.1)
+    return np.atleast_1d(np.asarray(lead_multipliers, dtype=float))
+
+
+# name: (function, dependencies), in dependency order. Every scenario the
+# recommendation and the metrics table need is evaluated in one row set.
+NODES = {
+    'quality': (quality_tiers, ('lead_quality_distribution',)),
+    'lead_cost_table': (LeadCostTable, ('lead_cost_tiers',)),
+    'multipliers': (_multipliers, ('lead_multipliers',)),
+    'additional_agents': (lambda amount, cost: amount // cost, ('investment_amount', 'salesperson_cost')),
+    'additional_leads': (
+        lambda table, amount, base_leads: float(table.leads_for_budget(amount, base_leads)),
+        ('lead_cost_table', 'investment_amount', 'base_leads')
+    ),
+    'scenario_leads': (_scenario_leads, ('base_leads', 'additional_leads', 'multipliers')),
+    'scenario_salespeople': (_scenario_salespeople, ('base_salespeople', 'additional_agents', 'multipliers')),
+    'capacity': (
+        _capacity,
+        ('scenario_leads', 'scenario_salespeople', 'max_leads_per_salesperson', 'capacity_model')
+    ),
+    'handled': (
+        lambda total_leads, capacity, quality: fill_capacity(total_leads, capacity, quality[1], quality[2]),
+        ('scenario_leads', 'capacity', 'quality')
+    ),
+    'lead_cost': (lambda table, total_leads: table.cost(total_leads), ('lead_cost_table', 'scenario_leads')),
+    'agent_cost': (lambda salespeople, cost: cost * salespeople, ('scenario_salespeople', 'salesperson_cost')),
+    'metrics': (
+        lambda total_leads, handled, lead_cost, agent_cost: metric_columns(
+            total_leads, handled[0], handled[1], lead_cost, agent_cost
+        ),
+        ('scenario_leads', 'handled', 'lead_cost', 'agent_cost')
+    ),
+    'recommendation': (
+        lambda metrics, base_leads, max_cac: investment_recommendation(
+            {name: values[:3] for name, values in metrics.items()}, base_leads, max_cac
+        ),
+        ('metrics', 'base_leads', 'max_cac')
+    ),
+    'metric_columns': (
+        lambda metrics, multipliers: {
+            'scenario': scenario_labels(multipliers, ADDITIONAL_AGENTS),
+            **{name: values[3:] for name, values in metrics.items()}
+        },
+        ('metrics', 'multipliers')
+    ),
+    'results': (
+        lambda metrics, multipliers: ScenarioResults(
+            np.repeat(np.array([0, 1], dtype=np.int8), [len(multipliers), len(ADDITIONAL_AGENTS)]),
+            np.concatenate([multipliers, np.ones(len(ADDITIONAL_AGENTS))]),
+            np.concatenate([np.zeros(len(multipliers), dtype=int), ADDITIONAL_AGENTS]),
+            {name: values[3:] for name, values in metrics.items()}
+        ),
+        ('metrics', 'multipliers')
+    )
+}
+
+
+class WhatIfModel:
+    """Dependency-tracked evaluation of one model for interactive what-ifs
+
+    Intermediate results (rate card index, quality tiers, capacity, handled
+    leads, costs, metrics) are cached as graph nodes. ``update`` changes some
+    inputs and only nodes downstream of them are recomputed, lazily, when an
+    output is next read. A node whose recomputed value is unchanged stops the
+    change from spreading further: a new max_cac only re-ranks the options,
+    and a price change beyond the volume the budget buys leaves every sales
+    figure alone.
+
+    Results match CallCenterModel.get_investment_recommendation and
+    calculate_metric_columns for the same inputs. ``last_recomputed`` lists
+    the nodes the most recent read recomputed.
+    """
+
+    def __init__(self, model, investment_amount=0, lead_multipliers=None):
+        self.revision = 0
+        self.last_recomputed = []
+        self._inputs = {}
+        self._changed = {}
+        self._nodes = {}
+        params = {name: getattr(model, name) for name in PARAMETERS[:-2]}
+        params.update(investment_amount=investment_amount, lead_multipliers=lead_multipliers)
+        for name, value in params.items():
+            self._inputs[name] = _copy(value)
+            self._changed[name] = 0
+
+    def __getitem__(self, name):
+        return self._inputs[name]
+
+    def update(self, **changes):
+        """Change inputs and return the updated recommendation
+
+        Accepts any name in PARAMETERS. Values equal to the current ones are
+        ignored, so passing a full set of inputs only invalidates what moved.
+        """
+        unknown = set(changes) - set(PARAMETERS)
+        if unknown:
+            raise TypeError(f"Unknown what-if parameters: {', '.join(sorted(unknown))}")
+        changed = [name for name, value in changes.items() if not _same(self._inputs[name], value)]
+        if changed:
+            self.revision += 1
+            for name in changed:
+                self._inputs[name] = _copy(changes[name])
+                self._changed[name] = self.revision
+        return self.recommendation()
+
+    def update_quality_tier(self, tier, conversion_rate=None, distribution=None):
+        """Change one quality tier's conversion rate or share and return the recommendation"""
+        quality = _copy(self._inputs['lead_quality_distribution'])
+        if conversion_rate is not None:
+            quality[tier]['conversion_rate'] = conversion_rate
+        if distribution is not None:
+            quality[tier]['distribution'] = distribution
+        return self.update(lead_quality_distribution=quality)
+
+    def update_lead_cost_tier(self, index, volume=None, cost=None):
+        """Change one rate card tier's volume or price and return the recommendation"""
+        tiers = _copy(self._inputs['lead_cost_tiers'])
+        if volume is not None:
+            tiers[index]['volume'] = volume
+        if cost is not None:
+            tiers[index]['cost'] = cost
+        return self.update(lead_cost_tiers=tiers)
+
+    def _pull(self, name, recomputed):
+        """Bring ``name`` up to the current revision; return the revision it last changed"""
+        if name in self._inputs:
+            return self._changed[name]
+        entry = self._nodes.get(name)
+        if entry is not None and entry['verified'] == self.revision:
+            return entry['changed']
+
+        function, dependencies = NODES[name]
+        dependency_changes = [self._pull(dependency, recomputed) for dependency in dependencies]
+        if entry is not None and max(dependency_changes) <= entry['verified']:
+            entry['verified'] = self.revision
+            return entry['changed']
+
+        value = function(*(self._value(dependency) for dependency in dependencies))
+        recomputed.append(name)
+        if entry is None or not _same(entry['value'], value):
+            entry = {'value': value, 'changed': self.revision}
+            self._nodes[name] = entry
+        entry['verified'] = self.revision
+        return entry['changed']
+
+    def _value(self, name):
+        if name in self._inputs:
+            return self._inputs[name]
+        return self._nodes[name]['value']
+
+    @timed('whatif.evaluate')
+    def value(self, name):
+        """Return the current value of an input or node, recomputing what is stale"""
+        recomputed = []
+        self._pull(name, recomputed)
+        self.last_recomputed = recomputed
+        return self._value(name)
+
+    def recommendation(self):
+        """get_investment_recommendation for the current inputs"""
+        return _copy(self.value('recommendation'))
+
+    def metric_columns(self):
+        """calculate_metric_columns for the current inputs"""
+        return _copy(self.value('metric_columns'))
+
+    def results(self):
+        """scenario_results for the current inputs"""
+        return _copy(self.value('results'))
+
+    def metrics(self):
+        """calculate_metrics for the current inputs"""
+        return to_frame(self.metric_columns())
@@ -0,0 +1,163 @@
+import json
+import math
+import os
+
+import numpy as np
+
+from .utils.frames import require_pandas
+
+FORMATS = {
+    '.csv': 'csv',
+    '.jsonl': 'jsonl',
+    '.ndjson': 'jsonl',
+    '.parquet': 'parquet',
+    '.pq': 'parquet'
+}
+
+
+def jsonable(value):
+    """Convert NumPy values to plain Python for strict JSON
+
+    Strict JSON has no Infinity or NaN, so non-finite floats become None
+    (null), as the HTTP service reports them. A null rate card volume reads
+    back as open-ended.
+    """
+    if isinstance(value, dict):
+        return {key: jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not math.isfinite(value):
+        return None
+    return value
+
+
+def infer_format(path):
+    """Pick an output format from a file extension"""
+    extension = os.path.splitext(str(path))[1].lower()
+    if extension not in FORMATS:
+        raise ValueError(f"Cannot infer output format from '{path}'; use one of {sorted(FORMATS)}")
+    return FORMATS[extension]
+
+
+class CSVBatchWriter:
+    """Append column batches to a CSV file one batch at a time"""
+
+    def __init__(self, path):
+        self._pd = require_pandas()
+        self.path = path
+        self.columns = None
+        self.rows = 0
+        self._file = open(path, 'w', newline='')
+
+    def write(self, batch):
+        frame = self._pd.DataFrame(batch)
+        if self.columns is None:
+            self.columns = list(frame.columns)
+        elif list(frame.columns) != self.columns:
+            raise ValueError("Batch columns do not match the first batch written")
+        frame.to_csv(self._file, header=self.rows == 0, index=False)
+        self.rows += len(frame)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class JSONLinesBatchWriter:
+    """Append column batches to a JSON Lines file, one object per row; inf and NaN are written as null"""
+
+    def __init__(self, path):
+        self.path = path
+        self.columns = None
+        self.rows = 0
+        self._file = open(path, 'w')
+
+    def write(self, batch):
+        columns = list(batch)
+        if self.columns is None:
+            self.columns = columns
+        elif columns != self.columns:
+            raise ValueError("Batch columns do not match the first batch written")
+        values = [np.asarray(batch[name]).tolist() for name in columns]
+        for row in zip(*values):
+            self._file.write(json.dumps(jsonable(dict(zip(columns, row))), allow_nan=False) + '\n')
+            self.rows += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ParquetBatchWriter:
+    """Append column batches to a Parquet file as row groups
+
+    Requires pyarrow. The schema is fixed by the first batch.
+    """
+
+    def __init__(self, path, compression='snappy'):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as error:
+            raise ImportError("Writing Parquet requires pyarrow: pip install pyarrow") from error
+        self._pa = pa
+        self._pq = pq
+        self.path = path
+        self.compression = compression
+        self.rows = 0
+        self._writer = None
+
+    def write(self, batch):
+        table = self._pa.table(batch)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema, compression=self.compression)
+        elif not table.schema.equals(self._writer.schema):
+            table = table.cast(self._writer.schema)
+        self._writer.write_table(table)
+        self.rows += table.num_rows
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def open_writer(path, format=None):
+    """Open a batch writer for ``path``, inferring the format from its extension"""
+    format = format or infer_format(path)
+    if format == 'csv':
+        return CSVBatchWriter(path)
+    if format == 'jsonl':
+        return JSONLinesBatchWriter(path)
+    if format == 'parquet':
+        return ParquetBatchWriter(path)
+    raise ValueError(f"Unsupported output format: {format}")
+
+
+def write_batches(batches, path, format=None):
+    """Stream an iterable of column batches to CSV, JSON Lines or Parquet
+
+    Only one batch is held in memory at a time. Returns the number of rows
+    written.
+    """
+    with open_writer(path, format) as writer:
+        for batch in batches:
+            writer.write(batch)
+        return writer.rows
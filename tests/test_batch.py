@@ -0,0 +1,81 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.batch import batch_investment_recommendations, run_batch_file
+from src.main import CallCenterModel
+
+FLAT_TIERS = [{'volume': float('inf'), 'cost': 40}]
+
+CONFIGS = [
+    {'base_leads': 1000, 'base_salespeople': 5, 'max_leads_per_salesperson': 100, 'max_cac': 2000, 'lead_cost_tiers': FLAT_TIERS},
+    {'base_leads': 100, 'base_salespeople': 5, 'max_leads_per_salesperson': 100, 'max_cac': 2000, 'lead_cost_tiers': FLAT_TIERS},
+    {'base_leads': 1000, 'base_salespeople': 10, 'max_cac': 100, 'lead_cost_tiers': FLAT_TIERS},
+    {'base_leads': 7300, 'base_salespeople': 5, 'salesperson_cost': 11000, 'max_cac': 400, 'max_leads_per_salesperson': 600},
+    {},
+]
+
+def test_batch_matches_single_recommendations():
+    """Test that every batch row matches get_investment_recommendation"""
+    budgets = [0, 4000, 12000, 50000]
+    results = batch_investment_recommendations(CONFIGS, budgets)
+    assert len(results) == len(CONFIGS) * len(budgets), "Should return one row per config and budget"
+
+    for _, row in results.iterrows():
+        model = CallCenterModel(**CONFIGS[row['config']])
+        expected = model.get_investment_recommendation(row['investment_amount'])
+        assert row['recommendation'] == expected['recommendation'], "Recommendation mismatch"
+        assert row['reason'] == expected['reason'], "Reason mismatch"
+        for column in ['current_cac', 'leads_cac', 'people_cac', 'leads_incremental', 'people_incremental']:
+            assert np.isclose(row[column], expected[column]), f"{column} mismatch"
+        assert np.isclose(row['base_sales'], expected['base_metrics']['sales']), "Base sales mismatch"
+
+def test_batch_preserves_order():
+    """Test that rows come back grouped by config in the given budget order"""
+    budgets = [50000, 0, 12000]
+    results = batch_investment_recommendations(pd.DataFrame(CONFIGS), budgets)
+    assert list(results['config']) == [i for i in range(len(CONFIGS)) for _ in budgets], "Configs out of order"
+    assert list(results['investment_amount'][:3]) == budgets, "Budgets out of order"
+
+def test_batch_rejects_unknown_columns():
+    """Test that misspelled configuration columns are reported"""
+    with pytest.raises(ValueError):
+        batch_investment_recommendations([{'base_lead': 10}], [1000])
+
+def test_batch_uses_per_row_investment_amount():
+    """Test that configurations can carry their own budget"""
+    configs = [dict(config, investment_amount=budget) for config, budget in zip(CONFIGS, [0, 4000, 12000, 50000, 1000])]
+    results = batch_investment_recommendations(configs)
+    assert list(results['investment_amount']) == [0, 4000, 12000, 50000, 1000], "Each row should use its own budget"
+    for _, row in results.iterrows():
+        expected = CallCenterModel(**CONFIGS[row['config']]).get_investment_recommendation(row['investment_amount'])
+        assert row['recommendation'] == expected['recommendation'], "Recommendation mismatch"
+
+    with pytest.raises(ValueError):
+        batch_investment_recommendations(CONFIGS)
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run_batch_file_streams_chunks(tmp_path, workers):
+    """Test that a file of configurations streams through in chunks, in input order"""
+    path = tmp_path / "configs.csv"
+    frame = pd.DataFrame([dict(config) for config in CONFIGS] * 7)
+    frame['lead_cost_tiers'] = [json.dumps(tiers) if isinstance(tiers, list) else tiers for tiers in frame['lead_cost_tiers']]
+    frame.to_csv(path, index=False)
+
+    output = tmp_path / "results.jsonl"
+    stats = run_batch_file(path, output, budgets=[4000, 50000], chunk_size=4, workers=workers)
+    assert stats['configs'] == len(frame) and stats['chunks'] == 9, f"Unexpected stats {stats}"
+
+    written = pd.read_json(output, lines=True)
+    expected = batch_investment_recommendations(CONFIGS * 7, [4000, 50000])
+    assert stats['rows'] == len(written) == len(expected), "Every result row should be written once"
+    assert list(written['config']) == list(expected['config']), "Rows should keep input order"
+    assert np.allclose(written['leads_incremental'], expected['leads_incremental']), "Results should match in-memory batch"
@@ -0,0 +1,37 @@
+import os
+import sys
+import tempfile
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.run_benchmarks import Setup, case_key, cases, compare_results
+
+def test_compare_flags_only_slowdowns():
+    """Test that only cases beyond the allowed slowdown are reported"""
+    baseline = {'fast': 1.0, 'steady': 1.0, 'removed': 1.0}
+    current = {'fast': 0.5, 'steady': 1.2, 'slow': 9.0}
+    assert compare_results(baseline, current, 1.25) == [], "Within-threshold and new cases should pass"
+
+    current['steady'] = 1.3
+    assert [key for key, *_ in compare_results(baseline, current, 1.25)] == ['steady'], "Slowdown should be flagged"
+
+def test_benchmark_cases_cover_requested_sizes():
+    """Test that the suite spans tier, scenario and quality-tier sizes"""
+    keys = [case_key(name, params) for name, params, _ in cases(quick=False)]
+    assert 'calculate_lead_cost[cost_tiers=500,volumes=100000]' in keys
+    assert 'calculate_metrics[scenarios=1000000]' in keys
+    assert 'evaluate_scenarios[quality_tiers=50,scenarios=10000]' in keys
+    assert 'startup[target=cli_recommend]' in keys
+    assert len(keys) == len(set(keys)), "Case names should be unique"
+
+def test_listing_cases_builds_nothing():
+    """Cases with heavy inputs build them only when run, so listing leaves no files behind"""
+    def surfaces():
+        return [name for name in os.listdir(tempfile.gettempdir()) if name.startswith('surface-')]
+
+    before = surfaces()
+    listed = list(cases(quick=False))
+    assert surfaces() == before
+    assert any(isinstance(func, Setup) for _, _, func in listed)
@@ -0,0 +1,117 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main import CallCenterModel
+from src.utils.capacity import ErlangA
+
+def tiered_model(**kwargs):
+    settings = dict(
+        base_leads=7300,
+        base_salespeople=5,
+        salesperson_cost=11000,
+        max_cac=400,
+        max_leads_per_salesperson=600,
+        lead_quality_distribution={
+            'A': {'conversion_rate': 0.20, 'distribution': 0.20},
+            'B': {'conversion_rate': 0.04, 'distribution': 0.30},
+            'C': {'conversion_rate': 0.02, 'distribution': 0.50}
+        },
+        lead_cost_tiers=[{'volume': 7300 * (2 ** i), 'cost': 7 + (3 * i)} for i in range(4)]
+    )
+    settings.update(kwargs)
+    return CallCenterModel(**settings)
+
+def sweep_range(values, cac, max_cac):
+    within = values[cac <= max_cac]
+    return within.min(), within.max()
+
+def test_breakpoints_cover_capacity_and_price():
+    """Every tier boundary and every capacity saturation point is listed in order"""
+    model = tiered_model()
+    points = model.lead_breakpoints()
+    volumes = [point['volume'] for point in points]
+    assert volumes == sorted(volumes)
+    capacity = {point['tier']: point['volume'] for point in points if point['kind'] == 'capacity'}
+    assert capacity == pytest.approx({'A': 15000, 'B': 6000, 'C': 3000}), f"Unexpected capacity points: {capacity}"
+    price = [point['volume'] for point in points if point['kind'] == 'price']
+    assert price == [7300, 14600, 29200, 58400]
+
+def test_break_even_leads_match_dense_sweep():
+    """The closed-form CAC crossings agree with a fine grid of scenarios"""
+    model = tiered_model()
+    result = model.break_even()
+
+    leads = np.linspace(0, 60000, 600001)
+    cac = model._metric_arrays(leads, model.base_salespeople)['total_cac']
+    low, high = sweep_range(leads, cac, model.max_cac)
+    assert len(result['lead_ranges']) == 1
+    assert abs(result['min_leads'] - low) <= 0.1, f"min_leads {result['min_leads']} vs sweep {low}"
+    assert abs(result['max_leads'] - high) <= 0.1, f"max_leads {result['max_leads']} vs sweep {high}"
+
+    at_edges = model._metric_arrays([result['min_leads'], result['max_leads']], model.base_salespeople)
+    assert np.allclose(at_edges['total_cac'], model.max_cac)
+
+def test_break_even_salespeople_match_dense_sweep():
+    model = tiered_model()
+    result = model.break_even()
+
+    salespeople = np.linspace(0, 40, 400001)
+    cac = model._metric_arrays(model.base_leads, salespeople)['total_cac']
+    low, high = sweep_range(salespeople, cac, model.max_cac)
+    assert abs(result['min_salespeople'] - low) <= 1e-4
+    assert abs(result['max_salespeople'] - high) <= 1e-4
+
+def test_saturation_points():
+    """Past saturation, extra leads or agents add no sales"""
+    model = tiered_model()
+    result = model.break_even()
+    assert result['saturation_leads'] == pytest.approx(15000)
+    assert result['saturation_salespeople'] == pytest.approx(model.base_leads / model.max_leads_per_salesperson)
+
+    sales = model._metric_arrays([14000, 15000, 20000], model.base_salespeople)['sales']
+    assert sales[1] > sales[0]
+    assert sales[2] == pytest.approx(sales[1])
+
+def test_unreachable_max_cac_has_no_ranges():
+    model = tiered_model(max_cac=50)
+    result = model.break_even()
+    assert result['lead_ranges'] == [] and result['min_leads'] is None
+    assert result['salespeople_ranges'] == [] and result['max_salespeople'] is None
+
+def test_break_even_rejects_queueing_capacity():
+    model = tiered_model(capacity_model=ErlangA(handle_time_minutes=15, patience_minutes=5))
+    with pytest.raises(ValueError):
+        model.break_even()
+
+def test_sensitivities_match_finite_differences():
+    """Lead slopes are the exact effect of the next lead, agent effects one more agent"""
+    model = tiered_model()
+    leads = np.array([1000, 3000, 7300, 10000, 15000, 20000])
+    result = model.sensitivities(leads, 5)
+
+    base = model._metric_arrays(leads, 5)
+    step = 1e-3
+    plus_lead = model._metric_arrays(leads + step, 5)
+    assert np.allclose(result['marginal_sales_per_lead'], (plus_lead['sales'] - base['sales']) / step)
+    assert np.allclose(result['marginal_cost_per_lead'], (plus_lead['total_cost'] - base['total_cost']) / step)
+    assert np.allclose(result['marginal_cac_per_lead'], (plus_lead['total_cac'] - base['total_cac']) / step, atol=1e-5)
+
+    plus_agent = model._metric_arrays(leads, 6)
+    assert np.allclose(result['marginal_sales_per_agent'], plus_agent['sales'] - base['sales'])
+    assert np.allclose(result['marginal_cac_per_agent'], plus_agent['total_cac'] - base['total_cac'])
+
+def test_sensitivities_scalar_and_queueing():
+    """Scalar inputs give floats; queueing capacity falls back to a one-lead difference"""
+    model = tiered_model(capacity_model=ErlangA(handle_time_minutes=15, patience_minutes=5))
+    result = model.sensitivities()
+    assert isinstance(result['marginal_sales_per_lead'], float)
+
+    base, plus_lead = model._metric_arrays([model.base_leads, model.base_leads + 1], model.base_salespeople)['sales']
+    assert result['marginal_sales_per_lead'] == pytest.approx(plus_lead - base)
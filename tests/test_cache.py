@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.cache import LRUCache, ModelResultsCache
+from src.config import ModelConfig
+from src.main import CallCenterModel
+
+def test_config_is_hashable_and_frozen():
+    """Test that equal inputs give equal, hashable, immutable configs"""
+    tiers = [{'volume': 1000, 'cost': 40}, {'volume': float('inf'), 'cost': 60}]
+    first = ModelConfig(base_leads=500, lead_cost_tiers=tiers)
+    second = ModelConfig(base_leads=500.0, lead_cost_tiers=list(tiers))
+    assert first == second and hash(first) == hash(second), "Equal inputs should hash equally"
+    assert first != first.replace(max_cac=10), "Changed inputs should differ"
+
+    with pytest.raises(AttributeError):
+        first.base_leads = 10
+
+def test_config_round_trips_through_model():
+    """Test that a config rebuilds a model with the same inputs"""
+    model = CallCenterModel(base_leads=7300, base_salespeople=5)
+    config = ModelConfig.from_model(model)
+    rebuilt = config.to_model()
+    assert ModelConfig.from_model(rebuilt) == config, "Round trip should preserve the config"
+    assert rebuilt.get_investment_recommendation(12000)['recommendation'] == model.get_investment_recommendation(12000)['recommendation']
+
+def test_lru_evicts_least_recently_used():
+    """Test eviction order and hit/miss counters"""
+    cache = LRUCache(maxsize=2)
+    cache.get_or_compute('a', lambda: 1)
+    cache.get_or_compute('b', lambda: 2)
+    cache.get_or_compute('a', lambda: 1)  # hit, 'b' becomes least recent
+    cache.get_or_compute('c', lambda: 3)  # evicts 'b'
+
+    assert 'a' in cache and 'c' in cache and 'b' not in cache, "Least recently used entry should be evicted"
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 3, 1), "Counters incorrect"
+
+def test_results_cache_serves_repeated_inputs():
+    """Test that unchanged inputs are answered from cache"""
+    cache = ModelResultsCache(maxsize=16)
+    config = ModelConfig(base_leads=7300)
+
+    first = cache.recommendation(config, 12000)
+    misses = cache.stats()['misses']
+    second = cache.recommendation(ModelConfig(base_leads=7300), 12000)
+    assert second is first, "Repeated inputs should return the cached result"
+    assert cache.stats()['misses'] == misses, "Repeated inputs should not miss"
+
+    metrics = cache.metrics(config)
+    metrics['sales'] = 0
+    assert (cache.metrics(config)['sales'] > 0).all(), "Cached DataFrames should be protected from mutation"
+
+def test_recommendation_computed_by_what_if_is_shared():
+    """A session's what-if result fills the shared cache and matches the model's answer"""
+    cache = ModelResultsCache(maxsize=16)
+    config = ModelConfig(base_leads=7300, base_salespeople=5)
+    whatif = CallCenterModel().what_if(0)
+    first = cache.recommendation(
+        config, 12000, compute=lambda: whatif.update(investment_amount=12000, **config.model_kwargs())
+    )
+    assert first == config.to_model().get_investment_recommendation(12000)
+    assert cache.recommendation(ModelConfig(base_leads=7300, base_salespeople=5), 12000) is first, \
+        "Other callers should be served the cached result"
@@ -1,12 +1,15 @@
 import os
 import sys
 
+import numpy as np
+
 # Get the absolute path to the project root
 project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.insert(0, project_root)
 
 # Now import the model
 from src.main import CallCenterModel  # Make sure main.py is lowercase
+from src.utils.calculations import fill_capacity
 
 def test_basic_capacity():
     """Test that agents can't handle more than their capacity"""
@@ -248,4 +251,159 @@ def test_complex_tiered_pricing():
     )
     
     assert abs(base_metrics['sales'] - expected_sales) < 0.01, "Sales calculation mismatch"
-    
\ No newline at end of file
+    
+# calculate_metrics() of the default model at multipliers 0.5, 0.75, ..., 2.75, then
+# +1 to +3 agents, as the original per-row loop computed them
+BASELINE_SALES = [42.5, 63.75, 85.0, 106.25, 127.5, 136.25, 145.0, 153.75, 162.5, 171.25, 85.0, 85.0, 85.0]
+BASELINE_TOTAL_CAC = [
+    1411.764705882353, 1098.0392156862745, 941.1764705882352, 875.2941176470588, 831.3725490196078,
+    873.394495412844, 910.3448275862069, 962.6016260162602, 1009.2307692307693, 1051.094890510949,
+    988.2352941176471, 1035.2941176470588, 1082.3529411764705
+]
+
+def test_vectorized_scenarios_match_calculate_metrics():
+    """Test that the vectorized engine reproduces the original per-row results to within rounding"""
+    model = CallCenterModel()
+    multipliers = np.arange(0.5, 3.0, 0.25)
+
+    metrics = model.calculate_metrics(multipliers)
+    np.testing.assert_allclose(metrics['sales'], BASELINE_SALES, rtol=1e-12)
+    np.testing.assert_allclose(metrics['total_cac'], BASELINE_TOTAL_CAC, rtol=1e-12)
+
+    vectorized = model.evaluate_scenarios(multipliers)
+    scalar = metrics.iloc[:len(multipliers)].reset_index(drop=True)
+    assert list(vectorized.columns) == list(scalar.columns), "Schema should match calculate_metrics"
+    np.testing.assert_allclose(vectorized['sales'], BASELINE_SALES[:len(multipliers)], rtol=1e-12)
+    np.testing.assert_allclose(vectorized['total_cac'], BASELINE_TOTAL_CAC[:len(multipliers)], rtol=1e-12)
+
+    # Headcounts broadcast against multipliers and match the agent scenarios
+    agent_rows = model.calculate_metrics([1.0]).iloc[1:].reset_index(drop=True)
+    by_headcount = model.evaluate_scenarios(1.0, salespeople=model.base_salespeople + np.arange(1, 4))
+    for column in ['sales', 'handled_leads', 'total_cost', 'agent_cost', 'total_cac']:
+        assert (by_headcount[column].values == agent_rows[column].values).all(), f"{column} mismatch for headcount scenarios"
+
+def reference_fill(total_leads, max_capacity, distribution, conversion):
+    """The original per-tier loop: each tier takes what capacity is left"""
+    remaining_capacity = max_capacity
+    handled_leads = total_conversions = 0.0
+    for tier_distribution, tier_conversion in zip(distribution, conversion):
+        leads_handled = min(remaining_capacity, total_leads * tier_distribution)
+        handled_leads += leads_handled
+        total_conversions += leads_handled * tier_conversion
+        remaining_capacity -= leads_handled
+    return handled_leads, total_conversions
+
+def test_fill_capacity_matches_per_tier_loop():
+    """Cumulative-sum fill agrees with adding tier by tier to within rounding"""
+    rng = np.random.default_rng(0)
+    for n_tiers in (3, 20, 100):
+        distribution = rng.dirichlet(np.ones(n_tiers))
+        conversion = np.sort(rng.uniform(0.01, 0.3, n_tiers))[::-1]
+        total_leads = rng.uniform(0, 20000, 300)
+        max_capacity = rng.uniform(0, 25000, 300)
+        handled, conversions = fill_capacity(total_leads, max_capacity, distribution, conversion)
+        expected = np.array([
+            reference_fill(leads, capacity, distribution, conversion)
+            for leads, capacity in zip(total_leads, max_capacity)
+        ])
+        assert np.allclose(handled, expected[:, 0], rtol=1e-13, atol=0), f"Handled leads drift with {n_tiers} tiers"
+        assert np.allclose(conversions, expected[:, 1], rtol=1e-13, atol=0), f"Conversions drift with {n_tiers} tiers"
+
+def test_vectorized_zero_sales_cac():
+    """Test that scenarios without sales report infinite CAC"""
+    model = CallCenterModel(base_salespeople=0)
+    results = model.evaluate_scenarios([0.0, 1.0])
+    assert (results['sales'] == 0).all(), "No agents should mean no sales"
+    assert np.isinf(results['total_cac']).all(), "CAC should be infinite without sales"
+
+def test_lead_cost_array_input():
+    """Test that lead cost accepts arrays and matches scalar queries"""
+    model = CallCenterModel()
+    volumes = np.array([0, 500, 1000, 1500, 2000, 4000, 5000, 9000])
+    costs = model.calculate_lead_cost(volumes)
+    for volume, cost in zip(volumes, costs):
+        assert cost == model.calculate_lead_cost(volume), "Array and scalar costs should agree"
+    assert costs[3] == (1000 * 40) + (500 * 52), "Mixed tier calculation incorrect"
+    assert costs[-1] == (1000 * 40) + (1000 * 52) + (3000 * 64) + (4000 * 80), "Open-ended tier calculation incorrect"
+
+def test_lead_cost_many_breakpoints():
+    """Test binary-search pricing against a direct walk over hundreds of tiers"""
+    tiers = [{'volume': 100 * (i + 1), 'cost': 10 + i} for i in range(300)]
+    model = CallCenterModel(lead_cost_tiers=tiers)
+
+    for volume in [0, 50, 100, 12345, 29999, 30000, 45000]:
+        expected, remaining, prev_volume = 0, volume, 0
+        for tier in tiers:
+            leads_in_tier = min(remaining, tier['volume'] - prev_volume)
+            expected += leads_in_tier * tier['cost']
+            remaining -= leads_in_tier
+            prev_volume = tier['volume']
+        assert model.calculate_lead_cost(volume) == expected, f"Cost mismatch at {volume} leads"
+
+def test_leads_for_budget_marginal_prices():
+    """Test the inverse cost query buys leads at the marginal tier price"""
+    model = CallCenterModel(
+        base_leads=900,
+        lead_cost_tiers=[
+            {'volume': 1000, 'cost': 40},
+            {'volume': float('inf'), 'cost': 50}
+        ]
+    )
+    # $4000 buys 100 leads at $40, the remaining $1000 buys 20 leads at $50
+    assert model.calculate_leads_for_budget(5000) == 120, "Should cross the tier boundary at marginal prices"
+    assert model.calculate_leads_for_budget(5000, start_leads=0) == 125, "Should start pricing from zero leads"
+
+    budgets = np.array([0, 4000, 5000])
+    assert list(model.calculate_leads_for_budget(budgets)) == [0, 100, 120], "Should accept budget arrays"
+
+    # Round trip: buying the leads costs exactly the budget
+    extra = model.calculate_leads_for_budget(12345)
+    spent = model.calculate_lead_cost(900 + extra) - model.calculate_lead_cost(900)
+    assert abs(spent - 12345) < 1e-6, "Inverse query should round-trip through lead cost"
+
+def greedy_fill(total_leads, capacity, tiers):
+    """Reference tier-by-tier fill in best-conversion-first order"""
+    handled, conversions = 0, 0
+    for tier in sorted(tiers.values(), key=lambda tier: -tier['conversion_rate']):
+        leads_handled = min(capacity, total_leads * tier['distribution'])
+        handled += leads_handled
+        conversions += leads_handled * tier['conversion_rate']
+        capacity -= leads_handled
+    return handled, conversions
+
+def test_many_quality_tiers():
+    """Test that every tier is used and tiers are worked best-converting first"""
+    rng = np.random.default_rng(3)
+    distribution = rng.dirichlet(np.ones(60))
+    conversion = rng.uniform(0.01, 0.3, 60)
+    tiers = {
+        f'score_{i}': {'conversion_rate': conversion[i], 'distribution': distribution[i]}
+        for i in range(60)
+    }
+    model = CallCenterModel(base_leads=5000, base_salespeople=8, max_leads_per_salesperson=300, lead_quality_distribution=tiers)
+    assert len(model.tier_names) == 60, "All tiers should be kept"
+    assert (np.diff(model.tier_conversion) <= 0).all(), "Tiers should be sorted by conversion rate"
+
+    multipliers = np.array([0.0, 0.1, 0.37, 0.5, 1.0, 2.5])
+    results = model.evaluate_scenarios(multipliers)
+    for multiplier, handled, sales in zip(multipliers, results['handled_leads'], results['sales']):
+        expected_handled, expected_sales = greedy_fill(5000 * multiplier, 8 * 300, tiers)
+        assert np.isclose(handled, expected_handled), "Handled leads mismatch"
+        assert np.isclose(sales, expected_sales), "Sales mismatch"
+
+def test_tiers_filled_by_conversion_not_name():
+    """Test that a better-converting tier is worked first whatever its name"""
+    model = CallCenterModel(
+        base_leads=1000,
+        base_salespeople=1,
+        max_leads_per_salesperson=100,
+        lead_quality_distribution={
+            'A': {'conversion_rate': 0.05, 'distribution': 0.50},
+            'B': {'conversion_rate': 0.10, 'distribution': 0.30},
+            'C': {'conversion_rate': 0.15, 'distribution': 0.20},
+            'D': {'conversion_rate': 0.30, 'distribution': 0.00}
+        }
+    )
+    results = model.calculate_metrics([1.0]).iloc[0]
+    assert model.tier_names[:3] == ['D', 'C', 'B'], "Tiers should be ordered by conversion rate"
+    assert np.isclose(results['sales'], 100 * 0.15), "Capacity should go to the 15% tier first"
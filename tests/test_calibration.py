@@ -0,0 +1,131 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.calibration import CalibrationStats, calibrate, collect_stats
+from src.cli import main
+from src.config import ModelConfig
+
+pd = pytest.importorskip("pandas")
+
+RATES = {'A': 0.2, 'B': 0.05, 'C': 0.01}
+SHARES = {'A': 0.2, 'B': 0.3, 'C': 0.5}
+
+def lead_records(n, seed=0, work_share=None, months=6):
+    """Synthetic lead history; ``work_share`` is the share of each tier that gets worked"""
+    rng = np.random.default_rng(seed)
+    work_share = work_share or {'A': 1.0, 'B': 1.0, 'C': 1.0}
+    tiers = rng.choice(list(SHARES), n, p=list(SHARES.values()))
+    worked = rng.random(n) < np.vectorize(work_share.get)(tiers)
+    converted = rng.random(n) < np.vectorize(RATES.get)(tiers)
+    return pd.DataFrame({
+        'tier': tiers, 'worked': worked, 'converted': converted,
+        'month': rng.integers(1, months + 1, n), 'notes': 'unused'
+    })
+
+def test_quality_mix_recovered():
+    records = lead_records(200000)
+    config = CalibrationStats().update(records).fit()
+    for tier, conversion_rate, distribution in config.lead_quality_distribution:
+        assert distribution == pytest.approx(SHARES[tier], abs=0.01)
+        assert conversion_rate == pytest.approx(RATES[tier], rel=0.1), f"Tier {tier} rate {conversion_rate}"
+    assert config.base_leads == pytest.approx(200000 / 6)
+
+def test_conversions_only_count_worked_leads():
+    records = pd.DataFrame({
+        'tier': ['A', 'A', 'A', 'A'], 'worked': [1, 1, 0, 0], 'converted': [1, 0, 1, 1], 'month': [1, 1, 1, 1]
+    })
+    quality = CalibrationStats().update(records).quality_distribution()
+    assert quality == {'A': {'conversion_rate': 0.5, 'distribution': 1.0}}
+
+def test_chunks_and_files_merge_exactly(tmp_path):
+    """Chunked, multi-file and parallel reads give the same counts as one pass"""
+    records = lead_records(30000, seed=1)
+    whole = CalibrationStats().update(records)
+
+    paths = []
+    for i, part in enumerate(np.array_split(np.arange(len(records)), 3)):
+        path = tmp_path / f'leads{i}.csv'
+        records.iloc[part].to_csv(path, index=False)
+        paths.append(str(path))
+    chunked = collect_stats(paths, batch_size=4000)
+    assert chunked.tiers == whole.tiers and chunked.months == whole.months
+    assert chunked.records == len(records)
+
+    parallel = collect_stats(paths, batch_size=4000, workers=2)
+    assert parallel.tiers == whole.tiers
+
+def test_capacity_from_saturated_months():
+    """When leads go unworked, worked leads per agent estimate capacity"""
+    records = lead_records(120000, seed=2, work_share={'A': 1.0, 'B': 0.5, 'C': 0.0})
+    stats = CalibrationStats().update(records)
+    capacity = stats.capacity(salespeople=20)
+    monthly_worked = records[records['worked']].groupby('month').size()
+    assert capacity['capacity_bound']
+    assert capacity['max_leads_per_salesperson'] == pytest.approx(monthly_worked.mean() / 20)
+
+    staffing = {month: 10 if month % 2 else 20 for month in range(1, 7)}
+    config = stats.fit(salespeople=staffing)
+    assert config.base_salespeople == 20
+    expected = (monthly_worked / pd.Series(staffing)).mean()
+    assert config.max_leads_per_salesperson == pytest.approx(expected)
+
+def test_unsaturated_capacity_is_lower_bound():
+    records = lead_records(6000, seed=3)
+    capacity = CalibrationStats().update(records).capacity(salespeople=5)
+    assert not capacity['capacity_bound']
+    assert capacity['max_leads_per_salesperson'] == pytest.approx(records.groupby('month').size().max() / 5)
+
+def test_parquet_calibration_keeps_base_settings(tmp_path):
+    pytest.importorskip("pyarrow")
+    path = tmp_path / 'leads.parquet'
+    lead_records(20000, seed=4).to_parquet(path)
+    base = ModelConfig(salesperson_cost=9000, max_cac=500)
+    config = calibrate(str(path), salespeople=10, base=base, batch_size=3000)
+    assert config.salesperson_cost == 9000 and config.max_cac == 500
+    assert config.to_model().get_investment_recommendation(10000)['recommendation'] in ('leads', 'people', 'do_nothing')
+
+def test_missing_columns():
+    with pytest.raises(ValueError):
+        CalibrationStats().update(pd.DataFrame({'tier': ['A'], 'worked': [True]}))
+
+def test_jsonl_calibration(tmp_path):
+    records = lead_records(3000, seed=6)
+    path = tmp_path / 'leads.jsonl'
+    records.to_json(path, orient='records', lines=True)
+    assert collect_stats([str(path)], batch_size=1000).tiers == CalibrationStats().update(records).tiers
+
+    # A field no record has is reported missing rather than read as NaN (and so as True)
+    unconverted = tmp_path / 'unconverted.jsonl'
+    records.drop(columns='converted').to_json(unconverted, orient='records', lines=True)
+    with pytest.raises(ValueError, match='converted'):
+        calibrate(str(unconverted))
+
+def test_null_flags_rejected(tmp_path):
+    records = lead_records(100, seed=7).astype({'worked': object})
+    records.loc[3, 'worked'] = None
+    with pytest.raises(ValueError, match='worked'):
+        CalibrationStats().update(records)
+
+    path = tmp_path / 'leads.csv'
+    records.to_csv(path, index=False)
+    with pytest.raises(ValueError, match='null'):
+        calibrate(str(path))
+
+def test_calibrate_command(tmp_path, capsys):
+    path = tmp_path / 'leads.csv'
+    lead_records(5000, seed=5).to_csv(path, index=False)
+    output = tmp_path / 'model.json'
+    status = main(['--salesperson-cost', '7000', 'calibrate', str(path), '--salespeople', '8', '--output', str(output)])
+    assert status == 0
+    printed = json.loads(capsys.readouterr().out)
+    assert printed['salesperson_cost'] == 7000 and printed['base_salespeople'] == 8
+    assert json.loads(output.read_text()) == printed
+    assert main(['--config', str(output), 'recommend', '--investment', '10000']) == 0
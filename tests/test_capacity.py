@@ -0,0 +1,98 @@
+import math
+import os
+import sys
+import time
+
+import numpy as np
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.config import ModelConfig
+from src.main import CallCenterModel
+from src.utils.capacity import ErlangA, ErlangC, LinearCapacity, erlang_c
+
+def test_erlang_c_known_value():
+    """Two agents at one Erlang of load wait with probability 1/3"""
+    assert math.isclose(erlang_c(2, 1.0), 1 / 3), "Erlang C for N=2, A=1 should be 1/3"
+    assert erlang_c(5, 5.0) == 1.0, "An overloaded queue always waits"
+
+def test_erlang_a_single_agent_matches_closed_form():
+    """M/M/1+M with patience equal to handle time serves (1 - e^-a) / a"""
+    model = ErlangA(handle_time_minutes=30, patience_minutes=30, hours_per_period=1)
+    offered_load = 1.5  # 3 leads per hour, 30 minutes each
+    expected = (1 - math.exp(-offered_load)) / offered_load
+    fraction = float(model.handled_fraction(3.0, 1))
+    assert math.isclose(fraction, expected, rel_tol=1e-9), f"Expected {expected}, got {fraction}"
+
+def test_queueing_capacity_is_bounded_and_monotonic():
+    """Handled leads never exceed offered leads and grow with headcount"""
+    leads = np.full(6, 20000.0)
+    agents = np.array([1, 5, 10, 20, 40, 80])
+    for capacity in (ErlangC(), ErlangA()):
+        handled = capacity.handled_capacity(leads, agents, 600)
+        assert np.all(handled <= leads + 1e-9), f"{capacity} handled more than offered"
+        assert np.all(np.diff(handled) >= -1e-9), f"{capacity} handled fewer leads with more agents"
+
+def test_overload_never_cuts_handled_leads():
+    """Past the headcount's load, more leads level off handled leads instead of zeroing them"""
+    leads = np.linspace(0, 40000, 801)
+    for agents in (5, 14):
+        handled = ErlangC().handled_capacity(leads, agents, 10000)
+        assert (handled[1:] > 0).all(), f"{agents} agents handled no leads under overload"
+        assert np.all(np.diff(handled) >= -1e-9), f"{agents} agents handled fewer leads with more offered"
+
+    pair = ErlangC().handled_capacity(np.array([7300, 7300 * 1.05]), 14, 10000)
+    assert pair[1] >= pair[0] > 0
+
+    model = CallCenterModel(base_leads=7300, base_salespeople=5, capacity_model=ErlangC())
+    assert (model.calculate_metrics()['sales'] > 0).all(), "A busy center still makes sales"
+
+def test_queueing_models_respect_max_leads_per_salesperson():
+    """Switching capacity models changes queueing, not the per-agent cap"""
+    for capacity in (ErlangC(), ErlangA()):
+        handled = capacity.handled_capacity(np.array([500.0, 5000.0]), 10, 100)
+        assert handled[0] < 1000 and handled[1] == 1000, f"{capacity} ignored the per-agent cap"
+
+def test_large_headcount_is_fast_and_stable():
+    """Thousands of agents evaluate without overflow in well under a second"""
+    start = time.perf_counter()
+    for capacity in (ErlangC(), ErlangA()):
+        handled = capacity.handled_capacity(1.5e6, 3000, 600)
+        assert np.isfinite(handled).all(), f"{capacity} overflowed at 3000 agents"
+        assert 0 < float(handled) <= 1.5e6, f"{capacity} returned {handled}"
+    assert time.perf_counter() - start < 1.0, "Large headcounts should stay fast"
+
+def test_model_accepts_capacity_model():
+    """A queueing capacity model flows through every model entry point"""
+    # A per-agent cap above what the queue can serve, so queueing decides capacity
+    model = CallCenterModel(base_leads=7300, base_salespeople=5, salesperson_cost=11000,
+                            max_cac=400, max_leads_per_salesperson=2000,
+                            capacity_model=ErlangA(handle_time_minutes=8))
+    linear = CallCenterModel(base_leads=7300, base_salespeople=5, salesperson_cost=11000,
+                             max_cac=400, max_leads_per_salesperson=2000)
+
+    metrics = model.calculate_metrics()
+    assert (metrics['handled_leads'] <= metrics['total_leads'] + 1e-9).all(), "Handled leads exceed offered"
+    assert not np.allclose(metrics['sales'], linear.calculate_metrics()['sales']), \
+        "Erlang A capacity should change the sales estimate"
+
+    recommendation = model.get_investment_recommendation(50000)
+    assert recommendation['recommendation'] in ('leads', 'people', 'do_nothing')
+
+    split = model.optimize_investment(50000)
+    assert split['total_spend'] <= 50000 + 1e-6, "Optimal split should stay within budget"
+
+def test_linear_capacity_matches_default():
+    """An explicit LinearCapacity reproduces the default flat-rate cap"""
+    default = CallCenterModel().calculate_metrics()
+    explicit = CallCenterModel(capacity_model=LinearCapacity()).calculate_metrics()
+    assert np.allclose(default['sales'], explicit['sales']), "LinearCapacity should match the default"
+
+def test_config_with_capacity_model_is_hashable():
+    """Capacity models are frozen, so configs using them can key a cache"""
+    first = ModelConfig(capacity_model=ErlangC(answer_within_minutes=2))
+    second = ModelConfig(capacity_model=ErlangC(answer_within_minutes=2))
+    assert hash(first) == hash(second) and first == second, "Equal configs should hash equally"
+    assert first.to_model().capacity_model == ErlangC(answer_within_minutes=2)
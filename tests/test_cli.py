@@ -0,0 +1,92 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.cli import main
+from src.main import CallCenterModel
+
+def run_cli(capsys, *argv):
+    status = main(list(argv))
+    return status, capsys.readouterr()
+
+def test_recommend_matches_model(capsys):
+    """The recommend command reports the same figures as the model"""
+    status, output = run_cli(capsys, '--base-leads', '2000', 'recommend', '--investment', '50000')
+    assert status == 0
+    result = json.loads(output.out)
+    expected = CallCenterModel(base_leads=2000).get_investment_recommendation(50000)
+    assert result['recommendation'] == expected['recommendation']
+    assert result['leads_incremental'] == pytest.approx(expected['leads_incremental'])
+
+def test_config_file_and_metrics(tmp_path, capsys):
+    """Model arguments can come from a JSON file, with flags taking precedence"""
+    config = tmp_path / 'model.json'
+    config.write_text(json.dumps({
+        'base_leads': 7300,
+        'lead_cost_tiers': [{'volume': 7300, 'cost': 7}, {'volume': float('inf'), 'cost': 10}]
+    }))
+    status, output = run_cli(capsys, '--config', str(config), '--base-salespeople', '5',
+                             'metrics', '--multipliers', '1.0', '2.0')
+    assert status == 0
+    rows = json.loads(output.out)
+    assert [row['scenario'] for row in rows] == ['1.0x leads', '2.0x leads', '+1 agent', '+2 agents', '+3 agents']
+    expected = CallCenterModel(base_leads=7300, base_salespeople=5, lead_cost_tiers=[
+        {'volume': 7300, 'cost': 7}, {'volume': float('inf'), 'cost': 10}
+    ]).calculate_metrics([1.0, 2.0])
+    assert [row['sales'] for row in rows] == pytest.approx(list(expected['sales']))
+
+def test_json_output_is_strict(tmp_path, capsys):
+    """Infinite CACs and open-ended tiers print as null, and null volumes read back as open-ended"""
+    status, output = run_cli(capsys, '--base-salespeople', '0', 'recommend', '--investment', '0')
+    assert status == 0 and 'Infinity' not in output.out
+    assert json.loads(output.out)['current_cac'] is None
+
+    config = tmp_path / 'model.json'
+    config.write_text(json.dumps({'lead_cost_tiers': [{'volume': 7300, 'cost': 7}, {'volume': None, 'cost': 10}]}))
+    status, output = run_cli(capsys, '--config', str(config), 'optimize', '--investment', '100000')
+    expected = CallCenterModel(lead_cost_tiers=[{'volume': 7300, 'cost': 7}, {'volume': float('inf'), 'cost': 10}])
+    assert status == 0
+    assert json.loads(output.out)['sales'] == pytest.approx(expected.optimize_investment(100000)['sales'])
+
+def test_invalid_inputs_exit_with_status_1(tmp_path, capsys):
+    config = tmp_path / 'model.json'
+    config.write_text(json.dumps({'lead_cost_tiers': []}))
+    status, output = run_cli(capsys, '--config', str(config), 'optimize', '--investment', '1000')
+    assert status == 1 and 'error' in output.err, "Invalid rate cards should be reported, not raised"
+
+def test_core_imports_stay_light():
+    """The CLI and numeric core must not load pandas or UI libraries"""
+    code = (
+        "import sys; from src.cli import main; main(['recommend', '--investment', '50000']); "
+        "sys.stderr.write(','.join(sorted({m.split('.')[0] for m in sys.modules} & "
+        "{'pandas', 'streamlit', 'plotly', 'matplotlib', 'pyarrow'})))"
+    )
+    result = subprocess.run([sys.executable, '-c', code], cwd=project_root, capture_output=True, text=True, check=True)
+    assert result.stderr == '', f"Heavy modules imported at startup: {result.stderr}"
+
+def test_batch_command(tmp_path, capsys):
+    """The batch command writes results and reports throughput stats"""
+    configs = tmp_path / 'configs.jsonl'
+    configs.write_text('\n'.join(json.dumps({'base_leads': leads, 'investment_amount': 20000}) for leads in (500, 1000, 4000)))
+    output = tmp_path / 'results.csv'
+    status, captured = run_cli(capsys, 'batch', str(configs), str(output), '--chunk-size', '2')
+    assert status == 0
+    stats = json.loads(captured.out)
+    assert stats['configs'] == 3 and stats['rows'] == 3 and stats['chunks'] == 2, f"Unexpected stats {stats}"
+    assert output.read_text().count('\n') == 4, "Header plus one line per configuration"
+
+    status, captured = run_cli(capsys, 'batch', str(configs), str(tmp_path / 'results.xlsx'))
+    assert status == 1 and 'error' in captured.err, "Unknown output formats should fail cleanly"
+
+def test_legacy_main_runs_cli(capsys):
+    """src.main.main is the CLI entry point"""
+    from src.main import main as legacy_main
+    assert legacy_main(['recommend', '--investment', '50000']) == 0
+    assert json.loads(capsys.readouterr().out)['recommendation'] in ('leads', 'people', 'do_nothing')
@@ -0,0 +1,50 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main import CallCenterModel
+
+def evaluate(model, task):
+    """Run every public evaluation for one (headcount, budget) task"""
+    salespeople, investment = task
+    recommendation = model.get_investment_recommendation(investment, salespeople=salespeople)
+    metrics = model.calculate_metrics([1.0, 1.5], salespeople=salespeople)
+    split = model.optimize_investment(investment, salespeople=salespeople)
+    return (
+        recommendation['recommendation'],
+        recommendation['leads_incremental'],
+        recommendation['people_incremental'],
+        tuple(metrics['sales']),
+        tuple(metrics['total_cac']),
+        split['additional_agents'],
+        split['sales']
+    )
+
+def test_headcount_override_matches_dedicated_model():
+    """Test that passing headcount equals building a model with that headcount"""
+    model = CallCenterModel(base_salespeople=10)
+    other = CallCenterModel(base_salespeople=4)
+    assert evaluate(model, (4, 20000)) == evaluate(other, (4, 20000)), "Headcount override should match a dedicated model"
+    assert model.base_salespeople == 10, "Evaluation must not modify the model"
+
+def test_shared_model_is_thread_safe():
+    """Hammer one model from a thread pool and check results are deterministic"""
+    model = CallCenterModel()
+    rng = np.random.default_rng(7)
+    tasks = [(int(salespeople), float(investment)) for salespeople, investment in zip(
+        rng.integers(1, 30, size=150), rng.uniform(0, 100000, size=150)
+    )]
+    expected = [evaluate(model, task) for task in tasks]
+
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        for _ in range(2):
+            results = list(pool.map(lambda task: evaluate(model, task), tasks))
+            assert results == expected, "Concurrent results should match sequential results"
+
+    assert model.base_salespeople == 10, "Concurrent evaluation must not modify the model"
@@ -0,0 +1,85 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main import CallCenterModel
+from src.utils.capacity import ErlangA
+
+RAMP = (0.25, 0.5, 0.75)
+
+def plan(model, **kwargs):
+    leads = 1000 * (1 + 0.3 * np.sin(np.arange(24) / 2))
+    salespeople = np.repeat([10, 12, 12, 15, 15, 15], 4)
+    return model.simulate_horizon(leads, salespeople, **kwargs)
+
+def assert_same_results(simulator, fresh):
+    expected = fresh.results()
+    for name, values in simulator.results().items():
+        assert np.allclose(values, expected[name]), f"Column {name} differs from a full recompute"
+
+def test_static_periods_match_single_month_model():
+    """Without ramp-up or billing cycles each period is one static month"""
+    model = CallCenterModel()
+    results = model.simulate_horizon([800, 1000, 2500], 10).results()
+    expected = model.evaluate_scenarios(np.array([800, 1000, 2500]) / model.base_leads)
+    for name in ('sales', 'handled_leads', 'total_cost', 'total_cac'):
+        assert np.allclose(results[name], expected[name]), f"{name} should match evaluate_scenarios"
+    assert np.isclose(results['cumulative_sales'][-1], expected['sales'].sum())
+
+def test_ramp_reduces_new_hire_capacity():
+    """New hires are paid in full but work at ramp productivity"""
+    model = CallCenterModel(base_salespeople=10)
+    results = model.simulate_horizon([5000] * 5, [10, 14, 14, 14, 14], ramp=RAMP).results()
+    assert np.allclose(results['effective_salespeople'], [10, 11, 12, 13, 14]), \
+        f"Unexpected ramp: {results['effective_salespeople']}"
+    assert np.allclose(results['agent_cost'], np.array([10, 14, 14, 14, 14]) * model.salesperson_cost)
+
+def test_billing_cycle_prices_cumulative_volume():
+    """Lead prices only reset at the start of each billing cycle"""
+    model = CallCenterModel()
+    results = model.simulate_horizon([1000] * 4, periods_per_billing_cycle=2).results()
+    # Each cycle buys 1000 leads at $40 then 1000 leads at $52
+    assert np.allclose(results['lead_cost'], [40000, 52000, 40000, 52000]), results['lead_cost']
+
+@pytest.mark.parametrize('kwargs', [
+    {},
+    {'ramp': RAMP},
+    {'ramp': RAMP, 'periods_per_billing_cycle': 3},
+])
+def test_update_matches_full_recompute(kwargs):
+    """Incremental edits give the same results as rebuilding the horizon"""
+    model = CallCenterModel()
+    simulator = plan(model, **kwargs)
+    for period, leads, salespeople in [(5, 1800, None), (0, None, 9), (11, 600, 20), (23, None, 3)]:
+        simulator.update(period, leads=leads, salespeople=salespeople)
+        fresh = model.simulate_horizon(simulator.leads, simulator.salespeople, **kwargs)
+        assert_same_results(simulator, fresh)
+
+def test_update_only_recomputes_affected_periods():
+    """A lead edit re-evaluates one period; a hire re-evaluates its ramp window"""
+    simulator = plan(CallCenterModel(capacity_model=ErlangA()), ramp=RAMP)
+    before = simulator.results()
+
+    recomputed = simulator.update(10, leads=1500)
+    assert list(recomputed) == [10], f"Expected only period 10, got {recomputed}"
+    after = simulator.results()
+    assert np.array_equal(after['sales'][:10], before['sales'][:10]), "Earlier periods must not change"
+    assert np.array_equal(after['sales'][11:], before['sales'][11:]), "Later per-period sales must not change"
+    assert not np.array_equal(after['cumulative_sales'][10:], before['cumulative_sales'][10:]), \
+        "Cumulative totals should roll forward"
+
+    recomputed = simulator.update(6, salespeople=13)
+    assert list(recomputed) == [6, 7, 8, 9], f"Expected the ramp window 6..9, got {recomputed}"
+
+    assert len(simulator.update(6, salespeople=13)) == 0, "An unchanged value should recompute nothing"
+
+def test_update_rejects_out_of_range_period():
+    simulator = plan(CallCenterModel())
+    with pytest.raises(IndexError):
+        simulator.update(24, leads=100)
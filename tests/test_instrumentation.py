@@ -0,0 +1,77 @@
+import os
+import sys
+import threading
+
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main import CallCenterModel
+from src.utils import instrumentation
+from src.utils.instrumentation import Stats, instrument, profile_call, timed
+
+def test_stages_recorded_while_enabled():
+    """Model calls record per-stage counts and times only inside instrument()"""
+    model = CallCenterModel()
+    model.get_investment_recommendation(50000)  # not recorded
+
+    with instrument() as stats:
+        for _ in range(3):
+            model.get_investment_recommendation(50000)
+        model.calculate_metrics()
+
+    model.get_investment_recommendation(50000)  # not recorded
+    assert stats['model.get_investment_recommendation']['calls'] == 3, "Only calls inside the block count"
+    assert stats['scenario_metrics']['calls'] == 4, "One vectorized pass per public call"
+    assert 'lead_cost' in stats and 'fill_capacity' in stats and 'dataframe' in stats
+    entry = stats['model.get_investment_recommendation']
+    assert 0 < entry['min_seconds'] <= entry['mean_seconds'] <= entry['max_seconds']
+    assert 'model.get_investment_recommendation' in stats.report()
+    assert instrumentation.active_stats() is None, "Recording should stop when the block exits"
+
+def test_disabled_wrapper_calls_through():
+    """A timed function behaves identically when recording is off"""
+    @timed('square')
+    def square(value):
+        return value * value
+
+    assert square(4) == 16
+    with instrument() as stats:
+        assert square(5) == 25
+    assert stats['square']['calls'] == 1
+
+def test_enable_disable_and_exceptions():
+    """Failed calls are still timed and enable/disable hand back the stats"""
+    @timed('fails')
+    def fails():
+        raise ValueError("boom")
+
+    stats = instrumentation.enable()
+    try:
+        with pytest.raises(ValueError):
+            fails()
+    finally:
+        assert instrumentation.disable() is stats
+    assert stats['fails']['calls'] == 1
+
+def test_stats_are_thread_safe():
+    stats = Stats()
+    threads = [threading.Thread(target=lambda: [stats.record('stage', 0.001) for _ in range(1000)]) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert stats['stage']['calls'] == 8000, "Concurrent records should not be lost"
+
+def test_profile_call(tmp_path):
+    """A single call can be profiled with cProfile and dumped to disk"""
+    model = CallCenterModel()
+    output = tmp_path / 'optimize.prof'
+    result, report = profile_call(model.optimize_investment, 50000, output=str(output))
+    assert result == model.optimize_investment(50000)
+    assert 'optimal_split' in report and output.exists()
+
+    with pytest.raises(ValueError):
+        profile_call(model.optimize_investment, 50000, profiler='perf')
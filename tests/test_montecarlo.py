@@ -0,0 +1,62 @@
+import os
+import sys
+
+import numpy as np
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main import CallCenterModel
+from src.montecarlo import Uncertainty, simulate_scenarios, summarize
+
+def test_seeded_runs_are_reproducible():
+    """Test that equal seeds give identical samples"""
+    model = CallCenterModel()
+    first = simulate_scenarios(model, model.base_leads, model.base_salespeople, Uncertainty(n_samples=5000, seed=11))
+    second = simulate_scenarios(model, model.base_leads, model.base_salespeople, Uncertainty(n_samples=5000, seed=11))
+    assert np.array_equal(first['sales'], second['sales']), "Same seed should reproduce samples"
+
+def test_bands_bracket_point_estimate():
+    """Test that P10/P50/P90 bands are ordered and centred on the deterministic result"""
+    model = CallCenterModel()
+    metrics = simulate_scenarios(model, [1000, 2000], model.base_salespeople, Uncertainty(n_samples=100000, seed=5))
+    assert metrics['sales'].shape == (2, 100000), "One row of samples per scenario"
+
+    summary = summarize(metrics, model.max_cac)
+    expected = model.evaluate_scenarios([1.0, 2.0])['sales'].values
+    assert (summary['sales_p10'] < summary['sales_p50']).all() and (summary['sales_p50'] < summary['sales_p90']).all()
+    assert np.allclose(summary['sales_mean'], expected, rtol=0.01), "Mean sales should match the point estimate"
+    assert ((summary['breach_probability'] >= 0) & (summary['breach_probability'] <= 1)).all()
+
+def test_no_noise_matches_deterministic_model():
+    """Test that vanishing uncertainty reproduces the deterministic model"""
+    model = CallCenterModel()
+    uncertainty = Uncertainty(n_samples=1000, conversion_concentration=1e12, lead_volume='fixed', seed=0)
+    metrics = simulate_scenarios(model, 1500, 12, uncertainty)
+    expected = model.evaluate_scenarios(1.5, salespeople=12).iloc[0]
+    assert np.allclose(metrics['sales'], expected['sales']), "Sales should equal the point estimate"
+    assert np.allclose(metrics['total_cac'], expected['total_cac']), "CAC should equal the point estimate"
+
+def test_risk_adjusted_recommendation():
+    """Test that the risk-adjusted answer respects the breach probability limit"""
+    model = CallCenterModel(
+        base_leads=100,
+        base_salespeople=1,
+        max_leads_per_salesperson=50,
+        max_cac=2000,
+        lead_cost_tiers=[{'volume': float('inf'), 'cost': 40}]
+    )
+    result = model.get_investment_recommendation(4000, uncertainty=Uncertainty(n_samples=20000, seed=3))
+    risk = result['risk']
+    assert risk['recommendation'] == result['recommendation'] == 'people', "Capacity-bound center should hire"
+    assert risk['scenarios']['people']['incremental_p10'] <= risk['scenarios']['people']['incremental_p90']
+
+    # Leads scenario breaches $2000 in a sizeable share of samples
+    assert risk['scenarios']['leads']['breach_probability'] > 0, "Leads scenario should sometimes breach"
+    strict = model.get_investment_recommendation(4000, uncertainty=Uncertainty(n_samples=20000, seed=3, max_breach_probability=0.0))
+    assert strict['risk']['leads_incremental'] == 0, "Any breach should rule an option out"
+
+    model.max_cac = 500
+    tight = model.get_investment_recommendation(4000, uncertainty=Uncertainty(n_samples=20000, seed=3))
+    assert tight['risk']['recommendation'] == 'do_nothing', "Nothing meets a $500 CAC"
@@ -0,0 +1,72 @@
+import os
+import sys
+
+import numpy as np
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main import CallCenterModel
+
+def app_model(**overrides):
+    """Model matching the Streamlit app's default inputs"""
+    params = dict(
+        base_leads=7300,
+        base_salespeople=5,
+        salesperson_cost=11000,
+        max_cac=400,
+        max_leads_per_salesperson=600,
+        lead_quality_distribution={
+            'A': {'conversion_rate': 0.20, 'distribution': 0.20},
+            'B': {'conversion_rate': 0.04, 'distribution': 0.30},
+            'C': {'conversion_rate': 0.02, 'distribution': 0.50}
+        },
+        lead_cost_tiers=[{'volume': 7300 * (2 ** i), 'cost': 7 + (3 * i)} for i in range(4)]
+    )
+    params.update(overrides)
+    return CallCenterModel(**params)
+
+def brute_force_best_sales(model, investment_amount, steps=4001):
+    """Best feasible sales over a dense grid of splits"""
+    best = model.evaluate_scenarios(1.0)['sales'].iloc[0]
+    for agents in range(int(investment_amount // model.salesperson_cost) + 1):
+        budget = investment_amount - agents * model.salesperson_cost
+        max_leads = model.calculate_leads_for_budget(budget)
+        multipliers = (model.base_leads + np.linspace(0, max_leads, steps)) / model.base_leads
+        results = model.evaluate_scenarios(multipliers, salespeople=model.base_salespeople + agents)
+        feasible = results[results['total_cac'] <= model.max_cac]
+        if len(feasible):
+            best = max(best, feasible['sales'].max())
+    return best
+
+def test_optimal_split_beats_dense_grid():
+    """Test that the exact optimizer is at least as good as a dense brute-force search"""
+    model = app_model()
+    for investment in [12000, 50000, 200000]:
+        split = model.optimize_investment(investment)
+        assert split['sales'] >= brute_force_best_sales(model, investment) - 1e-9, "Optimizer missed a better split"
+        assert split['total_spend'] <= investment + 1e-6, "Optimizer overspent the budget"
+        assert split['total_cac'] <= model.max_cac + 1e-6, "Optimizer broke the CAC limit"
+
+def test_optimal_split_at_capacity_hires():
+    """Test that a capacity-bound center spends on agents"""
+    model = CallCenterModel(
+        base_leads=100,
+        base_salespeople=1,
+        max_leads_per_salesperson=50,
+        salesperson_cost=4000,
+        max_cac=2000,
+        lead_cost_tiers=[{'volume': float('inf'), 'cost': 40}]
+    )
+    split = model.optimize_investment(4000)
+    assert split['recommendation'] == 'people', "Should hire when at capacity"
+    assert split['additional_agents'] == 1, "Budget affords exactly one agent"
+    assert split['incremental_sales'] == 2.5, "Second agent works the 50 C leads at 5%"
+
+def test_optimal_split_respects_cac():
+    """Test that nothing is recommended when no split meets the CAC limit"""
+    model = app_model(max_cac=50)
+    split = model.optimize_investment(50000)
+    assert split['recommendation'] == 'do_nothing', "No split should meet a $50 CAC"
+    assert split['total_spend'] == 0, "Doing nothing spends nothing"
@@ -0,0 +1,111 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.config import ModelConfig
+from src.main import CallCenterModel
+from src.portfolio import SITE_COLUMNS, allocate_portfolio
+from src.utils.capacity import ErlangA
+
+RATE_CARD = [{'volume': 7300 * (2 ** i), 'cost': 7 + (3 * i)} for i in range(4)]
+QUALITY = {
+    'A': {'conversion_rate': 0.20, 'distribution': 0.20},
+    'B': {'conversion_rate': 0.04, 'distribution': 0.30},
+    'C': {'conversion_rate': 0.02, 'distribution': 0.50}
+}
+
+def random_site(rng):
+    return dict(
+        base_leads=float(rng.uniform(500, 8000)),
+        base_salespeople=int(rng.integers(1, 30)),
+        max_leads_per_salesperson=float(rng.choice([150, 300, 600])),
+        salesperson_cost=float(rng.choice([4000, 8000, 11000])),
+        max_cac=float(rng.choice([300, 600, 1000, 2000])),
+        lead_cost_tiers=RATE_CARD,
+        lead_quality_distribution=QUALITY
+    )
+
+def best_split(sites, budget, steps=40):
+    """Exhaustive split of the budget in ``steps`` increments using optimize_investment per site"""
+    amounts = np.linspace(0, budget, steps + 1)
+    best = np.zeros(steps + 1)
+    for site in sites:
+        model = CallCenterModel(**site)
+        gains = np.array([model.optimize_investment(amount)['incremental_sales'] for amount in amounts])
+        best = np.array([max(best[j - k] + gains[k] for k in range(j + 1)) for j in range(steps + 1)])
+    return best[-1]
+
+def test_single_site_matches_optimize_investment():
+    """With one site the allocation is that site's own optimum"""
+    rng = np.random.default_rng(3)
+    for _ in range(20):
+        site = random_site(rng)
+        budget = float(rng.uniform(1000, 200000))
+        result = allocate_portfolio([site], budget)
+        expected = CallCenterModel(**site).optimize_investment(budget)
+        assert result['sites']['incremental_sales'][0] == pytest.approx(expected['incremental_sales'], rel=1e-6, abs=1e-6), \
+            f"Site {site} with budget {budget}"
+
+@pytest.mark.parametrize('seed, n_sites, budget', [
+    (4, 50, 400000), (100, 300, 1e5), (101, 300, 3e5), (103, 1000, 2e5), (104, 1000, 2e6)
+])
+def test_budget_and_site_cac_respected(seed, n_sites, budget):
+    rng = np.random.default_rng(seed)
+    sites = [random_site(rng) for _ in range(n_sites)]
+    result = allocate_portfolio(sites, budget)
+    columns = result['sites']
+    assert list(columns) == SITE_COLUMNS
+    assert result['total_spend'] <= budget + 1e-6, f"Spent {result['total_spend']} of {budget}"
+    assert np.isclose(columns['total_spend'], columns['agent_spend'] + columns['lead_spend']).all()
+    invested = columns['incremental_sales'] > 0
+    max_cac = np.array([site['max_cac'] for site in sites])
+    assert (columns['total_cac'][invested] <= max_cac[invested] + 1e-6).all(), "A funded site exceeds its max_cac"
+    assert (columns['recommendation'][~invested] == 'do_nothing').all()
+    assert result['incremental_sales'] > 0
+
+def test_close_to_exhaustive_split():
+    """Greedy hull allocation comes close to trying every split of the budget"""
+    rng = np.random.default_rng(5)
+    for budget in (20000, 60000, 120000):
+        sites = [random_site(rng) for _ in range(3)]
+        result = allocate_portfolio(sites, budget)
+        best = best_split(sites, budget)
+        assert result['incremental_sales'] >= 0.95 * best, f"{result['incremental_sales']} vs {best} at {budget}"
+
+def test_global_cac_cap():
+    rng = np.random.default_rng(6)
+    sites = [random_site(rng) for _ in range(30)]
+    uncapped = allocate_portfolio(sites, 1e6)
+    cap = (uncapped['base_cac'] + uncapped['total_cac']) / 2
+    capped = allocate_portfolio(sites, 1e6, max_cac=cap)
+    assert capped['meets_cac']
+    assert capped['total_cac'] <= cap + 1e-6
+    assert capped['incremental_sales'] <= uncapped['incremental_sales']
+
+    unreachable = allocate_portfolio(sites, 1e6, max_cac=uncapped['base_cac'] / 2)
+    assert not unreachable['meets_cac']
+    assert unreachable['total_spend'] == 0
+
+def test_accepts_models_and_configs():
+    site = dict(base_leads=3000, base_salespeople=4, lead_cost_tiers=RATE_CARD, lead_quality_distribution=QUALITY)
+    from_dict = allocate_portfolio([site], 50000)
+    from_model = allocate_portfolio([CallCenterModel(**site)], 50000)
+    from_config = allocate_portfolio([ModelConfig(**site)], 50000)
+    assert from_dict['sales'] == from_model['sales'] == from_config['sales']
+
+    with pytest.raises(ValueError):
+        allocate_portfolio([{'base_lead': 3000}], 50000)
+
+def test_rejects_negative_budget():
+    with pytest.raises(ValueError):
+        allocate_portfolio([{}], -5)
+
+def test_rejects_queueing_capacity():
+    with pytest.raises(ValueError):
+        allocate_portfolio([{'capacity_model': ErlangA(handle_time_minutes=15, patience_minutes=5)}], 50000)
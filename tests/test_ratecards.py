@@ -0,0 +1,104 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main import CallCenterModel
+from src.utils.calculations import LeadCostTable
+from src.utils.ratecards import RateCardSet
+
+INF = float('inf')
+
+def random_cards(n_vendors, seed=0, rising=True):
+    rng = np.random.default_rng(seed)
+    cards = {}
+    for vendor in range(n_vendors):
+        n_tiers = rng.integers(2, 7)
+        ends = np.cumsum(rng.uniform(500, 5000, n_tiers))
+        prices = rng.uniform(5, 40, n_tiers)
+        if rising:
+            prices = np.sort(prices)
+        tiers = [{'volume': float(end), 'cost': float(price)} for end, price in zip(ends, prices)]
+        if vendor % 3:
+            tiers[-1]['volume'] = INF
+        cards[f'vendor {vendor}'] = tiers
+    return cards
+
+def test_costs_match_each_card():
+    """One pass over merged breakpoints prices every card like LeadCostTable does"""
+    cards = random_cards(30)
+    volumes = np.linspace(0, 40000, 4001)
+    costs = RateCardSet(cards).costs(volumes)
+    for row, tiers in enumerate(cards.values()):
+        table = LeadCostTable(tiers)
+        supplied = volumes <= table.max_volume
+        assert np.allclose(costs[row, supplied], table.cost(volumes[supplied]))
+        assert np.isinf(costs[row, ~supplied]).all(), "Volumes beyond a finite card cannot be bought"
+
+@pytest.mark.parametrize('rising', [True, False])
+def test_crossovers_match_cheapest_vendor(rising):
+    cards = random_cards(20, seed=1, rising=rising)
+    card_set = RateCardSet(cards)
+    crossovers = card_set.crossovers()
+    volumes = np.array([volume for volume, _, _ in crossovers])
+    assert np.all(np.diff(volumes) > 0)
+    for volume, before, after in crossovers:
+        costs = card_set.costs([volume - 1e-3, volume + 1e-3])
+        assert np.argmin(costs[:, 0]) == before and np.argmin(costs[:, 1]) == after, f"No change at {volume}"
+        assert costs[before, 0] <= costs[after, 0]
+
+    # Between consecutive crossovers the cheapest vendor stays the same
+    edges = np.concatenate([[0.0], volumes, [volumes[-1] + 5000 if len(volumes) else 5000]])
+    midpoints = (edges[:-1] + edges[1:]) / 2
+    cheapest = card_set.cheapest(midpoints)
+    expected = [crossovers[0][1]] + [after for _, _, after in crossovers] if crossovers else [cheapest[0]]
+    assert list(cheapest) == expected
+
+def test_blend_is_cheapest_for_rising_prices():
+    """With rising prices, blending beats or matches every single vendor and brute force"""
+    cards = {
+        'a': [{'volume': 1000, 'cost': 10}, {'volume': 3000, 'cost': 30}, {'volume': INF, 'cost': 50}],
+        'b': [{'volume': 2000, 'cost': 20}, {'volume': INF, 'cost': 40}]
+    }
+    card_set = RateCardSet(cards)
+    tiers, vendors = card_set.blend()
+    assert tiers == [
+        {'volume': 1000, 'cost': 10}, {'volume': 3000, 'cost': 20},
+        {'volume': 5000, 'cost': 30}, {'volume': INF, 'cost': 40}
+    ]
+    assert list(vendors) == [0, 1, 0, 1]
+
+    volume = 6000.0
+    split = np.arange(0, volume + 1, 10.0)
+    brute = (LeadCostTable(cards['a']).cost(split) + LeadCostTable(cards['b']).cost(volume - split)).min()
+    assert LeadCostTable(tiers).cost(volume) == pytest.approx(brute)
+    allocation = card_set.allocation([volume])[:, 0]
+    assert list(allocation) == [3000, 3000]
+
+def test_model_comparison_uses_model_sales():
+    model = CallCenterModel(base_leads=2000, base_salespeople=5)
+    cards = random_cards(8, seed=2)
+    volumes = np.array([1000, 2000, 4000, 8000.0])
+    result = model.compare_rate_cards(cards, volumes)
+    assert result['lead_cost'].shape == (8, 4)
+    sales = model._metric_arrays(volumes, 5)['sales']
+    assert np.allclose(result['sales'], sales)
+    for row, tiers in enumerate(cards.values()):
+        priced = CallCenterModel(base_leads=2000, base_salespeople=5, lead_cost_tiers=tiers)._metric_arrays(volumes, 5)
+        supplied = volumes <= LeadCostTable(tiers).max_volume
+        assert np.allclose(result['total_cac'][row, supplied], priced['total_cac'][supplied])
+
+    blended = CallCenterModel(base_leads=2000, base_salespeople=5, lead_cost_tiers=result['blended_tiers'])
+    assert np.allclose(result['blended_total_cac'], blended._metric_arrays(volumes, 5)['total_cac'])
+    assert np.allclose(result['blended_allocation'].sum(axis=0), volumes)
+    assert (result['blended_lead_cost'] <= result['lead_cost'].min(axis=0) + 1e-6).all()
+    assert list(result['cheapest']) == [result['vendors'][i] for i in np.argmin(result['lead_cost'], axis=0)]
+
+def test_empty_comparison():
+    with pytest.raises(ValueError):
+        CallCenterModel().compare_rate_cards({})
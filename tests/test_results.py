@@ -0,0 +1,69 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main import CallCenterModel
+from src.utils.calculations import METRIC_COLUMNS
+from src.utils.results import SCENARIO_KINDS, ScenarioResults
+
+def test_scenario_results_match_calculate_metrics():
+    """Labels and metrics agree with the row-oriented calculate_metrics output"""
+    model = CallCenterModel()
+    results = model.scenario_results([1.0, 1.5, 2.0])
+    frame = model.calculate_metrics([1.0, 1.5, 2.0])
+    assert results.labels() == list(frame['scenario'])
+    for name in METRIC_COLUMNS:
+        assert np.array_equal(results[name], frame[name].to_numpy()), f"Column {name} differs"
+    assert results.kind.dtype == np.int8 and results.additional_agents.dtype == np.int64
+
+def test_select_by_kind():
+    results = CallCenterModel().scenario_results([1.0, 1.2])
+    leads = results.select('leads')
+    agents = results.select('agents')
+    assert list(leads.multiplier) == [1.0, 1.2] and list(leads.additional_agents) == [0, 0]
+    assert list(agents.additional_agents) == [1, 2, 3] and list(agents.multiplier) == [1.0, 1.0, 1.0]
+    assert len(results.select('mixed')) == 0
+    with pytest.raises(ValueError):
+        results.select('agent')
+
+def test_evaluate_scenario_results_kinds():
+    """Kinds follow from each row's multiplier and headcount"""
+    model = CallCenterModel(base_salespeople=10)
+    results = model.evaluate_scenario_results([[1.0], [1.5]], salespeople=[10, 12])
+    assert [SCENARIO_KINDS[code] for code in results.kind] == ['leads', 'agents', 'leads', 'mixed']
+    assert results.labels() == ['1.0x leads', '+2 agents', '1.5x leads', '1.5x leads +2 agents']
+    expected = model.evaluate_scenarios([[1.0], [1.5]], salespeople=[10, 12])
+    assert np.array_equal(results['sales'], expected['sales'].to_numpy())
+
+    with pytest.raises(ValueError):
+        model.evaluate_scenario_results(1.0, salespeople=10.5)
+
+def test_pandas_conversion_shares_memory():
+    pd = pytest.importorskip("pandas")
+    results = CallCenterModel().evaluate_scenario_results(np.linspace(0.5, 3.0, 1000))
+    frame = results.to_pandas()
+    assert isinstance(frame['kind'].dtype, pd.CategoricalDtype)
+    assert list(frame.columns) == results.columns
+    assert np.shares_memory(frame['sales'].to_numpy(), results['sales']), "Metric columns should not be copied"
+
+def test_arrow_conversion_shares_memory():
+    pa = pytest.importorskip("pyarrow")
+    results = CallCenterModel().scenario_results()
+    table = results.to_arrow()
+    assert pa.types.is_dictionary(table.schema.field('kind').type)
+    assert table.column('kind').to_pylist()[-1] == 'agents'
+    sales = table.column('sales').chunk(0).to_numpy(zero_copy_only=True)
+    assert np.shares_memory(sales, results['sales']), "Metric columns should not be copied"
+
+def test_copy_is_independent():
+    results = CallCenterModel().scenario_results()
+    copied = results.copy()
+    copied['sales'][0] = -1
+    assert results['sales'][0] >= 0
+    assert isinstance(copied, ScenarioResults)
@@ -0,0 +1,134 @@
+import asyncio
+import json
+import os
+import sys
+
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from benchmarks.load_test import http_request
+from src.main import CallCenterModel
+from src.service import RecommendationService
+
+REQUESTS = [
+    {'base_leads': 1000, 'investment_amount': 50000},
+    {'base_leads': 7300, 'base_salespeople': 5, 'salesperson_cost': 11000, 'max_cac': 400,
+     'max_leads_per_salesperson': 600, 'investment_amount': 12000},
+    {'base_leads': 300, 'lead_cost_tiers': [{'volume': float('inf'), 'cost': 40}], 'investment_amount': 4000},
+]
+
+def test_concurrent_requests_are_batched_and_match_model():
+    """Concurrent requests share one evaluation and agree with get_investment_recommendation"""
+    async def scenario():
+        service = RecommendationService(max_wait_ms=20)
+        results = await asyncio.gather(*(service.recommend(request) for request in REQUESTS * 4))
+        return service, results
+
+    service, results = asyncio.run(scenario())
+    assert service.metrics.batches == 1, f"Expected one batch, got {service.metrics.batches}"
+    assert service.metrics.evaluated == len(REQUESTS), "Identical requests in flight should be evaluated once"
+    for request, result in zip(REQUESTS * 4, results):
+        request = dict(request)
+        expected = CallCenterModel(**{k: v for k, v in request.items() if k != 'investment_amount'}) \
+            .get_investment_recommendation(request['investment_amount'])
+        assert result['recommendation'] == expected['recommendation'], "Recommendation mismatch"
+        assert result['leads_incremental'] == pytest.approx(expected['leads_incremental'])
+
+def test_repeated_requests_hit_cache():
+    async def scenario():
+        service = RecommendationService(max_wait_ms=1)
+        first = await service.recommend(REQUESTS[0])
+        second = await service.recommend(dict(REQUESTS[0]))
+        return service, first, second
+
+    service, first, second = asyncio.run(scenario())
+    assert first == second
+    assert service.cache.stats()['hits'] == 1 and service.metrics.batches == 1, "Repeat should be served from cache"
+
+@pytest.mark.parametrize('method, path, body, status', [
+    ('GET', '/health', b'', 200),
+    ('GET', '/nowhere', b'', 404),
+    ('GET', '/recommend', b'', 405),
+    ('POST', '/recommend', b'{not json', 400),
+    ('POST', '/recommend', b'{"base_leads": 10}', 400),
+    ('POST', '/recommend', b'{"base_lead": 10, "investment_amount": 5}', 400),
+    ('POST', '/recommend', b'{"investment_amount": -5}', 400),
+    ('POST', '/recommend', b'{"lead_cost_tiers": [], "investment_amount": 5}', 400),
+    ('POST', '/recommend', b'{"base_leads": "abc", "investment_amount": 5}', 400),
+    ('POST', '/recommend', b'{"base_salespeople": 2.5, "investment_amount": 5}', 400),
+    ('POST', '/recommend', b'{"max_cac": null, "investment_amount": 5}', 400),
+    ('POST', '/recommend', b'{"lead_quality_distribution": [1, 2], "investment_amount": 1000}', 400),
+    ('POST', '/recommend', b'{"lead_quality_distribution": {"A": {"distribution": 1}}, "investment_amount": 1000}', 400),
+    ('POST', '/recommend', b'{"lead_cost_tiers": [{"volume": 5}], "investment_amount": 1000}', 400),
+    ('POST', '/recommend', b'{"lead_cost_tiers": {"volume": 5, "cost": 1}, "investment_amount": 1000}', 400),
+    ('POST', '/recommend', b'{"lead_cost_tiers": [{"volume": "x", "cost": 1}], "investment_amount": 1000}', 400),
+    ('POST', '/recommend', b'{"lead_cost_tiers": [{"volume": null, "cost": 40}], "investment_amount": 1000}', 200),
+])
+def test_routing_and_validation(method, path, body, status):
+    service = RecommendationService(max_wait_ms=1)
+    actual, _ = asyncio.run(service.handle(method, path, body))
+    assert actual == status, f"{method} {path} {body!r} returned {actual}"
+
+@pytest.mark.parametrize('body, message', [
+    (b'{"lead_quality_distribution": [1, 2], "investment_amount": 1000}', 'lead_quality_distribution must map'),
+    (b'{"lead_cost_tiers": [{"volume": 5}], "investment_amount": 1000}', 'lead_cost_tiers[0] is missing cost'),
+    (b'{"lead_cost_tiers": {"volume": 5, "cost": 1}, "investment_amount": 1000}', 'lead_cost_tiers must be a list'),
+])
+def test_structured_field_errors_are_readable(body, message):
+    service = RecommendationService(max_wait_ms=1)
+    status, result = asyncio.run(service.handle('POST', '/recommend', body))
+    assert status == 400 and message in result['error'], result
+
+def test_bad_request_does_not_fail_its_batch():
+    """A request with a bad field gets its own error; others batched with it still succeed"""
+    async def scenario():
+        service = RecommendationService(max_wait_ms=20)
+        bad = {'base_leads': 'abc', 'investment_amount': 5000}
+        return await asyncio.gather(
+            service.recommend(REQUESTS[0]), service.recommend(bad), service.recommend(REQUESTS[1]),
+            return_exceptions=True
+        )
+
+    good, bad, other = asyncio.run(scenario())
+    assert isinstance(bad, ValueError) and 'base_leads' in str(bad)
+    assert good['recommendation'] in ('leads', 'people', 'do_nothing')
+    assert other['recommendation'] in ('leads', 'people', 'do_nothing')
+
+def test_invalid_content_length():
+    async def scenario():
+        service = RecommendationService(max_wait_ms=1)
+        server = await service.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(b"POST /recommend HTTP/1.1\r\nHost: localhost\r\nContent-Length: abc\r\n\r\n")
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+        return response
+
+    response = asyncio.run(scenario())
+    assert response.startswith(b'HTTP/1.1 400'), response
+
+def test_http_round_trip():
+    """Requests over a keep-alive connection are answered and counted in /metrics"""
+    async def scenario():
+        service = RecommendationService(max_wait_ms=1)
+        server = await service.start('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            single = await http_request(reader, writer, 'localhost', 'POST', '/recommend', json.dumps(REQUESTS[0]).encode())
+            many = await http_request(reader, writer, 'localhost', 'POST', '/recommend', json.dumps(REQUESTS).encode())
+            metrics = await http_request(reader, writer, 'localhost', 'GET', '/metrics')
+            writer.close()
+        return single, many, metrics
+
+    single, many, metrics = asyncio.run(scenario())
+    assert single[0] == 200 and single[1]['recommendation'] in ('leads', 'people', 'do_nothing')
+    assert many[0] == 200 and len(many[1]) == len(REQUESTS)
+    assert many[1][0] == single[1], "Repeated campaign should return the cached result"
+    assert metrics[0] == 200 and metrics[1]['requests'] == 2 and metrics[1]['errors'] == 0
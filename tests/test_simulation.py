@@ -0,0 +1,57 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main import CallCenterModel
+from src.simulation import EventSimulation, compare_with_analytic, run_replications, simulate_period
+from src.utils.capacity import ErlangA
+
+def test_overloaded_center_matches_analytic_fill():
+    """With ample patience and a busy queue, agents work the best tiers first like the greedy fill"""
+    model = CallCenterModel(base_leads=20000, base_salespeople=20, max_leads_per_salesperson=600)
+    replications = run_replications(model, EventSimulation(seed=3), replications=4, workers=1)
+    comparison = compare_with_analytic(model, replications)
+
+    analytic, simulated, _ = comparison['handled_leads']
+    assert abs(simulated - analytic) / analytic < 0.02, f"Handled {simulated} vs analytic {analytic}"
+    analytic, simulated, _ = comparison['sales']
+    assert abs(simulated - analytic) / analytic < 0.05, f"Sales {simulated} vs analytic {analytic}"
+    assert comparison['total_cost'][0] == comparison['total_cost'][1], "Costs are deterministic"
+
+def test_fixed_handle_time_caps_throughput():
+    """Fixed handle times cannot work more than the period allows"""
+    model = CallCenterModel(base_leads=5000, base_salespeople=2)
+    result = simulate_period(model, EventSimulation(handle_time_minutes=60, handle_time='fixed', seed=1))
+    assert result['handled_leads'] <= 2 * 176, f"Handled {result['handled_leads']} leads in 352 agent hours"
+    assert result['handled_leads'] >= 2 * 175, "Agents should stay busy in an overloaded period"
+
+def test_abandonment_is_reported():
+    """Impatient leads abandon when agents are scarce"""
+    model = CallCenterModel(base_leads=7300, base_salespeople=5, capacity_model=ErlangA(handle_time_minutes=8))
+    result = simulate_period(model, EventSimulation(seed=4))
+    assert result['abandoned_leads'] > 0, "Expected some abandoned leads"
+    assert result['handled_leads'] + result['abandoned_leads'] <= result['total_leads']
+
+def test_no_agents_or_leads():
+    model = CallCenterModel()
+    assert simulate_period(model, EventSimulation(seed=0), salespeople=0)['sales'] == 0
+    assert simulate_period(model, EventSimulation(seed=0), total_leads=0)['handled_leads'] == 0
+
+def test_replications_reproducible_across_workers():
+    """Spawned seeds make results independent of the number of processes"""
+    model = CallCenterModel()
+    serial = run_replications(model, EventSimulation(seed=7), replications=3, workers=1)
+    parallel = run_replications(model, EventSimulation(seed=7), replications=3, workers=2)
+    for name, values in serial.items():
+        assert np.array_equal(values, parallel[name]), f"{name} differs between serial and parallel runs"
+    assert len(np.unique(serial['sales'])) > 1, "Replications should use different seeds"
+
+def test_invalid_handle_time_distribution():
+    with pytest.raises(ValueError):
+        EventSimulation(handle_time='lognormal')
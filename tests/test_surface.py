@@ -0,0 +1,81 @@
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.cli import main
+from src.config import ModelConfig
+from src.surface import ResponseSurface, build_surface
+from src.utils.capacity import ErlangA
+
+def exact_recommendation(config, leads, salespeople, budget):
+    return config.replace(base_leads=leads, base_salespeople=salespeople).to_model().get_investment_recommendation(budget)
+
+def lookup_in_process(path):
+    surface = ResponseSurface(path)
+    return isinstance(surface.sales, np.memmap), surface.lookup(4000.0, 10, 20000.0)['leads_sales']
+
+@pytest.mark.parametrize('capacity_model', [None, ErlangA(handle_time_minutes=15, patience_minutes=5)])
+def test_lookup_matches_exact_model(tmp_path, capacity_model):
+    """Interpolated answers agree with get_investment_recommendation inside the grid"""
+    config = ModelConfig(capacity_model=capacity_model)
+    surface = build_surface(str(tmp_path), config, leads=(500, 10000), salespeople=(1, 30), budgets=(0, 80000))
+    rng = np.random.default_rng(0)
+    for leads, salespeople, budget in zip(rng.uniform(500, 10000, 25), rng.integers(1, 31, 25), rng.uniform(0, 80000, 25)):
+        result = surface.lookup(float(leads), int(salespeople), float(budget))
+        expected = exact_recommendation(config, leads, int(salespeople), budget)
+        assert not result['exact']
+        assert result['recommendation'] == expected['recommendation']
+        assert result['leads_sales'] == pytest.approx(expected['leads_metrics']['sales'], rel=1e-3)
+        assert result['people_sales'] == pytest.approx(expected['people_metrics']['sales'], rel=1e-3)
+        assert result['leads_cac'] == pytest.approx(expected['leads_cac'], rel=1e-3)
+
+def test_outside_grid_falls_back_to_exact(tmp_path):
+    config = ModelConfig()
+    surface = build_surface(str(tmp_path), config, leads=(500, 5000), salespeople=(1, 10), budgets=(0, 20000))
+    result = surface.lookup(np.array([2000.0, 50000.0]), np.array([5, 5]), np.array([10000.0, 10000.0]))
+    assert list(result['exact']) == [False, True]
+    expected = exact_recommendation(config, 50000.0, 5, 10000.0)
+    assert result['leads_sales'][1] == expected['leads_metrics']['sales']
+    assert result['recommendation'][1] == expected['recommendation']
+
+def test_surface_is_memory_mapped_and_shared(tmp_path):
+    """The table is opened read-only from disk, and other processes read the same file"""
+    path = str(tmp_path)
+    build_surface(path, ModelConfig(base_leads=3000), leads=(500, 8000), salespeople=(1, 20), budgets=(0, 50000))
+    surface = ResponseSurface(path)
+    assert isinstance(surface.sales, np.memmap) and not surface.sales.flags.writeable
+    assert surface.config.base_leads == 3000
+
+    with ProcessPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(lookup_in_process, [path, path]))
+    expected = surface.lookup(4000.0, 10, 20000.0)['leads_sales']
+    assert results == [(True, expected), (True, expected)]
+
+def test_surface_header_is_strict_json(tmp_path):
+    """An open-ended tier volume is saved as null and read back as open-ended"""
+    config = ModelConfig()
+    assert math.isinf(config.lead_cost_tiers[-1][0])
+    build_surface(str(tmp_path), config, leads=(500, 5000), salespeople=(1, 10), budgets=(0, 20000))
+    with open(tmp_path / 'surface.json') as f:
+        text = f.read()
+    assert 'Infinity' not in text
+    assert json.loads(text)['config']['lead_cost_tiers'][-1]['volume'] is None
+    assert ResponseSurface(str(tmp_path)).config == config
+
+def test_surface_command(tmp_path, capsys):
+    path = str(tmp_path / 'surface')
+    status = main(['--salesperson-cost', '9000', 'surface', path, '--leads', '0', '5000',
+                   '--headcount', '1', '10', '--budgets', '0', '27000', '--lead-points', '101'])
+    assert status == 0
+    surface = ResponseSurface(path)
+    assert surface.config.salesperson_cost == 9000
+    assert surface.agent_axis == (1, 13) and surface.sales.shape == (101, 13)
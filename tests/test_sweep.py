@@ -0,0 +1,65 @@
+import os
+import sys
+
+import numpy as np
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.config import ModelConfig
+from src.main import CallCenterModel
+from src.sweep import SweepGrid, iter_sweep, run_sweep
+
+RATE_CARDS = [
+    [{'volume': float('inf'), 'cost': 40}],
+    [{'volume': 1000, 'cost': 30}, {'volume': float('inf'), 'cost': 70}]
+]
+
+def make_grid():
+    return SweepGrid(
+        base_leads=np.linspace(500, 3000, 6),
+        base_salespeople=[2, 5, 10],
+        max_leads_per_salesperson=[100, 150],
+        conversion_scale=[0.8, 1.0, 1.2],
+        lead_cost_tiers=RATE_CARDS
+    )
+
+def test_sweep_matches_model():
+    """Test that sweep rows equal direct model evaluations"""
+    grid = make_grid()
+    results = run_sweep(grid, workers=1)
+    assert len(results['sales']) == len(grid) == 6 * 3 * 2 * 3 * 2, "One row per grid point"
+
+    for i in [0, 17, 100, len(grid) - 1]:
+        scale = results['conversion_scale'][i]
+        config = ModelConfig(
+            base_leads=results['base_leads'][i],
+            base_salespeople=int(results['base_salespeople'][i]),
+            max_leads_per_salesperson=results['max_leads_per_salesperson'][i],
+            lead_quality_distribution={
+                tier: {'conversion_rate': rate * scale, 'distribution': dist}
+                for tier, rate, dist in grid.base.lead_quality_distribution
+            },
+            lead_cost_tiers=RATE_CARDS[results['rate_card'][i]]
+        )
+        expected = config.to_model().calculate_metrics([1.0]).iloc[0]
+        assert np.isclose(results['sales'][i], expected['sales']), "Sales mismatch"
+        assert np.isclose(results['total_cost'][i], expected['total_cost']), "Cost mismatch"
+
+def test_sweep_identical_across_workers_and_chunks():
+    """Test that chunking and process count don't change results"""
+    grid = make_grid()
+    serial = run_sweep(grid, workers=1)
+    parallel = run_sweep(grid, chunk_size=37, workers=2)
+    assert serial.keys() == parallel.keys()
+    for name in serial:
+        assert np.array_equal(serial[name], parallel[name]), f"{name} differs between runs"
+
+def test_sweep_streams_with_progress():
+    """Test that chunks stream in order and progress reaches the total"""
+    grid = make_grid()
+    updates = []
+    chunks = list(iter_sweep(grid, chunk_size=50, workers=1, progress=lambda done, total: updates.append((done, total))))
+    assert [chunk['point'][0] for chunk in chunks] == list(range(0, len(grid), 50)), "Chunks out of order"
+    assert updates[-1] == (len(grid), len(grid)), "Progress should finish at the grid size"
@@ -0,0 +1,119 @@
+import os
+import sys
+
+import numpy as np
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.config import ModelConfig
+from src.main import CallCenterModel
+from src.utils.capacity import ErlangA
+
+INVESTMENT = 12000
+
+def app_model(**kwargs):
+    settings = dict(
+        base_leads=7300,
+        base_salespeople=5,
+        salesperson_cost=11000,
+        max_cac=400,
+        max_leads_per_salesperson=600,
+        lead_quality_distribution={
+            'A': {'conversion_rate': 0.20, 'distribution': 0.20},
+            'B': {'conversion_rate': 0.04, 'distribution': 0.30},
+            'C': {'conversion_rate': 0.02, 'distribution': 0.50}
+        },
+        lead_cost_tiers=[{'volume': 7300 * (2 ** i), 'cost': 7 + (3 * i)} for i in range(4)]
+    )
+    settings.update(kwargs)
+    return CallCenterModel(**settings)
+
+def assert_matches_fresh_model(whatif):
+    """The graph's outputs equal a model rebuilt from scratch with the same inputs"""
+    config = ModelConfig(**{name: whatif[name] for name in ModelConfig.__dataclass_fields__})
+    model = config.to_model()
+    assert whatif.recommendation() == model.get_investment_recommendation(whatif['investment_amount'])
+    expected = model.calculate_metric_columns(whatif['lead_multipliers'])
+    columns = whatif.metric_columns()
+    assert columns['scenario'] == expected['scenario']
+    for name, values in expected.items():
+        if name != 'scenario':
+            assert np.array_equal(columns[name], values), f"Column {name} differs from a fresh model"
+
+def test_initial_results_match_model():
+    whatif = app_model().what_if(INVESTMENT)
+    whatif.recommendation()
+    assert 'quality' in whatif.last_recomputed and 'lead_cost_table' in whatif.last_recomputed
+    assert_matches_fresh_model(whatif)
+    assert whatif.last_recomputed == ['metric_columns'], "The metrics table should reuse the shared scenarios"
+
+def test_max_cac_only_reranks():
+    """A new CAC limit reuses every evaluated scenario"""
+    whatif = app_model().what_if(INVESTMENT)
+    whatif.recommendation()
+    result = whatif.update(max_cac=200)
+    assert whatif.last_recomputed == ['recommendation'], f"Recomputed {whatif.last_recomputed}"
+    assert result['recommendation'] == 'do_nothing'
+    assert_matches_fresh_model(whatif)
+
+def test_conversion_change_skips_costs_and_capacity():
+    whatif = app_model().what_if(INVESTMENT)
+    whatif.recommendation()
+    whatif.update_quality_tier('A', conversion_rate=0.25)
+    recomputed = set(whatif.last_recomputed)
+    assert {'quality', 'handled', 'metrics', 'recommendation'} <= recomputed
+    assert not recomputed & {'lead_cost_table', 'lead_cost', 'capacity', 'agent_cost', 'scenario_leads'}, \
+        f"Recomputed {sorted(recomputed)}"
+    assert_matches_fresh_model(whatif)
+
+def test_price_change_beyond_purchased_volume_stops_early():
+    """Editing a tier the scenarios never reach leaves the sales figures untouched"""
+    whatif = app_model().what_if(INVESTMENT)
+    whatif.recommendation()
+    whatif.update_lead_cost_tier(3, cost=30)
+    recomputed = set(whatif.last_recomputed)
+    assert {'lead_cost_table', 'additional_leads', 'lead_cost'} <= recomputed
+    assert not recomputed & {'scenario_leads', 'capacity', 'handled', 'metrics', 'recommendation'}, \
+        f"Recomputed {sorted(recomputed)}"
+    assert_matches_fresh_model(whatif)
+
+def test_price_change_in_range_updates_results():
+    whatif = app_model().what_if(INVESTMENT)
+    before = whatif.recommendation()
+    after = whatif.update_lead_cost_tier(1, cost=20)
+    assert after['leads_metrics']['total_leads'] < before['leads_metrics']['total_leads']
+    assert_matches_fresh_model(whatif)
+
+def test_unchanged_inputs_recompute_nothing():
+    whatif = app_model().what_if(INVESTMENT)
+    whatif.recommendation()
+    whatif.update(max_cac=400, base_leads=7300)
+    assert whatif.last_recomputed == []
+
+def test_sequence_of_edits_matches_fresh_model():
+    whatif = app_model(capacity_model=ErlangA(handle_time_minutes=15, patience_minutes=5)).what_if(INVESTMENT)
+    edits = [
+        {'base_salespeople': 8},
+        {'investment_amount': 40000},
+        {'lead_multipliers': [1.0, 1.5, 3.0]},
+        {'salesperson_cost': 9000, 'max_leads_per_salesperson': 700},
+        {'capacity_model': None}
+    ]
+    for edit in edits:
+        whatif.update(**edit)
+        assert_matches_fresh_model(whatif)
+
+def test_results_are_copies_and_model_is_untouched():
+    model = app_model()
+    whatif = model.what_if(INVESTMENT)
+    whatif.recommendation()['base_metrics']['sales'] = -1
+    whatif.update_quality_tier('A', conversion_rate=0.5)
+    assert whatif.recommendation()['base_metrics']['sales'] > 0
+    assert model.lead_quality_distribution['A']['conversion_rate'] == 0.20
+
+def test_unknown_parameter():
+    with pytest.raises(TypeError):
+        app_model().what_if().update(max_leads=5)
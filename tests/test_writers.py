@@ -0,0 +1,65 @@
+import json
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Get the absolute path to the project root
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.main import CallCenterModel
+from src.sweep import SweepGrid, iter_sweep
+from src.writers import infer_format, write_batches
+
+def test_scenario_batches_are_fixed_size():
+    """Test that streamed batches have the calculate_metrics schema and fixed size"""
+    model = CallCenterModel()
+    multipliers = np.linspace(0.5, 3.0, 1000)
+    batches = list(model.iter_scenarios(multipliers, batch_size=256))
+
+    assert [len(batch['sales']) for batch in batches] == [256, 256, 256, 232], "Batches should be fixed size"
+    assert list(batches[0]) == list(model.calculate_metrics([1.0]).columns), "Schema should match calculate_metrics"
+
+    streamed = pd.concat([pd.DataFrame(batch) for batch in batches], ignore_index=True)
+    pd.testing.assert_frame_equal(streamed, model.evaluate_scenarios(multipliers))
+
+def test_write_csv_round_trip(tmp_path):
+    """Test that streamed CSV output matches the in-memory results"""
+    model = CallCenterModel()
+    multipliers = np.linspace(0.5, 3.0, 500)
+    path = tmp_path / "scenarios.csv"
+
+    rows = write_batches(model.iter_scenarios(multipliers, batch_size=128), path)
+    written = pd.read_csv(path)
+    assert rows == len(written) == 500, "Every row should be written once"
+    assert np.allclose(written['total_cac'], model.evaluate_scenarios(multipliers)['total_cac']), "CAC mismatch"
+
+def test_write_parquet_sweep(tmp_path):
+    """Test that sweep chunks stream into a Parquet file"""
+    pytest.importorskip("pyarrow")
+    grid = SweepGrid(base_leads=np.linspace(500, 3000, 50), base_salespeople=range(1, 21))
+    path = tmp_path / "sweep.parquet"
+
+    rows = write_batches(iter_sweep(grid, chunk_size=100, workers=1), path)
+    written = pd.read_parquet(path)
+    assert rows == len(written) == len(grid), "Every grid point should be written once"
+    assert (written['point'].values == np.arange(len(grid))).all(), "Rows should be in grid order"
+
+def test_write_jsonl_round_trip(tmp_path):
+    """Test that JSON Lines output keeps one object per row, including infinite CAC"""
+    path = tmp_path / "scenarios.jsonl"
+    rows = write_batches([{'scenario': ['a', 'b'], 'total_cac': np.array([1.5, np.inf])}], path)
+    written = pd.read_json(path, lines=True)
+    assert rows == len(written) == 2, "Every row should be written once"
+    assert list(written['scenario']) == ['a', 'b']
+    assert 'Infinity' not in path.read_text(), "Output must be strict JSON"
+    assert [json.loads(line)['total_cac'] for line in path.read_text().splitlines()] == [1.5, None]
+    assert infer_format("results.ndjson") == 'jsonl'
+
+def test_unknown_format_rejected():
+    """Test that unknown extensions are reported"""
+    with pytest.raises(ValueError):
+        infer_format("results.xlsx")